@@ -1,11 +1,460 @@
+import os
+import random
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
 import pytest
 from helpers.api_client import PetstoreAPIClient
+from helpers.async_api_client import AsyncPetstoreAPIClient
+from helpers.benchmark import BenchmarkRunner, load_baseline, save_results
+from helpers.cassette import Cassette
+from helpers.cleanup import CleanupRegistry
 from helpers.data_generators import PetDataGenerator, OrderDataGenerator, UserDataGenerator
+from helpers.entity_pool import EntityPool
+from helpers.id_allocator import IdAllocator, SLOT_BITS, set_default_id_allocator
+from helpers.inventory import InventoryReconciler, InventoryReport
+from helpers.metrics import RequestMetrics
+from helpers.petstore_server import LocalPetstoreServer
+from helpers.rate_limit import AdaptiveConcurrencyLimit, RateLimiter
+from helpers.resilience import CircuitBreakers, RetryPolicy
+from helpers.schema_validator import SchemaValidator, default_validator
+from helpers.tracing import Tracer, load_trace_events
+from helpers.transport import TRANSPORTS
+from helpers.waiting import wait_stats
+
+pytest_plugins = ["helpers.pytest_scheduler"]
+
+session_metrics_key = pytest.StashKey[RequestMetrics]()
+cassette_key = pytest.StashKey[Cassette]()
+cleanup_key = pytest.StashKey[CleanupRegistry]()
+benchmark_results_key = pytest.StashKey[dict]()
+benchmark_baseline_key = pytest.StashKey[dict]()
+client_key = pytest.StashKey[PetstoreAPIClient]()
+tracer_key = pytest.StashKey[Tracer]()
+inventory_report_key = pytest.StashKey[InventoryReport]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("petstore")
+    group.addoption(
+        "--petstore-url",
+        default=os.environ.get("PETSTORE_BASE_URL"),
+        help="Базовый URL Petstore API (по умолчанию поднимается локальный сервер)",
+    )
+    group.addoption(
+        "--petstore-metrics",
+        metavar="PATH",
+        help="Собирать метрики запросов клиента и сохранить их в JSON по окончании сессии",
+    )
+    group.addoption("--petstore-pool-connections", type=int, default=10,
+                    help="Число хостов, для которых кешируются пулы соединений")
+    group.addoption("--petstore-pool-maxsize", type=int, default=10,
+                    help="Максимум соединений к одному хосту")
+    group.addoption("--petstore-pool-block", action="store_true",
+                    help="Ждать свободное соединение вместо открытия дополнительных")
+    group.addoption("--petstore-no-keep-alive", action="store_true",
+                    help="Закрывать соединение после каждого запроса")
+    group.addoption("--petstore-transport", choices=sorted(TRANSPORTS), default="requests",
+                    help="requests - requests.Session, raw - HTTP/1.1 на сокетах с меньшими накладными расходами")
+    group.addoption("--petstore-timeout", type=float, default=None,
+                    help="Таймаут сокета для запросов, секунды")
+    group.addoption("--petstore-rate-limit", type=float, default=None, metavar="RPS",
+                    help="Не больше RPS запросов в секунду от клиента сессии")
+    group.addoption("--petstore-adaptive-concurrency", action="store_true",
+                    help="Адаптивный (AIMD) предел запросов в полете: снижается при 429/5xx и росте задержки")
+    group.addoption("--petstore-retries", type=int, default=3, metavar="ATTEMPTS",
+                    help="Попыток на идемпотентный запрос при сбое соединения и 429/502/503/504 (1 - без повторов)")
+    group.addoption("--petstore-circuit-threshold", type=int, default=5,
+                    help="Сколько отказов endpoint-а подряд размыкают его предохранитель (0 - без предохранителей)")
+    group.addoption("--petstore-circuit-reset", type=float, default=30.0,
+                    help="Через сколько секунд разомкнутый предохранитель пропускает пробный запрос")
+    group.addoption("--petstore-trace", metavar="PATH",
+                    help="Записать span-ы тестов и запросов с фазами в PATH (Chrome trace JSON, Perfetto)")
+    group.addoption("--petstore-check-inventory", action="store_true",
+                    help="В конце сессии сверить GET /store/inventory с изменениями питомцев через клиент")
+    group.addoption("--petstore-entity-pool-size", type=int, default=5,
+                    help="Сколько питомцев, заказов и пользователей заранее создать для тестов чтения")
+    group.addoption("--petstore-no-cleanup", action="store_true",
+                    help="Не удалять созданные тестами сущности")
+    group.addoption("--petstore-cleanup-threshold", type=int, default=500,
+                    help="Сколько созданных сущностей копить до промежуточной очистки")
+    group.addoption("--petstore-cassette", metavar="PATH",
+                    help="Кассета для записи или воспроизведения ответов")
+    group.addoption("--petstore-cassette-mode", choices=["record", "replay"], default="replay",
+                    help="record - записать ответы в кассету, replay - отвечать из кассеты без сети")
+    group.addoption("--petstore-benchmark-rounds", type=int, default=20,
+                    help="Число измеренных запусков каждого бенчмарка")
+    group.addoption("--petstore-benchmark-warmup", type=int, default=3,
+                    help="Число прогревочных запусков бенчмарка, которые не учитываются")
+    group.addoption("--petstore-benchmark-baseline", metavar="PATH",
+                    help="Сравнивать бенчмарки с базовыми выборками из JSON-файла")
+    group.addoption("--petstore-benchmark-save", metavar="PATH",
+                    help="Добавить выборки бенчмарков в JSON-файл (хранятся 5 последних сессий)")
+    group.addoption("--petstore-benchmark-alpha", type=float, default=0.01,
+                    help="Уровень значимости при сравнении с базовой выборкой")
+    group.addoption("--petstore-benchmark-min-ratio", type=float, default=1.25,
+                    help="Минимальное отношение медиан, которое считается регрессией")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "live: тест обращается к серверу в обход кассеты и пропускается при воспроизведении")
+    if config.getoption("--petstore-metrics"):
+        config.stash[session_metrics_key] = RequestMetrics()
+    cassette_path = config.getoption("--petstore-cassette")
+    cassette_mode = config.getoption("--petstore-cassette-mode")
+    if cassette_path and cassette_mode == "record" and config.getoption("--petstore-workers") > 1:
+        raise pytest.UsageError("--petstore-cassette-mode=record cannot be combined with --petstore-workers")
+    if cassette_path:
+        config.stash[cassette_key] = Cassette(cassette_path, cassette_mode)
+    if config.getoption("--petstore-trace"):
+        worker_id = os.environ.get("PETSTORE_WORKER_ID")
+        config.stash[tracer_key] = Tracer(f"pytest worker {worker_id}" if worker_id else "pytest")
+    config.stash[benchmark_results_key] = {}
+    baseline_path = config.getoption("--petstore-benchmark-baseline")
+    config.stash[benchmark_baseline_key] = load_baseline(baseline_path) if baseline_path else {}
+
+
+def pytest_petstore_worker_args(config, worker_id, workdir):
+    """Каждый воркер пишет метрики, трассировку и бенчмарки в свои файлы, управляющий процесс их складывает"""
+    args = []
+    if session_metrics_key in config.stash:
+        args.append(f"--petstore-metrics={os.path.join(workdir, f'metrics-{worker_id}.json')}")
+    if tracer_key in config.stash:
+        args.append(f"--petstore-trace={os.path.join(workdir, f'trace-{worker_id}.json')}")
+    args.append(f"--petstore-benchmark-save={os.path.join(workdir, f'benchmarks-{worker_id}.json')}")
+    return args
+
+
+def pytest_petstore_workers_finished(config, worker_ids, workdir):
+    metrics = config.stash.get(session_metrics_key, None)
+    for worker_id in worker_ids:
+        path = os.path.join(workdir, f"metrics-{worker_id}.json")
+        if metrics is not None and os.path.exists(path):
+            metrics.merge(RequestMetrics.load(path))
+        path = os.path.join(workdir, f"trace-{worker_id}.json")
+        if tracer_key in config.stash and os.path.exists(path):
+            config.stash[tracer_key].merge(load_trace_events(path))
+        path = os.path.join(workdir, f"benchmarks-{worker_id}.json")
+        if os.path.exists(path):
+            results = {name: sessions[-1] for name, sessions in load_baseline(path).items()}
+            config.stash[benchmark_results_key].update(results)
+
+
+def pytest_collection_modifyitems(config, items):
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is None or not cassette.replaying:
+        return
+    skip_live = pytest.mark.skip(reason="требует живого сервера, а ответы воспроизводятся из кассеты")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    """Запросы клиента во время теста (и его фикстур) помечаются node id теста"""
+    tracer = item.config.stash.get(tracer_key, None)
+    if tracer is None:
+        yield
+        return
+    tracer.node_id = item.nodeid
+    try:
+        with tracer.span(item.nodeid, "test"):
+            yield
+    finally:
+        tracer.node_id = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    with _test_phase(item, "setup"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with _test_phase(item, "call"):
+        yield
+
+
+def _test_phase(item, when):
+    tracer = item.config.stash.get(tracer_key, None)
+    return tracer.span(when, "test") if tracer is not None else nullcontext()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item):
+    """Промежуточная очистка между тестами, если накопилось много сущностей"""
+    with _test_phase(item, "teardown"):
+        registry = item.config.stash.get(cleanup_key, None)
+        if registry is not None:
+            registry.checkpoint()
+        yield
+
+
+def pytest_sessionfinish(session):
+    metrics = session.config.stash.get(session_metrics_key, None)
+    if metrics is not None:
+        metrics.dump(session.config.getoption("--petstore-metrics"))
+    benchmark_path = session.config.getoption("--petstore-benchmark-save")
+    benchmark_results = session.config.stash.get(benchmark_results_key, {})
+    if benchmark_path and benchmark_results:
+        save_results(benchmark_path, benchmark_results)
+    cassette = session.config.stash.get(cassette_key, None)
+    if cassette is not None:
+        cassette.close()
+    tracer = session.config.stash.get(tracer_key, None)
+    if tracer is not None:
+        tracer.dump(session.config.getoption("--petstore-trace"))
+
+
+def pytest_terminal_summary(terminalreporter):
+    cassette = terminalreporter.config.stash.get(cassette_key, None)
+    if cassette is not None and cassette.replaying:
+        terminalreporter.section("petstore cassette")
+        terminalreporter.write_line(f"{cassette.path}: hits={cassette.hits} misses={len(cassette.misses)}")
+        for method, endpoint in cassette.misses:
+            terminalreporter.write_line(f"miss: {method} {endpoint}")
+
+    registry = terminalreporter.config.stash.get(cleanup_key, None)
+    if registry is not None and registry.failures:
+        terminalreporter.section("petstore cleanup", yellow=True)
+        terminalreporter.write_line(f"deleted={registry.deleted} not deleted={len(registry.failures)}")
+        for failure in registry.failures:
+            terminalreporter.write_line(f"{failure.kind} {failure.key}: {failure.status_code} {failure.reason}")
+
+    benchmark_results = terminalreporter.config.stash.get(benchmark_results_key, {})
+    if benchmark_results:
+        baseline = terminalreporter.config.stash[benchmark_baseline_key]
+        terminalreporter.section("petstore benchmarks")
+        for name, result in sorted(benchmark_results.items()):
+            low, high = result.median_interval()
+            line = (f"{name}: median={result.median * 1000:.3f}ms "
+                    f"ci95=[{low * 1000:.3f}, {high * 1000:.3f}] p90={result.percentile(90) * 1000:.3f}ms "
+                    f"rounds={result.rounds}")
+            if name in baseline:
+                reference = max(session.median for session in baseline[name])
+                line += f" vs baseline x{result.median / reference:.2f}"
+            terminalreporter.write_line(line)
+
+    client = terminalreporter.config.stash.get(client_key, None)
+    incidents = client.resilience.incidents() if client is not None else {}
+    if incidents:
+        terminalreporter.section("petstore resilience", yellow=True)
+        for key, item in incidents.items():
+            terminalreporter.write_line(f"{key}: " + " ".join(f"{name}={count}" for name, count in item.items()))
+
+    report = terminalreporter.config.stash.get(inventory_report_key, None)
+    if report is not None:
+        terminalreporter.section("petstore inventory", yellow=not report.ok)
+        terminalreporter.write_line(f"expected={report.expected} untracked={report.untracked}")
+        for drift in report.drifts:
+            terminalreporter.write_line(
+                f"{drift.status}: expected={drift.expected} actual={drift.actual} drift={drift.drift:+d}"
+            )
+
+    summary = wait_stats.summary()
+    if not summary:
+        return
+    terminalreporter.section("petstore waits")
+    for name, item in sorted(summary.items()):
+        terminalreporter.write_line(
+            f"{name}: waits={item['waits']} attempts={item['attempts']} "
+            f"mean={item['mean']:.3f}s max={item['max']:.3f}s timeouts={item['timeouts']}"
+        )
+
+
+@pytest.fixture(scope="session")
+def petstore_base_url(request):
+    base_url = request.config.getoption("--petstore-url")
+    if base_url:
+        yield base_url
+        return
+    with LocalPetstoreServer() as server:
+        yield server.base_url
+
+
+@pytest.fixture(scope="session")
+def pooled_api_client(request, petstore_base_url):
+    """Один клиент с пулом keep-alive соединений на всю сессию"""
+    config = request.config
+    rate_limit = config.getoption("--petstore-rate-limit")
+    pool_maxsize = config.getoption("--petstore-pool-maxsize")
+    concurrency = None
+    if config.getoption("--petstore-adaptive-concurrency"):
+        # Больше pool_maxsize запросов в полете все равно не будет - массовые операции упираются в пул
+        concurrency = AdaptiveConcurrencyLimit(initial=max(1, pool_maxsize // 2), max_limit=pool_maxsize)
+    retries = config.getoption("--petstore-retries")
+    circuit_threshold = config.getoption("--petstore-circuit-threshold")
+    client = PetstoreAPIClient(
+        base_url=petstore_base_url,
+        metrics=config.stash.get(session_metrics_key, None),
+        pool_connections=config.getoption("--petstore-pool-connections"),
+        pool_maxsize=pool_maxsize,
+        pool_block=config.getoption("--petstore-pool-block"),
+        keep_alive=not config.getoption("--petstore-no-keep-alive"),
+        timeout=config.getoption("--petstore-timeout"),
+        transport=config.getoption("--petstore-transport"),
+        tracer=config.stash.get(tracer_key, None),
+        cassette=config.stash.get(cassette_key, None),
+        rate_limiter=RateLimiter(rate_limit) if rate_limit else None,
+        concurrency=concurrency,
+        retry_policy=RetryPolicy(max_attempts=retries) if retries > 1 else None,
+        circuit_breakers=CircuitBreakers(
+            failure_threshold=circuit_threshold, reset_timeout=config.getoption("--petstore-circuit-reset"),
+        ) if circuit_threshold > 0 else None,
+    )
+    config.stash[client_key] = client
+    reconciler = InventoryReconciler(client) if config.getoption("--petstore-check-inventory") else None
+    registry = None
+    if not config.getoption("--petstore-no-cleanup"):
+        registry = config.stash[cleanup_key] = CleanupRegistry(
+            client, threshold=config.getoption("--petstore-cleanup-threshold"),
+        )
+    yield client
+    if registry is not None:
+        registry.flush(include_pinned=True)
+        registry.detach()
+    if reconciler is not None:
+        config.stash[inventory_report_key] = reconciler.reconcile()
+        reconciler.detach()
+    client.close()
+
+
+@contextmanager
+def _deterministic_data(config, name):
+    """С кассетой данные должны совпадать между прогонами: random и ID зависят только от name"""
+    if cassette_key not in config.stash:
+        yield
+        return
+    seed = zlib.crc32(name.encode("utf-8"))
+    state = random.getstate()
+    random.seed(seed)
+    set_default_id_allocator(IdAllocator(worker_id=seed % (1 << SLOT_BITS), key=0))
+    try:
+        yield
+    finally:
+        set_default_id_allocator(None)
+        random.setstate(state)
+
+
+@pytest.fixture(autouse=True)
+def _deterministic_test_data(request):
+    with _deterministic_data(request.config, request.node.nodeid):
+        yield
+
+
+@pytest.fixture(scope="session")
+def entity_pools(request, pooled_api_client):
+    """Заранее созданные питомцы, заказы и пользователи; создаются параллельно при первом обращении"""
+    size = request.config.getoption("--petstore-entity-pool-size")
+    pools = {
+        "pets": EntityPool.for_pets(pooled_api_client, size),
+        "orders": EntityPool.for_orders(pooled_api_client, size),
+        "users": EntityPool.for_users(pooled_api_client, size),
+    }
+    with _deterministic_data(request.config, "entity_pools"):
+        with ThreadPoolExecutor(max_workers=len(pools)) as executor:
+            for future in [executor.submit(pool.warm, pooled_api_client) for pool in pools.values()]:
+                future.result()
+    registry = request.config.stash.get(cleanup_key, None)
+    if registry is not None:
+        for kind, pool in pools.items():
+            pool.pin_to(registry, kind)
+    yield pools
+
+
+@pytest.fixture(scope="function")
+def pooled_pet(entity_pools):
+    """Питомец из пула только для чтения"""
+    with entity_pools["pets"].lease() as pet:
+        yield pet
+
+
+@pytest.fixture(scope="function")
+def pooled_order(entity_pools):
+    """Заказ из пула только для чтения"""
+    with entity_pools["orders"].lease() as order:
+        yield order
+
+
+@pytest.fixture(scope="function")
+def pooled_user(entity_pools):
+    """Пользователь из пула только для чтения"""
+    with entity_pools["users"].lease() as user:
+        yield user
+
+
+@pytest.fixture(scope="function")
+def exclusive_pet(entity_pools):
+    """Питомец из пула в монопольное пользование; после теста восстанавливается"""
+    with entity_pools["pets"].lease(exclusive=True) as pet:
+        yield pet
+
+
+@pytest.fixture(scope="function")
+def exclusive_user(entity_pools):
+    """Пользователь из пула в монопольное пользование; после теста восстанавливается"""
+    with entity_pools["users"].lease(exclusive=True) as user:
+        yield user
+
+
+@pytest.fixture(scope="function")
+def api_client(pooled_api_client):
+    """Общий клиент сессии; заголовки и cookies, измененные тестом, откатываются после него"""
+    with pooled_api_client.isolated():
+        yield pooled_api_client
+
+
+@pytest.fixture(scope="function")
+def async_api_client_factory(request, pooled_api_client, petstore_base_url):
+    """Создание AsyncPetstoreAPIClient(**kwargs); созданные им сущности очищаются, как и у клиента сессии"""
+    registry = request.config.stash.get(cleanup_key, None)
+
+    def create(**kwargs) -> AsyncPetstoreAPIClient:
+        client = AsyncPetstoreAPIClient(base_url=petstore_base_url, **kwargs)
+        if registry is not None:
+            client.add_listener(registry.on_response)
+        return client
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def request_metrics(api_client):
+    """Метрики запросов текущего теста; по окончании теста сливаются в метрики сессии"""
+    session_metrics = api_client.metrics
+    test_metrics = RequestMetrics()
+    api_client.metrics = test_metrics
+    yield test_metrics
+    api_client.metrics = session_metrics
+    if session_metrics is not None:
+        session_metrics.merge(test_metrics)
+
+
+@pytest.fixture(scope="session")
+def schema_validator() -> SchemaValidator:
+    """Проверка ответов по схемам Petstore, скомпилированным один раз за сессию"""
+    return default_validator()
 
 
 @pytest.fixture(scope="function")
-def api_client():
-    yield PetstoreAPIClient()
+def benchmark(request):
+    """Измерение вызова: benchmark(func, *args, setup=None) - с прогревом, статистикой и сравнением с базовой"""
+    config = request.config
+    name = request.node.nodeid
+    runner = BenchmarkRunner(
+        name,
+        rounds=config.getoption("--petstore-benchmark-rounds"),
+        warmup=config.getoption("--petstore-benchmark-warmup"),
+        baseline=config.stash[benchmark_baseline_key].get(name),
+        alpha=config.getoption("--petstore-benchmark-alpha"),
+        min_ratio=config.getoption("--petstore-benchmark-min-ratio"),
+    )
+    yield runner
+    if runner.result is not None:
+        config.stash[benchmark_results_key][name] = runner.result
 
 
 @pytest.fixture(scope="function")
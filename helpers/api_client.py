@@ -1,20 +1,326 @@
+import os
+import re
+import time
+from contextlib import contextmanager
 import requests
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from helpers.bulk import BulkOperation
+from helpers.cassette import Cassette
+from helpers.json_stream import iter_json_array
+from helpers.metrics import RequestMetrics
+from helpers.models import Model, Order, Pet, User, decode, to_json
+from helpers.multipart import FileSource, MultipartEncoder
+from helpers.rate_limit import AdaptiveConcurrencyLimit, RateLimiter
+from helpers.resilience import (
+    BUDGET_EXHAUSTED, FAILED, GAVE_UP, OK, RECOVERED, SHORT_CIRCUITED,
+    CircuitBreakers, CircuitOpenError, ResilienceStats, RetryPolicy,
+)
+from helpers.response_cache import CACHEABLE_TEMPLATES, ResponseCache, cache_key, read_tags, write_tags
+from helpers.tracing import Tracer, phase
+from helpers.transport import Transport, make_transport
+
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/pet/[^/]+/uploadImage$"), "/pet/{petId}/uploadImage"),
+    (re.compile(r"^/pet/(?!findByStatus$|findByTags$)[^/]+$"), "/pet/{petId}"),
+    (re.compile(r"^/store/order/[^/]+$"), "/store/order/{orderId}"),
+    (re.compile(r"^/user/(?!login$|logout$|createWithArray$|createWithList$)[^/]*$"), "/user/{username}"),
+]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Шаблон endpoint-а без конкретных идентификаторов: /pet/123 -> /pet/{petId}"""
+    for pattern, template in ENDPOINT_TEMPLATES:
+        if pattern.match(endpoint):
+            return template
+    return endpoint
+
+
+def _body_size(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def _image_source(source: FileSource) -> Dict[str, Any]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return {"image": source}
+    return {"file_path": os.fspath(source)}
+
+
+ResponseListener = Callable[[str, str, Dict[str, Any], requests.Response], None]
 
 
 class PetstoreAPIClient:
     BASE_URL = "https://petstore.swagger.io/v2"
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        metrics: Optional[RequestMetrics] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        cassette: Optional[Cassette] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        transport: Union[str, Transport] = "requests",
+        tracer: Optional[Tracer] = None,
+    ):
+        """
+        pool_connections - число хостов, для которых кешируются пулы соединений;
+        pool_maxsize - максимум соединений к одному хосту (pool_block=True заставляет
+        ждать свободное соединение вместо открытия лишних); timeout - таймаут сокета
+        (одно число или пара connect/read), применяется, если не передан явно;
+        cassette - запись ответов в кассету или воспроизведение из нее без сети;
+        cache - кеш ответов GET-запросов, сбрасываемый записями через этот клиент;
+        rate_limiter - бюджеты запросов в секунду (общий и по endpoint-ам);
+        concurrency - адаптивный предел запросов в полете, снижаемый при 429/5xx и росте задержки.
+        Текущие пределы доступны через limits() и пишутся в gauges метрик;
+        retry_policy - повторы идемпотентных запросов при сбоях соединения и 429/502/503/504;
+        circuit_breakers - быстрый отказ (CircuitOpenError) для недоступных endpoint-ов.
+        Исходы запросов с повторами и предохранителями копятся в resilience;
+        transport - "requests" (requests.Session), "raw" (HTTP/1.1 на сокетах, для высокой
+        интенсивности) или готовый Transport; настройки пула передаются транспорту по имени;
+        tracer - span-ы запросов с фазами (ожидание пределов, попытки, паузы повторов,
+        соединение, отправка, первый байт, тело) для просмотра в trace viewer.
+        """
         self.base_url = base_url or self.BASE_URL
-        self.session = requests.Session()
+        if isinstance(transport, str):
+            transport = make_transport(transport, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                       pool_block=pool_block, keep_alive=keep_alive)
+        self.transport = transport
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.metrics = metrics
+        self.cassette = cassette
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy
+        self.circuit_breakers = circuit_breakers
+        self.tracer = tracer
+        self.resilience = ResilienceStats()
+        self._listeners: List[ResponseListener] = []
+
+    @property
+    def session(self) -> requests.Session:
+        """requests.Session транспорта RequestsTransport (у других транспортов сессии нет)"""
+        return self.transport.session
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def limits(self) -> Dict[str, float]:
+        """Текущие пределы: "rate_limit <endpoint>" (запросов в секунду) и "concurrency_limit" """
+        limits: Dict[str, float] = {}
+        if self.rate_limiter is not None:
+            limits.update((f"rate_limit {key}", rate) for key, rate in self.rate_limiter.limits().items())
+        if self.concurrency is not None:
+            limits["concurrency_limit"] = self.concurrency.limit
+        return limits
+
+    def add_listener(self, listener: ResponseListener) -> None:
+        """listener(method, endpoint, kwargs, response) вызывается после каждого ответа сервера
+        (или кассеты); ответы из кеша не передаются"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ResponseListener) -> None:
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def isolated(self) -> Iterator["PetstoreAPIClient"]:
+        """Изоляция заголовков и cookies транспорта: изменения внутри блока откатываются при выходе"""
+        transport = self.transport
+        headers = transport.headers.copy()
+        cookies = transport.cookies.copy()
+        try:
+            yield self
+        finally:
+            transport.headers = headers
+            transport.cookies = cookies
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        if "json" in kwargs:
+            kwargs["json"] = to_json(kwargs["json"])
+        cache = self.cache
+        if cache is None or kwargs.get("stream"):
+            return self._request(method, endpoint, kwargs)
+
+        template = endpoint_template(endpoint)
+        if method == "GET":
+            if template not in CACHEABLE_TEMPLATES:
+                return self._request(method, endpoint, kwargs)
+            key = cache_key(endpoint, kwargs.get("params"))
+            response = cache.get(key)
+            if response is None:
+                since = cache.begin()
+                try:
+                    response = self._request(method, endpoint, kwargs)
+                    if response.status_code == 200:
+                        cache.put(key, response, read_tags(template, endpoint, kwargs.get("params"), response),
+                                  since)
+                finally:
+                    cache.end(since)
+            return response
+
+        try:
+            return self._request(method, endpoint, kwargs)
+        finally:
+            # Сбрасываем и при ошибке: запись могла дойти до сервера
+            tags = write_tags(method, template, endpoint, kwargs)
+            if tags is None:
+                cache.clear()
+            else:
+                cache.invalidate(tags)
+
+    def _request(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
+        tracer = self.tracer
+        if tracer is None:
+            return self._retrying(method, endpoint, kwargs)
+        template = endpoint_template(endpoint)
+        with tracer.request(f"{method} {template}", template) as span:
+            response = self._retrying(method, endpoint, kwargs)
+            span.tag(status=response.status_code)
+            return response
+
+    def _retrying(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
+        policy, breakers = self.retry_policy, self.circuit_breakers
+        if policy is None and breakers is None:
+            return self._attempt(method, endpoint, kwargs)
+
+        key = f"{method} {endpoint_template(endpoint)}"
+        retrying = policy is not None and policy.allows(method)
+        if retrying:
+            policy.budget.deposit()
+        delays = None
+        attempt = 1
+        while True:
+            response, error = None, None
+            try:
+                if breakers is not None:
+                    breakers.before(key)
+                with phase("attempt"):
+                    response = self._attempt(method, endpoint, kwargs)
+            except CircuitOpenError:
+                self.resilience.record(key, SHORT_CIRCUITED, attempt - 1)
+                raise
+            except requests.RequestException as exc:
+                error = exc
+            except BaseException:
+                # Запрос не состоялся (например, нет места под предел параллельности)
+                if breakers is not None:
+                    breakers.cancel(key)
+                raise
+            if breakers is not None:
+                breakers.record(key, response, error)
+
+            if not retrying or not policy.retryable(response, error):
+                failed = error is not None or response.status_code >= 500 or response.status_code == 429
+                outcome = FAILED if failed else OK if attempt == 1 else RECOVERED
+            elif attempt >= policy.max_attempts:
+                outcome = GAVE_UP
+            else:
+                if delays is None:
+                    delays = policy.delays()
+                delay = next(delays)
+                retry_after = policy.retry_after(response)
+                if retry_after is not None:
+                    delay = retry_after if retry_after <= policy.max_retry_after else None
+                if delay is not None and policy.budget.withdraw():
+                    if response is not None:
+                        response.close()
+                    with phase("retry_sleep"):
+                        policy.sleep(delay)
+                    attempt += 1
+                    continue
+                outcome = GAVE_UP if delay is None else BUDGET_EXHAUSTED
+            self.resilience.record(key, outcome, attempt - 1)
+            if error is not None:
+                raise error
+            return response
+
+    def _attempt(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
+        if self.rate_limiter is None and self.concurrency is None:
+            return self._timed(method, endpoint, kwargs)
+        template = endpoint_template(endpoint)
+        if self.rate_limiter is not None:
+            with phase("rate_limit_wait"):
+                self.rate_limiter.acquire(method, template)
+        concurrency = self.concurrency
+        started = 0.0
+        if concurrency is not None:
+            with phase("concurrency_wait"):
+                started = concurrency.acquire()
+        status_code = None
+        try:
+            response = self._timed(method, endpoint, kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            if concurrency is not None:
+                concurrency.release(started, status_code)
+            if self.metrics is not None:
+                for name, value in self.limits().items():
+                    self.metrics.set_gauge(name, value)
+
+    def _timed(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> requests.Response:
         url = f"{self.base_url}{endpoint}"
-        return self.session.request(method, url, **kwargs)
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        metrics = self.metrics
+        if metrics is None:
+            return self._send(method, endpoint, url, kwargs)
+
+        template = endpoint_template(endpoint)
+        start = time.perf_counter()
+        try:
+            response = self._send(method, endpoint, url, kwargs)
+        except requests.RequestException:
+            metrics.record(method, template, time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+        if kwargs.get("stream"):
+            received = int(response.headers.get("Content-Length") or 0)
+        else:
+            received = len(response.content)
+        metrics.record(method, template, elapsed, response.status_code,
+                       _body_size(response.request.body), received)
+        return response
+
+    def _send(self, method: str, endpoint: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        cassette = self.cassette
+        if cassette is None:
+            response = self.transport.request(method, url, **kwargs)
+        elif cassette.replaying:
+            response = cassette.play(method, endpoint, url, kwargs)
+        else:
+            response = self.transport.request(method, url, **kwargs)
+            cassette.record(method, endpoint, kwargs, response)
+        for listener in self._listeners:
+            listener(method, endpoint, kwargs, response)
+        return response
+
+    @staticmethod
+    def _as_model(response: requests.Response, model: type) -> Union[Model, List[Model]]:
+        """Тело успешного ответа в модель; при ошибке - requests.HTTPError"""
+        response.raise_for_status()
+        return decode(model, response.content)
 
-    def get_pet(self, pet_id: int) -> requests.Response:
-        return self._make_request("GET", f"/pet/{pet_id}")
+    def get_pet(self, pet_id: int, as_model: bool = False) -> Union[requests.Response, Pet]:
+        """as_model=True - вернуть Pet вместо ответа (HTTPError, если питомца нет)"""
+        response = self._make_request("GET", f"/pet/{pet_id}")
+        return self._as_model(response, Pet) if as_model else response
 
     def create_pet(self, pet_data: Dict[str, Any]) -> requests.Response:
         return self._make_request(
@@ -35,13 +341,38 @@ class PetstoreAPIClient:
     def delete_pet(self, pet_id: int) -> requests.Response:
         return self._make_request("DELETE", f"/pet/{pet_id}")
 
-    def find_pets_by_status(self, status: str) -> requests.Response:
+    def find_pets_by_status(self, status: str, as_model: bool = False) -> Union[requests.Response, List[Pet]]:
         """Поиск питомцев по статусу (available, pending, sold)"""
-        return self._make_request("GET", "/pet/findByStatus", params={"status": status})
+        response = self._make_request("GET", "/pet/findByStatus", params={"status": status})
+        return self._as_model(response, Pet) if as_model else response
 
-    def find_pets_by_tags(self, tags: list) -> requests.Response:
+    def find_pets_by_tags(self, tags: list, as_model: bool = False) -> Union[requests.Response, List[Pet]]:
         """Поиск питомцев по тегам"""
-        return self._make_request("GET", "/pet/findByTags", params={"tags": ",".join(tags)})
+        response = self._make_request("GET", "/pet/findByTags", params={"tags": ",".join(tags)})
+        return self._as_model(response, Pet) if as_model else response
+
+    def iter_pets_by_status(self, status: str, chunk_size: int = 65536,
+                            as_model: bool = False) -> Iterator[Union[Dict[str, Any], Pet]]:
+        """Питомцы с заданным статусом по одному, без загрузки всего ответа в память"""
+        return self._iter_array("/pet/findByStatus", {"status": status}, chunk_size, Pet if as_model else None)
+
+    def iter_pets_by_tags(self, tags: list, chunk_size: int = 65536,
+                          as_model: bool = False) -> Iterator[Union[Dict[str, Any], Pet]]:
+        """Питомцы с заданными тегами по одному, без загрузки всего ответа в память"""
+        return self._iter_array("/pet/findByTags", {"tags": ",".join(tags)}, chunk_size, Pet if as_model else None)
+
+    def _iter_array(self, endpoint: str, params: Dict[str, Any], chunk_size: int,
+                    model: Optional[type] = None) -> Iterator[Any]:
+        response = self._make_request("GET", endpoint, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            items = iter_json_array(response.iter_content(chunk_size), response.encoding or "utf-8")
+            if model is None:
+                yield from items
+            else:
+                yield from map(model.from_dict, items)
+        finally:
+            response.close()
 
     def update_pet_with_form(self, pet_id: int, name: str = None, status: str = None) -> requests.Response:
         """Обновление питомца через форму"""
@@ -57,25 +388,27 @@ class PetstoreAPIClient:
             headers={"Content-Type": "application/x-www-form-urlencoded"}
         )
 
-    def upload_pet_image(self, pet_id: int, file_path: str = None, additional_metadata: str = None) -> requests.Response:
-        """Загрузка изображения питомца"""
+    def upload_pet_image(
+        self,
+        pet_id: int,
+        file_path: str = None,
+        additional_metadata: str = None,
+        image: FileSource = None,
+        filename: str = None,
+    ) -> requests.Response:
+        """Загрузка изображения питомца из файла file_path или из буфера image (bytes, memoryview).
+
+        Тело уходит потоком (MultipartEncoder): файл отображается в память и не читается
+        целиком. Отсутствующий file_path - FileNotFoundError, а не загрузка без файла.
+        """
+        fields = {"additionalMetadata": additional_metadata} if additional_metadata else {}
+        source = file_path if file_path else image
         files = None
-        if file_path:
-            try:
-                with open(file_path, "rb") as f:
-                    files = {"file": f}
-                    data = {}
-                    if additional_metadata:
-                        data["additionalMetadata"] = additional_metadata
-                    return self._make_request("POST", f"/pet/{pet_id}/uploadImage", files=files, data=data)
-            except FileNotFoundError:
-                # Если файл не найден, отправляем без файла
-                pass
-        
-        data = {}
-        if additional_metadata:
-            data["additionalMetadata"] = additional_metadata
-        return self._make_request("POST", f"/pet/{pet_id}/uploadImage", files=files, data=data)
+        if source is not None:
+            files = {"file": (filename or (os.path.basename(file_path) if file_path else "image.png"), source)}
+        body = MultipartEncoder(fields, files)
+        return self._make_request("POST", f"/pet/{pet_id}/uploadImage", data=body,
+                                  headers={"Content-Type": body.content_type})
 
     # Store endpoints
     def get_store_inventory(self) -> requests.Response:
@@ -111,8 +444,9 @@ class PetstoreAPIClient:
             headers={"Content-Type": "application/json"}
         )
 
-    def get_user(self, username: str) -> requests.Response:
-        return self._make_request("GET", f"/user/{username}")
+    def get_user(self, username: str, as_model: bool = False) -> Union[requests.Response, User]:
+        response = self._make_request("GET", f"/user/{username}")
+        return self._as_model(response, User) if as_model else response
 
     def update_user(self, username: str, user_data: Dict[str, Any]) -> requests.Response:
         return self._make_request(
@@ -131,8 +465,9 @@ class PetstoreAPIClient:
     def logout_user(self) -> requests.Response:
         return self._make_request("GET", "/user/logout")
 
-    def get_store_order(self, order_id: int) -> requests.Response:
-        return self._make_request("GET", f"/store/order/{order_id}")
+    def get_store_order(self, order_id: int, as_model: bool = False) -> Union[requests.Response, Order]:
+        response = self._make_request("GET", f"/store/order/{order_id}")
+        return self._as_model(response, Order) if as_model else response
 
     def create_store_order(self, order_data: Dict[str, Any]) -> requests.Response:
         return self._make_request(
@@ -141,3 +476,57 @@ class PetstoreAPIClient:
             json=order_data,
             headers={"Content-Type": "application/json"}
         )
+
+    # Массовые операции
+    def bulk(
+        self,
+        name: str,
+        call: Callable[[Any], requests.Response],
+        items: Iterable[Any],
+        max_in_flight: Optional[int] = None,
+        ordered: bool = True,
+    ) -> BulkOperation:
+        """Применяет call к каждому элементу не более чем в max_in_flight потоках
+        (по умолчанию - размер пула соединений, чтобы потоки не ждали соединение)"""
+        return BulkOperation(name, call, items, max_in_flight or self.pool_maxsize, ordered)
+
+    def upload_pet_images(
+        self,
+        images: Iterable[Tuple[int, FileSource]],
+        additional_metadata: str = None,
+        max_in_flight: Optional[int] = None,
+        ordered: bool = True,
+    ) -> BulkOperation:
+        """Загрузка изображений из пар (ID питомца, путь или буфер). Пары берутся из
+        источника по мере освобождения слотов: с ленивым ImageDataGenerator.generate_batch
+        в памяти не больше max_in_flight изображений."""
+        return self.bulk(
+            "upload_pet_images",
+            lambda item: self.upload_pet_image(item[0], additional_metadata=additional_metadata,
+                                               **_image_source(item[1])),
+            images, max_in_flight, ordered,
+        )
+
+    def create_pets_bulk(self, pets: Iterable[Dict[str, Any]], max_in_flight: Optional[int] = None,
+                         ordered: bool = True) -> BulkOperation:
+        return self.bulk("create_pets", self.create_pet, pets, max_in_flight, ordered)
+
+    def delete_pets_bulk(self, pet_ids: Iterable[int], max_in_flight: Optional[int] = None,
+                         ordered: bool = True) -> BulkOperation:
+        return self.bulk("delete_pets", self.delete_pet, pet_ids, max_in_flight, ordered)
+
+    def create_orders_bulk(self, orders: Iterable[Dict[str, Any]], max_in_flight: Optional[int] = None,
+                           ordered: bool = True) -> BulkOperation:
+        return self.bulk("create_orders", self.create_store_order, orders, max_in_flight, ordered)
+
+    def delete_orders_bulk(self, order_ids: Iterable[int], max_in_flight: Optional[int] = None,
+                           ordered: bool = True) -> BulkOperation:
+        return self.bulk("delete_orders", self.delete_store_order, order_ids, max_in_flight, ordered)
+
+    def create_users_bulk(self, users: Iterable[Dict[str, Any]], max_in_flight: Optional[int] = None,
+                          ordered: bool = True) -> BulkOperation:
+        return self.bulk("create_users", self.create_user, users, max_in_flight, ordered)
+
+    def delete_users_bulk(self, usernames: Iterable[str], max_in_flight: Optional[int] = None,
+                          ordered: bool = True) -> BulkOperation:
+        return self.bulk("delete_users", self.delete_user, usernames, max_in_flight, ordered)
@@ -0,0 +1,201 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+import aiohttp
+
+from helpers.api_client import PetstoreAPIClient
+
+
+class AsyncResponse:
+    """Прочитанный ответ aiohttp с интерфейсом, похожим на requests.Response"""
+
+    __slots__ = ("status_code", "headers", "content", "url", "reason")
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes, url: str, reason: str = ""):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.reason = reason
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<AsyncResponse [{self.status_code}]>"
+
+
+AsyncResponseListener = Callable[[str, str, Dict[str, Any], AsyncResponse], None]
+
+
+class AsyncPetstoreAPIClient:
+    """Асинхронный аналог PetstoreAPIClient с общим пулом соединений и ограничением конкурентности"""
+
+    BASE_URL = PetstoreAPIClient.BASE_URL
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 100,
+        keepalive_timeout: float = 30.0,
+        timeout: Optional[float] = None,
+    ):
+        self.base_url = base_url or self.BASE_URL
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._listeners: List[AsyncResponseListener] = []
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Сессия создается лениво, внутри работающего event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def add_listener(self, listener: "AsyncResponseListener") -> None:
+        """listener(method, endpoint, kwargs, response) вызывается после каждого ответа,
+        как у синхронного клиента (например, CleanupRegistry.on_response)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: "AsyncResponseListener") -> None:
+        self._listeners.remove(listener)
+
+    async def __aenter__(self) -> "AsyncPetstoreAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> AsyncResponse:
+        url = f"{self.base_url}{endpoint}"
+        session = self.session
+        async with self._semaphore:
+            async with session.request(method, url, **kwargs) as response:
+                content = await response.read()
+                # copy() прокси заголовков aiohttp - изменяемая копия без учета регистра имен
+                result = AsyncResponse(response.status, response.headers.copy(), content, str(response.url),
+                                       response.reason or "")
+        for listener in self._listeners:
+            listener(method, endpoint, kwargs, result)
+        return result
+
+    async def gather(self, calls: Iterable[Awaitable[Any]], return_exceptions: bool = False) -> List[Any]:
+        """Одновременный запуск множества вызовов клиента; конкурентность ограничена max_concurrency"""
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def get_pet(self, pet_id: int) -> AsyncResponse:
+        return await self._make_request("GET", f"/pet/{pet_id}")
+
+    async def create_pet(self, pet_data: Dict[str, Any]) -> AsyncResponse:
+        return await self._make_request("POST", "/pet", json=pet_data)
+
+    async def update_pet(self, pet_data: Dict[str, Any]) -> AsyncResponse:
+        return await self._make_request("PUT", "/pet", json=pet_data)
+
+    async def delete_pet(self, pet_id: int) -> AsyncResponse:
+        return await self._make_request("DELETE", f"/pet/{pet_id}")
+
+    async def find_pets_by_status(self, status: str) -> AsyncResponse:
+        """Поиск питомцев по статусу (available, pending, sold)"""
+        return await self._make_request("GET", "/pet/findByStatus", params={"status": status})
+
+    async def find_pets_by_tags(self, tags: list) -> AsyncResponse:
+        """Поиск питомцев по тегам"""
+        return await self._make_request("GET", "/pet/findByTags", params={"tags": ",".join(tags)})
+
+    async def update_pet_with_form(self, pet_id: int, name: str = None, status: str = None) -> AsyncResponse:
+        """Обновление питомца через форму"""
+        data = {}
+        if name:
+            data["name"] = name
+        if status:
+            data["status"] = status
+        return await self._make_request("POST", f"/pet/{pet_id}", data=data)
+
+    async def upload_pet_image(
+        self,
+        pet_id: int,
+        file_path: str = None,
+        additional_metadata: str = None,
+        image: bytes = None,
+        filename: str = None,
+    ) -> AsyncResponse:
+        """Загрузка изображения питомца из файла file_path или из буфера image"""
+        form = aiohttp.FormData()
+        if additional_metadata:
+            form.add_field("additionalMetadata", additional_metadata)
+        if file_path:
+            # Файл открывается в пуле потоков, и aiohttp читает его там же по частям:
+            # event loop не блокируется, а в памяти держится один фрагмент файла.
+            # Отсутствующий файл - FileNotFoundError, как в синхронном клиенте
+            f = await asyncio.get_running_loop().run_in_executor(None, open, file_path, "rb")
+            try:
+                form.add_field("file", f, filename=filename or file_path.rsplit("/", 1)[-1])
+                return await self._make_request("POST", f"/pet/{pet_id}/uploadImage", data=form)
+            finally:
+                f.close()
+        if image is not None:
+            form.add_field("file", image, filename=filename or "image.png", content_type="image/png")
+        return await self._make_request("POST", f"/pet/{pet_id}/uploadImage", data=form)
+
+    # Store endpoints
+    async def get_store_inventory(self) -> AsyncResponse:
+        """Получение инвентаря магазина"""
+        return await self._make_request("GET", "/store/inventory")
+
+    async def delete_store_order(self, order_id: int) -> AsyncResponse:
+        """Удаление заказа"""
+        return await self._make_request("DELETE", f"/store/order/{order_id}")
+
+    async def get_store_order(self, order_id: int) -> AsyncResponse:
+        return await self._make_request("GET", f"/store/order/{order_id}")
+
+    async def create_store_order(self, order_data: Dict[str, Any]) -> AsyncResponse:
+        return await self._make_request("POST", "/store/order", json=order_data)
+
+    # User endpoints
+    async def create_user(self, user_data: Dict[str, Any]) -> AsyncResponse:
+        return await self._make_request("POST", "/user", json=user_data)
+
+    async def create_users_with_array(self, users: Any) -> AsyncResponse:
+        return await self._make_request("POST", "/user/createWithArray", json=users)
+
+    async def create_users_with_list(self, users: Any) -> AsyncResponse:
+        return await self._make_request("POST", "/user/createWithList", json=users)
+
+    async def get_user(self, username: str) -> AsyncResponse:
+        return await self._make_request("GET", f"/user/{username}")
+
+    async def update_user(self, username: str, user_data: Dict[str, Any]) -> AsyncResponse:
+        return await self._make_request("PUT", f"/user/{username}", json=user_data)
+
+    async def delete_user(self, username: str) -> AsyncResponse:
+        return await self._make_request("DELETE", f"/user/{username}")
+
+    async def login_user(self, username: str, password: str) -> AsyncResponse:
+        return await self._make_request("GET", "/user/login", params={"username": username, "password": password})
+
+    async def logout_user(self) -> AsyncResponse:
+        return await self._make_request("GET", "/user/logout")
@@ -0,0 +1,230 @@
+"""
+Статистические бенчмарки вызовов клиента и генераторов.
+
+BenchmarkRunner делает несколько прогревочных вызовов (не учитываются), затем
+rounds измеренных. По выборке считаются медиана, перцентили и бутстреп-интервал
+для медианы. Файл baseline хранит выборки нескольких последних сессий: замеры
+внутри одной сессии коррелированы (раскладка памяти, seed хеширования, частота
+CPU), и разброс между сессиями заметно больше разброса внутри нее.
+
+Регрессия - это одновременно
+    статистически значимое замедление: U-критерий Манна-Уитни по объединенным
+    базовым выборкам дает p < alpha;
+    практически значимое: медиана больше медианы самой медленной базовой
+    сессии не менее чем в min_ratio раз.
+Поэтому шум одного запуска не роняет тест, а единичный медленный вызов
+не маскирует реальное замедление.
+"""
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class BenchmarkResult:
+    """Выборка длительностей одного бенчмарка, секунды"""
+
+    def __init__(self, name: str, samples: Sequence[float], warmup: int = 0):
+        if not samples:
+            raise ValueError("Benchmark needs at least one sample")
+        self.name = name
+        self.samples = list(samples)
+        self.warmup = warmup
+        self._sorted = sorted(self.samples)
+
+    @property
+    def rounds(self) -> int:
+        return len(self.samples)
+
+    @property
+    def median(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        mean = self.mean
+        return math.sqrt(sum((sample - mean) ** 2 for sample in self.samples) / (len(self.samples) - 1))
+
+    def percentile(self, percent: float) -> float:
+        """Перцентиль с линейной интерполяцией между соседними значениями"""
+        return _percentile(self._sorted, percent)
+
+    def median_interval(self, confidence: float = 0.95, resamples: int = 2000, seed: int = 0) -> Tuple[float, float]:
+        """Бутстреп-интервал для медианы (перцентильный метод)"""
+        rng = random.Random(seed)
+        size = len(self.samples)
+        medians = sorted(
+            _percentile(sorted(rng.choices(self.samples, k=size)), 50) for _ in range(resamples)
+        )
+        tail = (1 - confidence) / 2 * 100
+        return _percentile(medians, tail), _percentile(medians, 100 - tail)
+
+    def to_dict(self) -> Dict[str, Any]:
+        low, high = self.median_interval()
+        return {
+            "rounds": self.rounds,
+            "warmup": self.warmup,
+            "median": self.median,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "median_ci95": [low, high],
+            "samples": self.samples,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "BenchmarkResult":
+        return cls(name, data["samples"], data.get("warmup", 0))
+
+
+def _percentile(ordered: Sequence[float], percent: float) -> float:
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> Tuple[float, float]:
+    """U-статистика текущей выборки и одностороннее p-значение гипотезы "текущая медленнее".
+
+    Нормальное приближение с поправкой на связи и на непрерывность; для выборок
+    от ~8 значений его точности достаточно.
+    """
+    n1, n2 = len(baseline), len(current)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    start = 0
+    while start < len(combined):
+        end = start
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        rank = (start + end) / 2 + 1
+        for index in range(start, end + 1):
+            ranks[index] = rank
+        count = end - start + 1
+        ties += count ** 3 - count
+        start = end + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class Comparison:
+    """Сравнение текущей выборки с базовыми сессиями"""
+
+    def __init__(self, baseline: List[BenchmarkResult], current: BenchmarkResult, alpha: float, min_ratio: float):
+        if not baseline:
+            raise ValueError("Comparison needs at least one baseline session")
+        self.baseline = baseline
+        self.current = current
+        self.reference = max(session.median for session in baseline)
+        self.ratio = current.median / self.reference if self.reference else math.inf
+        pooled = [sample for session in baseline for sample in session.samples]
+        _, self.p_value = mann_whitney_u(pooled, current.samples)
+        self.regressed = self.p_value < alpha and self.ratio >= min_ratio
+
+    def describe(self) -> str:
+        return (f"{self.current.name}: median {self.current.median * 1000:.3f}ms vs baseline "
+                f"{self.reference * 1000:.3f}ms over {len(self.baseline)} session(s) "
+                f"(x{self.ratio:.2f}, p={self.p_value:.4f})")
+
+
+class BenchmarkRegression(AssertionError):
+    """Статистически значимое замедление относительно базовой выборки"""
+
+    def __init__(self, comparison: Comparison):
+        self.comparison = comparison
+        super().__init__(f"Performance regression: {comparison.describe()}")
+
+
+def load_baseline(path: str) -> Dict[str, List[BenchmarkResult]]:
+    """Базовые сессии по именам бенчмарков, от старых к новым"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        name: [BenchmarkResult.from_dict(name, session) for session in sessions]
+        for name, sessions in data["benchmarks"].items()
+    }
+
+
+def save_results(path: str, results: Dict[str, BenchmarkResult], history: int = 5) -> None:
+    """Добавляет сессию к файлу (если он есть), храня не больше history последних сессий"""
+    data: Dict[str, Any] = {"benchmarks": {}}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    for name, result in results.items():
+        sessions = data["benchmarks"].setdefault(name, [])
+        sessions.append(result.to_dict())
+        del sessions[:-history]
+    # Без фиксированного PYTHONHASHSEED разброс между сессиями заметно больше
+    data["hash_seed"] = os.environ.get("PYTHONHASHSEED")
+    data["benchmarks"] = dict(sorted(data["benchmarks"].items()))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+class BenchmarkRunner:
+    """Измеряет вызов func: warmup прогревочных и rounds измеренных запусков.
+
+    setup (если задан) вызывается перед каждым запуском вне замера и возвращает
+    кортеж аргументов для func - например, свежие данные для create или ID
+    только что созданной сущности для delete.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rounds: int = 20,
+        warmup: int = 3,
+        baseline: Optional[List[BenchmarkResult]] = None,
+        alpha: float = 0.01,
+        min_ratio: float = 1.25,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.name = name
+        self.rounds = rounds
+        self.warmup = warmup
+        self.baseline = baseline
+        self.alpha = alpha
+        self.min_ratio = min_ratio
+        self._clock = clock
+        self.result: Optional[BenchmarkResult] = None
+        self.comparison: Optional[Comparison] = None
+
+    def __call__(self, func: Callable[..., Any], *args, setup: Optional[Callable[[], tuple]] = None, **kwargs) -> Any:
+        """Результат последнего вызова func; при регрессии - BenchmarkRegression"""
+        if self.result is not None:
+            raise RuntimeError(f"Benchmark {self.name} has already been run")
+        clock = self._clock
+        samples: List[float] = []
+        value = None
+        for round_number in range(self.warmup + self.rounds):
+            call_args = setup() if setup is not None else args
+            start = clock()
+            value = func(*call_args, **kwargs)
+            elapsed = clock() - start
+            if round_number >= self.warmup:
+                samples.append(elapsed)
+        self.result = BenchmarkResult(self.name, samples, self.warmup)
+        if self.baseline:
+            self.comparison = Comparison(self.baseline, self.result, self.alpha, self.min_ratio)
+            if self.comparison.regressed:
+                raise BenchmarkRegression(self.comparison)
+        return value
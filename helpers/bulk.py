@@ -0,0 +1,152 @@
+"""
+Массовые операции клиента: ограниченное число запросов в полете и обратное давление.
+
+Элементы берутся из итерируемого источника (в том числе ленивого generate_batch)
+только по мере освобождения слотов, поэтому в памяти одновременно находится не
+больше max_in_flight элементов. Результаты отдаются потоком - в порядке входа
+или по мере завершения, а сводный отчет собирает ошибки по каждому элементу.
+"""
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import requests
+
+
+class BulkItemResult:
+    """Результат одного элемента: ответ сервера или исключение"""
+
+    __slots__ = ("index", "item", "response", "error")
+
+    def __init__(self, index: int, item: Any, response: Optional[requests.Response] = None,
+                 error: Optional[BaseException] = None):
+        self.index = index
+        self.item = item
+        self.response = response
+        self.error = error
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.response is not None and self.response.ok
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.error is not None:
+            reason = f"{type(self.error).__name__}: {self.error}"
+        else:
+            reason = self.response.text[:200]
+        return {"index": self.index, "item": self.item, "status_code": self.status_code, "reason": reason}
+
+
+class BulkReport:
+    """Сводка массовой операции: счетчики кодов ответа и неуспешные элементы"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0
+        self.succeeded = 0
+        self.status_codes: Counter = Counter()
+        self.failures: List[BulkItemResult] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def add(self, result: BulkItemResult) -> None:
+        self.total += 1
+        self.status_codes[result.status_code if result.error is None else "error"] += 1
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failures.append(result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": len(self.failures),
+            "status_codes": {str(code): count for code, count in self.status_codes.items()},
+            "failures": [failure.to_dict() for failure in sorted(self.failures, key=lambda f: f.index)],
+        }
+
+    def __repr__(self) -> str:
+        return f"BulkReport({self.name}: {self.succeeded}/{self.total} succeeded)"
+
+
+class BulkOperation:
+    """Ленивая массовая операция: запросы выполняются при итерации или вызове wait().
+
+    Итерация отдает BulkItemResult; при досрочном выходе из цикла еще не
+    отправленные элементы не берутся из источника, а ожидающие отменяются.
+    """
+
+    def __init__(self, name: str, call: Callable[[Any], requests.Response], items: Iterable[Any],
+                 max_in_flight: int = 10, ordered: bool = True):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+        self.report = BulkReport(name)
+        self._call = call
+        self._items = items
+        self._max_in_flight = max_in_flight
+        self._ordered = ordered
+        self._started = False
+
+    def _run_one(self, index: int, item: Any) -> BulkItemResult:
+        try:
+            return BulkItemResult(index, item, response=self._call(item))
+        except Exception as error:
+            return BulkItemResult(index, item, error=error)
+
+    def __iter__(self) -> Iterator[BulkItemResult]:
+        if self._started:
+            raise RuntimeError("BulkOperation can only be consumed once")
+        self._started = True
+        source = enumerate(self._items)
+        with ThreadPoolExecutor(max_workers=self._max_in_flight, thread_name_prefix="petstore-bulk") as executor:
+            pending: Deque[Future] = deque()
+            try:
+                for index, item in source:
+                    pending.append(executor.submit(self._run_one, index, item))
+                    if len(pending) >= self._max_in_flight:
+                        break
+                results = self._drain_ordered if self._ordered else self._drain_completed
+                for result in results(executor, source, pending):
+                    self.report.add(result)
+                    yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _drain_ordered(self, executor: ThreadPoolExecutor, source: Iterator[Tuple[int, Any]],
+                       pending: Deque[Future]) -> Iterator[BulkItemResult]:
+        while pending:
+            result = pending[0].result()
+            pending.popleft()
+            next_item = next(source, None)
+            if next_item is not None:
+                pending.append(executor.submit(self._run_one, *next_item))
+            yield result
+
+    def _drain_completed(self, executor: ThreadPoolExecutor, source: Iterator[Tuple[int, Any]],
+                         pending: Deque[Future]) -> Iterator[BulkItemResult]:
+        in_flight: Set[Future] = set(pending)
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            pending.clear()
+            for future in done:
+                next_item = next(source, None)
+                if next_item is not None:
+                    in_flight.add(executor.submit(self._run_one, *next_item))
+            pending.extend(in_flight)
+            for future in done:
+                yield future.result()
+
+    def wait(self) -> BulkReport:
+        """Выполняет операцию целиком и возвращает отчет"""
+        for _ in self:
+            pass
+        return self.report
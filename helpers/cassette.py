@@ -0,0 +1,246 @@
+"""
+Запись и воспроизведение HTTP-взаимодействий клиента (кассеты).
+
+Кассета - два файла:
+    <path>      - записи подряд: заголовок записи, JSON заголовков ответа и тело;
+    <path>.idx  - хеш-таблица с открытой адресацией: 64-битный хеш ключа -> смещение записи.
+При воспроизведении оба файла отображаются в память (mmap), поэтому поиск стоит
+одного-двух обращений к странице и не требует загрузки кассеты в RAM.
+
+Ключ записи - BLAKE2b от нормализованных метода, пути endpoint-а, параметров и
+тела запроса плюс порядковый номер повторения того же запроса: повторный GET
+после DELETE воспроизводит именно второй ответ.
+"""
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from helpers.multipart import MultipartEncoder
+
+DATA_MAGIC = b"PSCASS01"
+INDEX_MAGIC = b"PSIDX001"
+RECORD_HEADER = struct.Struct("<16sHII")
+INDEX_HEADER = struct.Struct("<8sQQ")
+INDEX_SLOT = struct.Struct("<QQ")
+
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+class CassetteMiss(LookupError):
+    """Запрос не найден в кассете в режиме воспроизведения"""
+
+
+def _normalize_body(kwargs: Dict[str, Any]) -> Any:
+    if kwargs.get("json") is not None:
+        return ["json", kwargs["json"]]
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        data = sorted((str(key), str(value)) for key, value in data.items())
+    elif isinstance(data, bytes):
+        data = hashlib.blake2b(data, digest_size=16).hexdigest()
+    elif isinstance(data, MultipartEncoder):
+        data = ["multipart", data.fingerprint()]
+    files = []
+    for name, value in sorted((kwargs.get("files") or {}).items()):
+        if isinstance(value, tuple):
+            value = value[1]
+        if hasattr(value, "read"):
+            position = value.tell()
+            content = value.read()
+            value.seek(position)
+        else:
+            content = value
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        files.append([name, hashlib.blake2b(content or b"", digest_size=16).hexdigest()])
+    return ["data", data, files]
+
+
+def request_key(method: str, endpoint: str, kwargs: Dict[str, Any]) -> bytes:
+    """Нормализованное представление запроса (без хоста, чтобы кассета не зависела от base_url)"""
+    params = kwargs.get("params") or {}
+    normalized = [
+        method.upper(),
+        endpoint,
+        sorted((str(key), str(value)) for key, value in params.items()),
+        _normalize_body(kwargs),
+    ]
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _digests(key: bytes) -> Tuple[bytes, Callable[[int], bytes]]:
+    """16-байтный дайджест запроса и функция дайджеста его повторения с номером ordinal.
+
+    Ключ хешируется один раз: дайджест повторения продолжает то же состояние
+    BLAKE2b, что равносильно хешу key + b"#<ordinal>".
+    """
+    hasher = hashlib.blake2b(key, digest_size=16)
+
+    def repeat(ordinal: int) -> bytes:
+        repeated = hasher.copy()
+        repeated.update(b"#%d" % ordinal)
+        return repeated.digest()
+
+    return hasher.digest(), repeat
+
+
+class Cassette:
+    """Кассета в режиме записи (mode="record") или воспроизведения (mode="replay")"""
+
+    def __init__(self, path: str, mode: str = "replay", allow_repeats: bool = True):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.allow_repeats = allow_repeats
+        self.hits = 0
+        self.misses: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        # Счетчики повторений и последние смещения - по дайджесту запроса, а не по
+        # нормализованному запросу: тела загрузок не держатся в памяти до конца прогона
+        self._ordinals: Dict[bytes, int] = {}
+        self._last_offsets: Dict[bytes, int] = {}
+        if mode == "record":
+            self._data = open(path, "wb")
+            self._data.write(DATA_MAGIC)
+            self._entries = array("Q")
+        else:
+            self._open_for_replay()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        if self.mode == "record":
+            return len(self._entries) // 2
+        return self._count
+
+    # Запись
+    def record(self, method: str, endpoint: str, kwargs: Dict[str, Any], response: requests.Response) -> None:
+        request_digest, repeat = _digests(request_key(method, endpoint, kwargs))
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+        headers_json = json.dumps(headers).encode("utf-8")
+        body = response.content or b""
+        with self._lock:
+            ordinal = self._ordinals.get(request_digest, 0)
+            self._ordinals[request_digest] = ordinal + 1
+            digest = repeat(ordinal)
+            offset = self._data.tell()
+            self._data.write(RECORD_HEADER.pack(digest, response.status_code, len(headers_json), len(body)))
+            self._data.write(headers_json)
+            self._data.write(body)
+            self._entries.append(int.from_bytes(digest[:8], "little"))
+            self._entries.append(offset)
+
+    def _write_index(self) -> None:
+        count = len(self._entries) // 2
+        slots = 16
+        while slots < count * 2:
+            slots *= 2
+        table = array("Q", bytes(slots * INDEX_SLOT.size))
+        mask = slots - 1
+        entries = self._entries
+        for i in range(0, len(entries), 2):
+            key_hash, offset = entries[i], entries[i + 1]
+            slot = key_hash & mask
+            while table[slot * 2 + 1]:
+                slot = (slot + 1) & mask
+            table[slot * 2] = key_hash
+            # Смещение хранится +1: ноль означает пустой слот
+            table[slot * 2 + 1] = offset + 1
+        if sys.byteorder != "little":
+            table.byteswap()
+        with open(self.path + ".idx", "wb") as index:
+            index.write(INDEX_HEADER.pack(INDEX_MAGIC, slots, count))
+            table.tofile(index)
+
+    # Воспроизведение
+    def _open_for_replay(self) -> None:
+        self._data_file = open(self.path, "rb")
+        self._index_file = open(self.path + ".idx", "rb")
+        self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data_map[:len(DATA_MAGIC)] != DATA_MAGIC:
+            raise ValueError(f"{self.path} is not a cassette")
+        magic, self._slots, self._count = INDEX_HEADER.unpack_from(self._index_map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{self.path}.idx is not a cassette index")
+
+    def _find(self, digest: bytes) -> Optional[int]:
+        key_hash = int.from_bytes(digest[:8], "little")
+        mask = self._slots - 1
+        slot = key_hash & mask
+        while True:
+            stored_hash, offset = INDEX_SLOT.unpack_from(self._index_map, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if not offset:
+                return None
+            if stored_hash == key_hash and self._data_map[offset - 1:offset - 1 + 16] == digest:
+                return offset - 1
+            slot = (slot + 1) & mask
+
+    def _response_at(self, offset: int, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        _, status, headers_length, body_length = RECORD_HEADER.unpack_from(self._data_map, offset)
+        start = offset + RECORD_HEADER.size
+        headers = json.loads(self._data_map[start:start + headers_length])
+        body = self._data_map[start + headers_length:start + headers_length + body_length]
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers["Content-Length"] = str(body_length)
+        response._content = body
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        # Запрос собирается как при реальной отправке, чтобы тело и заголовки были доступны метрикам
+        response.request = requests.Request(
+            method, url,
+            params=kwargs.get("params"),
+            data=kwargs.get("data"),
+            json=kwargs.get("json"),
+            files=kwargs.get("files"),
+            headers=kwargs.get("headers"),
+        ).prepare()
+        response.url = response.request.url
+        return response
+
+    def play(self, method: str, endpoint: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        request_digest, repeat = _digests(request_key(method, endpoint, kwargs))
+        with self._lock:
+            ordinal = self._ordinals.get(request_digest, 0)
+            self._ordinals[request_digest] = ordinal + 1
+            offset = self._find(repeat(ordinal))
+            if offset is None and self.allow_repeats:
+                # Запрос повторили чаще, чем при записи - отдаем последний записанный ответ
+                offset = self._last_offsets.get(request_digest)
+            if offset is None:
+                self.misses.append((method, endpoint))
+                raise CassetteMiss(f"{method} {endpoint} (#{ordinal}) is not recorded in {self.path}")
+            self._last_offsets[request_digest] = offset
+            self.hits += 1
+        return self._response_at(offset, method, url, kwargs)
+
+    def close(self) -> None:
+        if self.mode == "record":
+            if not self._data.closed:
+                self._data.close()
+                self._write_index()
+        else:
+            self._data_map.close()
+            self._index_map.close()
+            self._data_file.close()
+            self._index_file.close()
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
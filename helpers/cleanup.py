@@ -0,0 +1,158 @@
+"""
+Отложенная параллельная очистка сущностей, созданных тестами.
+
+CleanupRegistry подписывается на ответы клиента: каждое успешное создание
+питомца, заказа или пользователя запоминается, успешное удаление - забывается.
+Накопленные сущности удаляются массовыми операциями клиента с ограниченным
+числом запросов в полете - по достижении порога (checkpoint) и в конце сессии
+(flush). Закрепленные сущности (pin), например из пула, удаляются только
+финальной очисткой. Все, что удалить не удалось, попадает в failures.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from helpers.api_client import PetstoreAPIClient, endpoint_template
+
+KINDS = ("pets", "orders", "users")
+
+
+class CleanupFailure:
+    __slots__ = ("kind", "key", "status_code", "reason")
+
+    def __init__(self, kind: str, key: Any, status_code: Optional[int], reason: str):
+        self.kind = kind
+        self.key = key
+        self.status_code = status_code
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"CleanupFailure({self.kind} {self.key}: {self.status_code} {self.reason})"
+
+
+def _json(response: requests.Response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class CleanupRegistry:
+    """Учет созданных через клиент сущностей и их массовое удаление"""
+
+    def __init__(self, client: PetstoreAPIClient, threshold: int = 500, max_in_flight: Optional[int] = None):
+        self.client = client
+        self.threshold = threshold
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        # dict вместо set: порядок удаления совпадает с порядком создания
+        self._tracked: Dict[str, Dict[Any, None]] = {kind: {} for kind in KINDS}
+        self._pinned: Dict[str, Dict[Any, None]] = {kind: {} for kind in KINDS}
+        self.deleted = 0
+        self.flushes = 0
+        self.failures: List[CleanupFailure] = []
+        client.add_listener(self.on_response)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(keys) for keys in self._tracked.values())
+
+    def detach(self) -> None:
+        self.client.remove_listener(self.on_response)
+
+    def on_response(self, method: str, endpoint: str, kwargs: Dict[str, Any], response: requests.Response) -> None:
+        if response.status_code != 200 or method == "GET":
+            return
+        template = endpoint_template(endpoint)
+        created: List[Tuple[str, Any]] = []
+        removed: List[Tuple[str, Any]] = []
+        body = kwargs.get("json")
+        if method in ("POST", "PUT") and template == "/pet":
+            pet = _json(response)
+            if isinstance(pet, dict) and pet.get("id") is not None:
+                created.append(("pets", pet["id"]))
+        elif method == "POST" and template == "/store/order":
+            order = _json(response)
+            if isinstance(order, dict) and order.get("id") is not None:
+                created.append(("orders", order["id"]))
+        elif method == "POST" and template in ("/user", "/user/createWithArray", "/user/createWithList"):
+            users = body if isinstance(body, list) else [body]
+            created.extend(("users", user["username"]) for user in users
+                           if isinstance(user, dict) and user.get("username") is not None)
+        elif method == "PUT" and template == "/user/{username}":
+            username = endpoint.rsplit("/", 1)[-1]
+            if isinstance(body, dict) and body.get("username") not in (None, username):
+                removed.append(("users", username))
+                created.append(("users", body["username"]))
+        elif method == "DELETE":
+            key = endpoint.rsplit("/", 1)[-1]
+            if template == "/pet/{petId}":
+                removed.append(("pets", int(key) if key.lstrip("-").isdigit() else key))
+            elif template == "/store/order/{orderId}":
+                removed.append(("orders", int(key) if key.lstrip("-").isdigit() else key))
+            elif template == "/user/{username}":
+                removed.append(("users", key))
+        if not created and not removed:
+            return
+        with self._lock:
+            for kind, key in removed:
+                self._tracked[kind].pop(key, None)
+                self._pinned[kind].pop(key, None)
+            for kind, key in created:
+                self._tracked[kind][key] = None
+
+    def track(self, kind: str, key: Any) -> None:
+        with self._lock:
+            self._tracked[kind][key] = None
+
+    def pin(self, kind: str, key: Any) -> None:
+        """Не удалять сущность до финальной очистки"""
+        with self._lock:
+            self._pinned[kind][key] = None
+
+    def checkpoint(self) -> int:
+        """Очистка, если число отслеживаемых сущностей достигло порога"""
+        if len(self) < self.threshold:
+            return 0
+        return self.flush()
+
+    def flush(self, include_pinned: bool = False) -> int:
+        """Удаляет отслеживаемые сущности; возвращает число удаленных"""
+        with self._lock:
+            batches = {}
+            for kind in KINDS:
+                tracked, pinned = self._tracked[kind], self._pinned[kind]
+                if include_pinned:
+                    batches[kind] = list(tracked)
+                    tracked.clear()
+                    pinned.clear()
+                else:
+                    batches[kind] = [key for key in tracked if key not in pinned]
+                    for key in batches[kind]:
+                        del tracked[key]
+        deleted = 0
+        delete_bulk = {
+            "pets": self.client.delete_pets_bulk,
+            "orders": self.client.delete_orders_bulk,
+            "users": self.client.delete_users_bulk,
+        }
+        for kind, keys in batches.items():
+            if not keys:
+                continue
+            for result in delete_bulk[kind](keys, max_in_flight=self.max_in_flight, ordered=False):
+                # 404 - сущность уже удалена кем-то другим, чистить нечего
+                if result.ok or result.status_code == 404:
+                    deleted += 1
+                elif result.error is not None:
+                    self._fail(kind, result.item, None, f"{type(result.error).__name__}: {result.error}")
+                else:
+                    self._fail(kind, result.item, result.status_code, result.response.text[:200])
+        with self._lock:
+            self.deleted += deleted
+            self.flushes += 1
+        return deleted
+
+    def _fail(self, kind: str, key: Any, status_code: Optional[int], reason: str) -> None:
+        with self._lock:
+            self.failures.append(CleanupFailure(kind, key, status_code, reason))
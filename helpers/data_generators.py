@@ -1,5 +1,57 @@
+import itertools
 import random
-from typing import Dict, Any, List
+import struct
+import zlib
+from typing import Dict, Any, Callable, Iterator, List, Optional, Union
+
+from helpers.id_allocator import IdAllocator, default_id_allocator
+from helpers.models import Model, Order, Pet, User, paused_gc
+
+BATCH_CHUNK_SIZE = 65536
+
+Batch = Union[List[Dict[str, Any]], Iterator[Dict[str, Any]], List[Model], Iterator[Model]]
+
+
+def _generate_batch(
+    build_chunk: Callable[[random.Random, List[int]], List[Dict[str, Any]]],
+    n: int,
+    seed: Optional[int],
+    lazy: bool,
+    chunk_size: int,
+    id_allocator: Optional[IdAllocator],
+    model: Optional[type] = None,
+) -> Batch:
+    """Общий каркас generate_batch: случайные поля тянутся пачками по chunk_size,
+    так что lazy-генератор держит в памяти не больше одной пачки.
+
+    ID берутся из id_allocator. Без него пакет с seed берет ID из области этого
+    seed у аллокатора процесса (IdAllocator.seeded): повтор с тем же seed
+    дает те же ID (и на сервере перезапишет те же сущности), а с другими seed,
+    пакетами без seed и другими воркерами ID не пересекаются.
+    С model пачка сразу переводится в модели, словари живут только внутри пачки.
+    """
+    rng = random.Random(seed)
+    if id_allocator is None and seed is not None:
+        id_allocator = default_id_allocator().seeded(seed)
+    sizes = [chunk_size] * (n // chunk_size) + ([n % chunk_size] if n % chunk_size else [])
+
+    def build(size: int) -> List[Dict[str, Any]]:
+        # Миллионы новых контейнеров подряд запускают циклический GC впустую:
+        # циклов здесь нет, поэтому на время сборки пачки он выключается
+        with paused_gc():
+            chunk = build_chunk(rng, (id_allocator or default_id_allocator()).allocate_many(size))
+            return chunk if model is None else list(map(model.from_dict, chunk))
+
+    def chunks() -> Iterator[Dict[str, Any]]:
+        for size in sizes:
+            yield from build(size)
+
+    if lazy:
+        return chunks()
+    result: List[Dict[str, Any]] = []
+    for size in sizes:
+        result.extend(build(size))
+    return result
 
 
 class PetDataGenerator:
@@ -35,7 +87,7 @@ class PetDataGenerator:
         tags: List[Dict[str, Any]] = None,
         photo_urls: List[str] = None
     ) -> Dict[str, Any]:
-        pet_id = pet_id or random.randint(100000, 999999)
+        pet_id = pet_id or default_id_allocator().allocate()
         name = name or random.choice(cls.NAMES)
         status = status or random.choice(cls.STATUSES)
         category = category or random.choice(cls.CATEGORIES)
@@ -55,6 +107,55 @@ class PetDataGenerator:
     def generate_minimal_pet_data(cls, pet_id: int = None) -> Dict[str, Any]:
         return cls.generate_pet_data(pet_id=pet_id)
 
+    @classmethod
+    def _tag_samples(cls):
+        # Все упорядоченные выборки random.sample(TAGS, k), k = 1..3, с весами,
+        # дающими то же распределение, что и generate_pet_data
+        population, cum_weights, total = [], [], 0.0
+        for size in (1, 2, 3):
+            permutations = list(itertools.permutations(cls.TAGS, size))
+            for permutation in permutations:
+                population.append(permutation)
+                total += 1 / 3 / len(permutations)
+                cum_weights.append(total)
+        return population, cum_weights
+
+    @classmethod
+    def _build_pet_chunk(cls, rng: random.Random, ids: List[int]) -> List[Dict[str, Any]]:
+        tag_population, tag_weights = cls._tag_samples()
+        photo_urls = {name: f"https://example.com/photos/{name.lower()}.jpg" for name in cls.NAMES}
+        size = len(ids)
+        names = rng.choices(cls.NAMES, k=size)
+        statuses = rng.choices(cls.STATUSES, k=size)
+        categories = rng.choices(cls.CATEGORIES, k=size)
+        tags = rng.choices(tag_population, cum_weights=tag_weights, k=size)
+        return [
+            {
+                "id": pet_id,
+                "name": name,
+                "status": status,
+                "category": category,
+                "tags": list(pet_tags),
+                "photoUrls": [photo_urls[name]],
+            }
+            for pet_id, name, status, category, pet_tags in zip(ids, names, statuses, categories, tags)
+        ]
+
+    @classmethod
+    def generate_batch(
+        cls,
+        n: int,
+        seed: int = None,
+        lazy: bool = False,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        id_allocator: IdAllocator = None,
+        as_model: bool = False,
+    ) -> Batch:
+        """n питомцев со схемой generate_pet_data; при lazy=True - ленивый генератор,
+        при as_model=True - модели Pet вместо словарей"""
+        model = Pet if as_model else None
+        return _generate_batch(cls._build_pet_chunk, n, seed, lazy, chunk_size, id_allocator, model)
+
 
 class OrderDataGenerator:
     @classmethod
@@ -67,13 +168,38 @@ class OrderDataGenerator:
         complete: bool = None
     ) -> Dict[str, Any]:
         return {
-            "id": order_id or random.randint(100000, 999999),
+            "id": order_id or default_id_allocator().allocate(),
             "petId": pet_id or random.randint(1, 100),
             "quantity": quantity or random.randint(1, 10),
             "status": status or "placed",
             "complete": complete if complete is not None else False
         }
 
+    @classmethod
+    def _build_order_chunk(cls, rng: random.Random, ids: List[int]) -> List[Dict[str, Any]]:
+        size = len(ids)
+        pet_ids = rng.choices(range(1, 101), k=size)
+        quantities = rng.choices(range(1, 11), k=size)
+        return [
+            {"id": order_id, "petId": pet_id, "quantity": quantity, "status": "placed", "complete": False}
+            for order_id, pet_id, quantity in zip(ids, pet_ids, quantities)
+        ]
+
+    @classmethod
+    def generate_batch(
+        cls,
+        n: int,
+        seed: int = None,
+        lazy: bool = False,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        id_allocator: IdAllocator = None,
+        as_model: bool = False,
+    ) -> Batch:
+        """n заказов со схемой generate_order_data; при lazy=True - ленивый генератор,
+        при as_model=True - модели Order вместо словарей"""
+        model = Order if as_model else None
+        return _generate_batch(cls._build_order_chunk, n, seed, lazy, chunk_size, id_allocator, model)
+
 
 class UserDataGenerator:
     USER_STATUSES = [0, 1]
@@ -100,10 +226,11 @@ class UserDataGenerator:
         phone: str = None,
         user_status: int = None,
     ) -> Dict[str, Any]:
-        user_id = user_id or random.randint(100000, 999999)
+        user_id = user_id or default_id_allocator().allocate()
         first_name = first_name or random.choice(cls.FIRST_NAMES)
         last_name = last_name or random.choice(cls.LAST_NAMES)
-        username = username or f"{first_name.lower()}_{last_name.lower()}_{random.randint(1000,9999)}"
+        # Уникальность username обеспечивает суффикс из уникального ID
+        username = username or f"{first_name.lower()}_{last_name.lower()}_{user_id}"
         email = email or f"{username}@example.com"
         password = password or f"P@ssw0rd{random.randint(100,999)}"
         phone = phone or f"+7{random.randint(9000000000, 9999999999)}"
@@ -119,3 +246,101 @@ class UserDataGenerator:
             "phone": phone,
             "userStatus": user_status,
         }
+
+    @classmethod
+    def _build_user_chunk(cls, rng: random.Random, ids: List[int]) -> List[Dict[str, Any]]:
+        # Строки, зависящие только от имени и фамилии, собираются один раз
+        names = [
+            (first_name, last_name, f"{first_name.lower()}_{last_name.lower()}_")
+            for first_name in cls.FIRST_NAMES
+            for last_name in cls.LAST_NAMES
+        ]
+        passwords = [f"P@ssw0rd{number}" for number in range(100, 1000)]
+        size = len(ids)
+        chosen_names = rng.choices(names, k=size)
+        chosen_passwords = rng.choices(passwords, k=size)
+        phones = rng.choices(range(9000000000, 10000000000), k=size)
+        statuses = rng.choices(cls.USER_STATUSES, k=size)
+        users = []
+        append = users.append
+        for user_id, (first_name, last_name, prefix), password, phone, user_status in zip(
+            ids, chosen_names, chosen_passwords, phones, statuses
+        ):
+            username = f"{prefix}{user_id}"
+            append({
+                "id": user_id,
+                "username": username,
+                "firstName": first_name,
+                "lastName": last_name,
+                "email": f"{username}@example.com",
+                "password": password,
+                "phone": f"+7{phone}",
+                "userStatus": user_status,
+            })
+        return users
+
+    @classmethod
+    def generate_batch(
+        cls,
+        n: int,
+        seed: int = None,
+        lazy: bool = False,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        id_allocator: IdAllocator = None,
+        as_model: bool = False,
+    ) -> Batch:
+        """n пользователей со схемой generate_user_data; при lazy=True - ленивый генератор,
+        при as_model=True - модели User вместо словарей"""
+        model = User if as_model else None
+        return _generate_batch(cls._build_user_chunk, n, seed, lazy, chunk_size, id_allocator, model)
+
+
+class ImageDataGenerator:
+    """Синтетические PNG в памяти для загрузки изображений питомцев"""
+
+    PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    @staticmethod
+    def _chunk(kind: bytes, payload: bytes) -> bytes:
+        return (struct.pack(">I", len(payload)) + kind + payload
+                + struct.pack(">I", zlib.crc32(kind + payload) & 0xFFFFFFFF))
+
+    @classmethod
+    def _build_png(cls, rng: random.Random, width: int, height: int, compress_level: int) -> bytes:
+        row_size = width * 3
+        # Случайные пиксели не сжимаются: размер файла задается размерами изображения,
+        # а по умолчанию (compress_level=0) zlib их просто копирует, не тратя время
+        pixels = rng.getrandbits(row_size * height * 8).to_bytes(row_size * height, "little")
+        # Каждой строке предшествует байт фильтра 0 (без фильтрации)
+        raw = b"".join(b"\x00" + pixels[offset:offset + row_size] for offset in range(0, len(pixels), row_size))
+        return b"".join((
+            cls.PNG_SIGNATURE,
+            cls._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+            cls._chunk(b"IDAT", zlib.compress(raw, compress_level)),
+            cls._chunk(b"IEND", b""),
+        ))
+
+    @classmethod
+    def generate_png(cls, width: int = 64, height: int = 64, seed: int = None, compress_level: int = 0) -> bytes:
+        """Корректный RGB PNG width x height со случайными пикселями"""
+        if width < 1 or height < 1:
+            raise ValueError("Image dimensions must be positive")
+        return cls._build_png(random.Random(seed), width, height, compress_level)
+
+    @classmethod
+    def generate_batch(
+        cls,
+        n: int,
+        width: int = 64,
+        height: int = 64,
+        seed: int = None,
+        lazy: bool = False,
+        compress_level: int = 0,
+    ) -> Union[List[bytes], Iterator[bytes]]:
+        """n разных PNG; при lazy=True - ленивый генератор, который держит в памяти
+        только отданные и еще не освобожденные изображения"""
+        if width < 1 or height < 1:
+            raise ValueError("Image dimensions must be positive")
+        rng = random.Random(seed)
+        images = (cls._build_png(rng, width, height, compress_level) for _ in range(n))
+        return images if lazy else list(images)
@@ -0,0 +1,206 @@
+"""
+Пул заранее созданных сущностей для тестов, которым достаточно прочитать готовые данные.
+
+Пул один раз создает N сущностей (массовой операцией клиента) и один раз ждет,
+пока все они станут видны через GET. Тесты берут сущности в аренду:
+    shared    - только чтение, одну сущность могут читать несколько тестов;
+    exclusive - тест может менять сущность; после возврата она восстанавливается
+                в исходное состояние повторным созданием (upsert).
+Если свободной для эксклюзивной аренды сущности нет, пул создает новую.
+Сущность, которую не удалось восстановить, выводится из оборота: ее состояние
+неизвестно, поэтому ее больше не получает ни одна аренда.
+"""
+import copy
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from helpers.data_generators import OrderDataGenerator, PetDataGenerator, UserDataGenerator
+from helpers.waiting import wait_until
+
+
+class Lease:
+    """Аренда сущности пула; entity - копия данных, ее можно свободно менять"""
+
+    def __init__(self, pool: "EntityPool", index: int, exclusive: bool):
+        self.pool = pool
+        self.index = index
+        self.exclusive = exclusive
+        self.entity = copy.deepcopy(pool.entities[index])
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.pool.release(self)
+
+    def __enter__(self) -> Dict[str, Any]:
+        return self.entity
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class EntityPool:
+    """Пул сущностей одного вида (питомцы, заказы или пользователи)"""
+
+    def __init__(
+        self,
+        name: str,
+        generate: Callable[[], Dict[str, Any]],
+        create: Callable[[Dict[str, Any]], requests.Response],
+        fetch: Callable[[Dict[str, Any]], requests.Response],
+        size: int = 5,
+        visibility_timeout: float = 20.0,
+        key_field: str = "id",
+    ):
+        self.name = name
+        self.key_field = key_field
+        self._generate = generate
+        self._create = create
+        self._fetch = fetch
+        self.size = size
+        self.visibility_timeout = visibility_timeout
+        self.entities: List[Dict[str, Any]] = []
+        self._shared: List[int] = []
+        self._exclusive: List[bool] = []
+        self._next_shared = 0
+        self._condition = threading.Condition()
+        self.created = 0
+        self.restored = 0
+        self.broken = 0
+        self._cleanup = None
+
+    @classmethod
+    def for_pets(cls, client, size: int = 5) -> "EntityPool":
+        return cls(
+            "pets",
+            lambda: PetDataGenerator.generate_pet_data(status="available"),
+            client.create_pet,
+            lambda pet: client.get_pet(pet["id"]),
+            size,
+        )
+
+    @classmethod
+    def for_orders(cls, client, size: int = 5) -> "EntityPool":
+        return cls(
+            "orders",
+            OrderDataGenerator.generate_order_data,
+            client.create_store_order,
+            lambda order: client.get_store_order(order["id"]),
+            size,
+        )
+
+    @classmethod
+    def for_users(cls, client, size: int = 5) -> "EntityPool":
+        return cls(
+            "users",
+            UserDataGenerator.generate_user_data,
+            client.create_user,
+            lambda user: client.get_user(user["username"]),
+            size,
+            key_field="username",
+        )
+
+    def pin_to(self, registry, kind: str) -> None:
+        """Закрепляет сущности пула (в том числе будущие) в CleanupRegistry до финальной очистки"""
+        with self._condition:
+            self._cleanup = (registry, kind)
+            for entity in self.entities:
+                registry.pin(kind, entity[self.key_field])
+
+    def warm(self, client) -> None:
+        """Создает недостающие до size сущности одной массовой операцией и ждет их видимости"""
+        with self._condition:
+            missing = [self._generate() for _ in range(self.size - len(self.entities))]
+        if not missing:
+            return
+        report = client.bulk(f"warm_{self.name}", self._create, missing).wait()
+        if not report.ok:
+            raise RuntimeError(f"Failed to create pooled {self.name}: {report.to_dict()['failures']}")
+        self._wait_visible(missing)
+        with self._condition:
+            for entity in missing:
+                self._add(entity)
+
+    def lease(self, exclusive: bool = False) -> Lease:
+        with self._condition:
+            if not exclusive:
+                index = self._pick_shared()
+                if index is not None:
+                    self._shared[index] += 1
+                    return Lease(self, index, exclusive=False)
+            else:
+                for index in range(len(self.entities)):
+                    if not self._exclusive[index] and not self._shared[index]:
+                        self._exclusive[index] = True
+                        return Lease(self, index, exclusive=True)
+        # Все сущности заняты - создаем новую вне блокировки
+        entity = self._generate()
+        response = self._create(entity)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to create pooled {self.name[:-1]}: {response.status_code} {response.text}")
+        self._wait_visible([entity])
+        with self._condition:
+            index = self._add(entity)
+            if exclusive:
+                self._exclusive[index] = True
+            else:
+                self._shared[index] += 1
+            return Lease(self, index, exclusive)
+
+    def release(self, lease: Lease) -> None:
+        restored = True
+        if lease.exclusive:
+            # Возвращаем исходное состояние: create для Petstore работает как upsert
+            entity = self.entities[lease.index]
+            try:
+                restored = self._create(entity).status_code == 200
+            except requests.RequestException:
+                restored = False
+            if self._cleanup is not None:
+                # Удаление в тесте снимает закрепление - восстанавливаем и его
+                registry, kind = self._cleanup
+                registry.pin(kind, entity[self.key_field])
+        with self._condition:
+            if lease.exclusive:
+                if restored:
+                    self.restored += 1
+                    self._exclusive[lease.index] = False
+                else:
+                    # Слот остается занятым навсегда: арендам достанутся другие или новые сущности
+                    self.broken += 1
+            else:
+                self._shared[lease.index] -= 1
+            self._condition.notify_all()
+
+    def _pick_shared(self) -> Optional[int]:
+        count = len(self.entities)
+        for offset in range(count):
+            index = (self._next_shared + offset) % count
+            if not self._exclusive[index]:
+                self._next_shared = index + 1
+                return index
+        return None
+
+    def _add(self, entity: Dict[str, Any]) -> int:
+        self.entities.append(entity)
+        self._shared.append(0)
+        self._exclusive.append(False)
+        self.created += 1
+        if self._cleanup is not None:
+            registry, kind = self._cleanup
+            registry.pin(kind, entity[self.key_field])
+        return len(self.entities) - 1
+
+    def _wait_visible(self, entities: List[Dict[str, Any]]) -> None:
+        pending = list(entities)
+
+        def check() -> List[Dict[str, Any]]:
+            pending[:] = [entity for entity in pending if self._fetch(entity).status_code != 200]
+            return pending
+
+        wait_until(check, lambda rest: not rest, timeout=self.visibility_timeout, name=f"pool_{self.name}")
+        if pending:
+            raise RuntimeError(f"{len(pending)} pooled {self.name} are not visible after {self.visibility_timeout}s")
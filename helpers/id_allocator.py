@@ -0,0 +1,179 @@
+"""
+Выдача уникальных ID для генерируемых сущностей без блокировок.
+
+53-битный ID (безопасен и для JavaScript-клиентов) состоит из:
+    бит 52      - признак явно заданного номера воркера;
+    биты 30..51 - слот: номер воркера (PETSTORE_WORKER_ID, pytest-xdist) или PID процесса;
+    биты 0..29  - порядковый номер в слоте, переставленный сетью Фейстеля,
+                  чтобы соседние ID не шли подряд.
+Слоты одновременно работающих процессов и воркеров не пересекаются, а счетчик
+внутри слота (itertools.count) атомарен под GIL, поэтому коллизий нет.
+
+Нижняя половина порядковых номеров слота выдается обычным порядком, верхняя
+делится на области для пакетов с seed (seeded): каждый seed получает свою
+область, и номера проходят через ту же перестановку слота. Перестановка -
+биекция, поэтому ID из разных областей не совпадают.
+"""
+import copy
+import functools
+import itertools
+import os
+import random
+import re
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional
+
+SEQUENCE_BITS = 30
+SLOT_BITS = 22
+EXPLICIT_WORKER_FLAG = 1 << (SEQUENCE_BITS + SLOT_BITS)
+SEEDED_REGION_BITS = 22
+SEEDED_REGIONS = 1 << (SEQUENCE_BITS - 1 - SEEDED_REGION_BITS)
+
+
+@functools.lru_cache(maxsize=16)
+def _round_tables(half_bits: int, key: Optional[int]) -> List[List[int]]:
+    rng = random.Random(key)
+    size = 1 << half_bits
+    return [[rng.getrandbits(half_bits) for _ in range(size)] for _ in range(4)]
+
+
+class FeistelPermutation:
+    """Биекция на [0, 2**bits) - сбалансированная сеть Фейстеля с табличными раундами.
+
+    Четное число раундов записывается как попеременное обновление половин
+    (left ^= F(right); right ^= F(left)), что эквивалентно классической схеме
+    с обменом половин и не требует перестановок кортежей.
+    """
+
+    def __init__(self, bits: int = SEQUENCE_BITS, key: Optional[int] = None):
+        if bits % 2:
+            raise ValueError("bits must be even")
+        self.bits = bits
+        self._half_bits = bits // 2
+        self._mask = (1 << self._half_bits) - 1
+        # Таблицы для явного ключа кешируются, случайные (key=None) строятся заново
+        if key is None:
+            self._tables = _round_tables.__wrapped__(self._half_bits, None)
+        else:
+            self._tables = _round_tables(self._half_bits, key)
+
+    def permute(self, value: int) -> int:
+        t0, t1, t2, t3 = self._tables
+        left, right = value >> self._half_bits, value & self._mask
+        left ^= t0[right]
+        right ^= t1[left]
+        left ^= t2[right]
+        right ^= t3[left]
+        return (left << self._half_bits) | right
+
+    def permute_many(self, values: Iterable[int], base: int = 0) -> List[int]:
+        """permute для последовательности значений, результат объединяется с base по OR"""
+        t0, t1, t2, t3 = self._tables
+        half_bits, mask = self._half_bits, self._mask
+        result = []
+        append = result.append
+        for value in values:
+            left, right = value >> half_bits, value & mask
+            left ^= t0[right]
+            right ^= t1[left]
+            left ^= t2[right]
+            right ^= t3[left]
+            append(base | (left << half_bits) | right)
+        return result
+
+    def inverse(self, value: int) -> int:
+        t0, t1, t2, t3 = self._tables
+        left, right = value >> self._half_bits, value & self._mask
+        right ^= t3[left]
+        left ^= t2[right]
+        right ^= t1[left]
+        left ^= t0[right]
+        return (left << self._half_bits) | right
+
+
+def worker_id_from_env() -> Optional[int]:
+    """Номер воркера из PETSTORE_WORKER_ID или PYTEST_XDIST_WORKER (gw0, gw1, ...)"""
+    value = os.environ.get("PETSTORE_WORKER_ID")
+    if value is not None:
+        return int(value)
+    match = re.fullmatch(r"gw(\d+)", os.environ.get("PYTEST_XDIST_WORKER", ""))
+    return int(match.group(1)) if match else None
+
+
+class IdAllocator:
+    """Уникальные ID из непересекающегося диапазона воркера или процесса"""
+
+    def __init__(self, worker_id: Optional[int] = None, key: Optional[int] = None):
+        if worker_id is None:
+            worker_id = worker_id_from_env()
+        self.pid = os.getpid()
+        if worker_id is None:
+            slot, flag = self.pid, 0
+        else:
+            slot, flag = worker_id, EXPLICIT_WORKER_FLAG
+        if not 0 <= slot < 1 << SLOT_BITS:
+            raise ValueError(f"Worker slot {slot} does not fit into {SLOT_BITS} bits")
+        self.worker_id = worker_id
+        self.base = flag | (slot << SEQUENCE_BITS)
+        self.capacity = 1 << (SEQUENCE_BITS - 1)
+        self._end = self.capacity
+        self._permutation = FeistelPermutation(SEQUENCE_BITS, key)
+        self._counter = itertools.count()
+        self._seeded: Dict[Hashable, int] = {}
+        self._seeded_lock = threading.Lock()
+
+    def allocate(self) -> int:
+        sequence = next(self._counter)
+        if sequence >= self._end:
+            raise RuntimeError("ID range of this worker is exhausted")
+        return self.base | self._permutation.permute(sequence)
+
+    def allocate_many(self, n: int) -> List[int]:
+        sequences = list(itertools.islice(self._counter, n))
+        if sequences and sequences[-1] >= self._end:
+            raise RuntimeError("ID range of this worker is exhausted")
+        return self._permutation.permute_many(sequences, self.base)
+
+    def seeded(self, seed: Hashable) -> "IdAllocator":
+        """Аллокатор области seed в этом слоте: при каждом вызове с тем же seed выдает
+        те же ID, не пересекающиеся ни с обычными ID слота, ни с областями других seed"""
+        with self._seeded_lock:
+            region = self._seeded.setdefault(seed, len(self._seeded))
+        if region >= SEEDED_REGIONS:
+            raise RuntimeError(f"No free seeded ID region for seed {seed!r} ({SEEDED_REGIONS} seeds in use)")
+        allocator = copy.copy(self)
+        start = (1 << (SEQUENCE_BITS - 1)) + (region << SEEDED_REGION_BITS)
+        allocator.capacity = 1 << SEEDED_REGION_BITS
+        allocator._end = start + allocator.capacity
+        allocator._counter = itertools.count(start)
+        allocator._seeded = {}
+        allocator._seeded_lock = threading.Lock()
+        return allocator
+
+    def owns(self, value: int) -> bool:
+        """Принадлежит ли ID диапазону этого аллокатора"""
+        return value >> SEQUENCE_BITS == self.base >> SEQUENCE_BITS
+
+
+_default_allocator: Optional[IdAllocator] = None
+_default_allocator_lock = threading.Lock()
+
+
+def default_id_allocator() -> IdAllocator:
+    """Аллокатор текущего процесса; после fork пересоздается под новый PID"""
+    global _default_allocator
+    allocator = _default_allocator
+    if allocator is None or allocator.pid != os.getpid():
+        # Блокировка только на создание: два аллокатора одного слота выдали бы одинаковые ID
+        with _default_allocator_lock:
+            allocator = _default_allocator
+            if allocator is None or allocator.pid != os.getpid():
+                allocator = _default_allocator = IdAllocator()
+    return allocator
+
+
+def set_default_id_allocator(allocator: Optional[IdAllocator]) -> None:
+    """Подменяет аллокатор процесса (None - вернуть аллокатор по умолчанию)"""
+    global _default_allocator
+    with _default_allocator_lock:
+        _default_allocator = allocator
@@ -0,0 +1,161 @@
+"""
+Сверка GET /store/inventory с ожидаемыми счетчиками статусов питомцев.
+
+InventoryReconciler подписывается на ответы клиента и ведет ожидаемые счетчики
+инкрементально: базовый снимок инвентаря плюс изменения от успешных
+create_pet, update_pet, update_pet_with_form и delete_pet (в том числе из
+массовых операций). Для каждого питомца помнится только последний статус,
+поэтому мутация стоит O(1), а сверка - один запрос инвентаря вместо полного
+перебора findByStatus.
+
+Изменения питомцев, чей статус неизвестен (созданных до базового снимка или
+другим клиентом), в счетчики не попадают и считаются в untracked. Записи
+других клиентов и запросы, еще находящиеся в полете во время сверки, тоже
+видны как расхождение - на общем сервере сверку стоит ограничивать
+статусами, которые использует только этот прогон.
+"""
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from helpers.api_client import PetstoreAPIClient, endpoint_template
+
+
+class InventoryDrift:
+    __slots__ = ("status", "expected", "actual")
+
+    def __init__(self, status: str, expected: int, actual: int):
+        self.status = status
+        self.expected = expected
+        self.actual = actual
+
+    @property
+    def drift(self) -> int:
+        """Сколько питомцев со статусом на сервере сверх ожидаемого (меньше нуля - недостает)"""
+        return self.actual - self.expected
+
+    def __repr__(self) -> str:
+        return f"InventoryDrift({self.status}: expected={self.expected} actual={self.actual})"
+
+
+class InventoryReport:
+    """Результат сверки: расхождения по статусам и число неучтенных мутаций"""
+
+    def __init__(self, expected: Dict[str, int], actual: Dict[str, int], drifts: List[InventoryDrift],
+                 untracked: int):
+        self.expected = expected
+        self.actual = actual
+        self.drifts = drifts
+        self.untracked = untracked
+
+    @property
+    def ok(self) -> bool:
+        return not self.drifts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "untracked": self.untracked,
+            "drifts": {drift.status: {"expected": drift.expected, "actual": drift.actual, "drift": drift.drift}
+                       for drift in self.drifts},
+        }
+
+
+def _json(response: requests.Response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _pet_id(endpoint: str) -> Optional[int]:
+    key = endpoint.rsplit("/", 1)[-1]
+    return int(key) if key.lstrip("-").isdigit() else None
+
+
+class InventoryReconciler:
+    """Ожидаемые счетчики инвентаря по мутациям питомцев через клиент и их сверка с сервером"""
+
+    def __init__(self, client: PetstoreAPIClient, baseline: Optional[Dict[str, int]] = None):
+        """baseline - инвентарь, от которого ведется счет; по умолчанию запрашивается у сервера"""
+        self.client = client
+        self._lock = threading.Lock()
+        # id питомца -> последний известный статус (None - статус не задан и в инвентарь не входит)
+        self._statuses: Dict[int, Optional[str]] = {}
+        self._expected: Counter = Counter(self._fetch() if baseline is None else baseline)
+        self.untracked = 0
+        client.add_listener(self.on_response)
+
+    def detach(self) -> None:
+        self.client.remove_listener(self.on_response)
+
+    def _fetch(self) -> Dict[str, int]:
+        response = self.client.get_store_inventory()
+        response.raise_for_status()
+        return response.json()
+
+    def expected(self) -> Dict[str, int]:
+        """Ожидаемый инвентарь (статусы с нулевым счетчиком опускаются, как у сервера)"""
+        with self._lock:
+            return {status: count for status, count in self._expected.items() if count}
+
+    def on_response(self, method: str, endpoint: str, kwargs: Dict[str, Any], response: requests.Response) -> None:
+        if response.status_code != 200 or method in ("GET", "HEAD"):
+            return
+        template = endpoint_template(endpoint)
+        if template == "/pet" and method in ("POST", "PUT"):
+            pet = _json(response)
+            if not isinstance(pet, dict):
+                pet = kwargs.get("json")
+            if isinstance(pet, dict) and isinstance(pet.get("id"), int):
+                self._set(pet["id"], pet.get("status"), create=method == "POST")
+        elif template == "/pet/{petId}" and method == "POST":
+            status = (kwargs.get("data") or {}).get("status")
+            pet_id = _pet_id(endpoint)
+            if status is not None and pet_id is not None:
+                self._set(pet_id, status, create=False)
+        elif template == "/pet/{petId}" and method == "DELETE":
+            pet_id = _pet_id(endpoint)
+            if pet_id is not None:
+                self._remove(pet_id)
+
+    def _set(self, pet_id: int, status: Optional[str], create: bool) -> None:
+        with self._lock:
+            if pet_id in self._statuses:
+                previous = self._statuses[pet_id]
+                if previous is not None:
+                    self._expected[previous] -= 1
+            elif not create:
+                # Прежний статус неизвестен - не угадываем ни уменьшение, ни увеличение
+                self.untracked += 1
+                return
+            self._statuses[pet_id] = status
+            if status is not None:
+                self._expected[status] += 1
+
+    def _remove(self, pet_id: int) -> None:
+        with self._lock:
+            if pet_id not in self._statuses:
+                self.untracked += 1
+                return
+            status = self._statuses.pop(pet_id)
+            if status is not None:
+                self._expected[status] -= 1
+
+    def reconcile(self, statuses: Optional[Iterable[str]] = None) -> InventoryReport:
+        """Один запрос инвентаря и сравнение с ожидаемым; statuses - сверять только эти статусы"""
+        actual = self._fetch()
+        expected = self.expected()
+        keys = sorted(set(actual) | set(expected)) if statuses is None else sorted(set(statuses))
+        drifts = [InventoryDrift(status, expected.get(status, 0), actual.get(status, 0)) for status in keys
+                  if expected.get(status, 0) != actual.get(status, 0)]
+        return InventoryReport(expected, actual, drifts, self.untracked)
+
+    def rebase(self, inventory: Optional[Dict[str, int]] = None) -> None:
+        """Принять текущий инвентарь за новый базовый снимок (известные статусы питомцев сохраняются)"""
+        inventory = self._fetch() if inventory is None else inventory
+        with self._lock:
+            self._expected = Counter(inventory)
+            self.untracked = 0
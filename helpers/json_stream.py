@@ -0,0 +1,163 @@
+"""
+Потоковый разбор JSON-массива верхнего уровня: элементы отдаются по одному по мере
+поступления байтов, весь ответ целиком в памяти не держится.
+
+Каждый элемент разбирается стандартным json.JSONDecoder.raw_decode, поэтому
+семантика значений совпадает с response.json(); в буфере хранится только
+еще не разобранный хвост.
+"""
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, List
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+_decoder = json.JSONDecoder()
+_skip = re.compile(r"[ \t\n\r]*").match
+
+
+class JSONStreamError(ValueError):
+    """Поток не является корректным JSON-массивом"""
+
+
+class _Buffer:
+    """Неразобранный текст; новые куски копятся в списке и склеиваются только по запросу"""
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str):
+        self._source = iter(chunks)
+        self._decode = codecs.getincrementaldecoder(encoding)().decode
+        self._pending: List[str] = []
+        self._pending_length = 0
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    @property
+    def available(self) -> int:
+        return len(self.text) - self.pos + self._pending_length
+
+    def read(self) -> bool:
+        """Добавляет следующий кусок; False - поток закончился"""
+        if self.eof:
+            return False
+        chunk = next(self._source, None)
+        if chunk is None:
+            self.eof = True
+            text = self._decode(b"", final=True)
+        else:
+            text = self._decode(chunk)
+        self._pending.append(text)
+        self._pending_length += len(text)
+        return True
+
+    def join(self) -> None:
+        if self._pending:
+            self.text = self.text[self.pos:] + "".join(self._pending)
+            self.pos = 0
+            self._pending.clear()
+            self._pending_length = 0
+
+    def skip_whitespace(self) -> bool:
+        """Пропускает пробелы; False - данных больше нет"""
+        while True:
+            text, pos = self.text, self.pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return True
+            self.join()
+            if self.pos < len(self.text):
+                continue
+            if not self.read():
+                return False
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """Элементы JSON-массива из последовательности кусков байтов произвольной длины"""
+    buffer = _Buffer(chunks, encoding)
+    if not buffer.skip_whitespace():
+        raise JSONStreamError("Empty stream")
+    if buffer.text[buffer.pos] != "[":
+        raise JSONStreamError(f"Expected '[' at the start of the stream, got {buffer.text[buffer.pos]!r}")
+    buffer.pos += 1
+    first = True
+
+    while True:
+        if not buffer.skip_whitespace():
+            raise JSONStreamError("Stream ended before the end of the array")
+        if first and buffer.text[buffer.pos] == "]":
+            buffer.pos += 1
+            break
+
+        # Быстрый путь: подряд идущие элементы, целиком лежащие в текущем буфере
+        text, pos = buffer.text, buffer.pos
+        scan = _decoder.scan_once
+        closed = False
+        while True:
+            try:
+                value, end = scan(text, pos)
+            except (StopIteration, json.JSONDecodeError):
+                break
+            if end >= len(text) or text[end] not in _DELIMITERS:
+                break
+            separator_pos = end if text[end] in ",]" else _skip(text, end).end()
+            if separator_pos >= len(text):
+                break
+            separator = text[separator_pos]
+            if separator == ",":
+                pos = separator_pos + 1
+                if pos < len(text) and text[pos] in _WHITESPACE:
+                    pos = _skip(text, pos).end()
+                buffer.pos = pos
+                first = False
+                yield value
+            elif separator == "]":
+                buffer.pos = separator_pos + 1
+                closed = True
+                yield value
+                break
+            else:
+                raise JSONStreamError(f"Expected ',' or ']' after an array element, got {separator!r}")
+        if closed:
+            break
+        buffer.pos = pos
+        if not buffer.skip_whitespace():
+            raise JSONStreamError("Stream ended before the end of the array")
+
+        # Медленный путь: элемент на границе кусков. После неудачи ждем, пока хвост
+        # удвоится, чтобы большой элемент не разбирался заново на каждом новом куске
+        retry_at = 0
+        while True:
+            if buffer.available >= retry_at or buffer.eof:
+                buffer.join()
+                try:
+                    value, end = _decoder.raw_decode(buffer.text, buffer.pos)
+                except json.JSONDecodeError as error:
+                    if buffer.eof:
+                        raise JSONStreamError(f"Invalid array element: {error}") from None
+                    retry_at = 2 * buffer.available
+                else:
+                    # Элемент закончен, только если за ним виден разделитель:
+                    # число "-0" в конце куска может оказаться началом "-0.5"
+                    if buffer.eof or (end < len(buffer.text) and buffer.text[end] in _DELIMITERS):
+                        buffer.pos = end
+                        break
+                    retry_at = buffer.available + 1
+            if not buffer.read():
+                continue
+        yield value
+        first = False
+
+        if not buffer.skip_whitespace():
+            raise JSONStreamError("Stream ended before the end of the array")
+        separator = buffer.text[buffer.pos]
+        buffer.pos += 1
+        if separator == "]":
+            break
+        if separator != ",":
+            raise JSONStreamError(f"Expected ',' or ']' after an array element, got {separator!r}")
+
+    if buffer.skip_whitespace():
+        raise JSONStreamError(f"Unexpected data after the end of the array: {buffer.text[buffer.pos]!r}")
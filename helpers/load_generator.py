@@ -0,0 +1,346 @@
+"""
+Генератор нагрузки с открытой моделью поступления запросов.
+
+Запросы стартуют по расписанию прибытия (ramp-up -> steady -> ramp-down),
+не дожидаясь завершения предыдущих, поэтому задержки измеряются от
+запланированного момента старта и включают очередь на стороне клиента.
+
+    python -m helpers.load_generator --rate 500 --ramp-up 10 --steady 60 --ramp-down 10 \\
+        --op get_pet=3 --op create_pet=1 --local-server
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from helpers.async_api_client import AsyncPetstoreAPIClient
+from helpers.data_generators import ImageDataGenerator, OrderDataGenerator, PetDataGenerator, UserDataGenerator
+from helpers.metrics import LatencyHistogram
+from helpers.petstore_server import PetstoreServerProcess
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class RateProfile:
+    """Профиль интенсивности: линейный разгон, плато и линейный спад"""
+
+    def __init__(self, rate: float, ramp_up: float = 0.0, steady: float = 0.0, ramp_down: float = 0.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.ramp_up = ramp_up
+        self.steady = steady
+        self.ramp_down = ramp_down
+
+    @property
+    def duration(self) -> float:
+        return self.ramp_up + self.steady + self.ramp_down
+
+    @property
+    def total_arrivals(self) -> float:
+        """Ожидаемое число запросов за весь профиль"""
+        return self.rate * (self.ramp_up / 2 + self.steady + self.ramp_down / 2)
+
+    def rate_at(self, t: float) -> float:
+        if t < 0 or t > self.duration:
+            return 0.0
+        if t < self.ramp_up:
+            return self.rate * t / self.ramp_up
+        t -= self.ramp_up
+        if t <= self.steady:
+            return self.rate
+        return self.rate * (1 - (t - self.steady) / self.ramp_down)
+
+    def time_of(self, arrivals: float) -> Optional[float]:
+        """Обратная функция к накопленной интенсивности: момент, к которому ожидается arrivals запросов"""
+        ramp_up_total = self.rate * self.ramp_up / 2
+        if arrivals <= ramp_up_total:
+            return math.sqrt(2 * self.ramp_up * arrivals / self.rate)
+        arrivals -= ramp_up_total
+        if arrivals <= self.rate * self.steady:
+            return self.ramp_up + arrivals / self.rate
+        arrivals -= self.rate * self.steady
+        if arrivals > self.rate * self.ramp_down / 2:
+            return None
+        discriminant = max(0.0, 1 - 2 * arrivals / (self.rate * self.ramp_down))
+        return self.ramp_up + self.steady + self.ramp_down * (1 - math.sqrt(discriminant))
+
+    def arrivals(self, process: str = "poisson", rng: Optional[random.Random] = None) -> Iterator[float]:
+        """Моменты прибытия запросов (секунды от старта).
+
+        Неоднородный процесс строится заменой времени: прибытия равномерны
+        (uniform) или пуассоновские (poisson) в шкале накопленной интенсивности.
+        """
+        rng = rng or random.Random()
+        position = 0.0
+        while True:
+            position += rng.expovariate(1.0) if process == "poisson" else 1.0
+            offset = self.time_of(position)
+            if offset is None:
+                return
+            yield offset
+
+
+class EndpointStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.dropped = 0
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        result = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "throughput": self.requests / elapsed if elapsed > 0 else 0.0,
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent:g}_ms"] = self.latency.percentile(percent) * 1000
+        return result
+
+
+class LoadReport:
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.elapsed = 0.0
+
+    def stats(self, name: str) -> EndpointStats:
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointStats(name)
+        return self.endpoints[name]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": self.elapsed,
+            "endpoints": {name: stats.summary(self.elapsed) for name, stats in sorted(self.endpoints.items())},
+        }
+
+    def format_table(self) -> str:
+        columns = ["requests", "errors", "error_rate", "throughput"] + [f"p{p:g}_ms" for p in PERCENTILES]
+        lines = [f"{'endpoint':<26}" + "".join(f"{column:>12}" for column in columns)]
+        for name, summary in self.to_dict()["endpoints"].items():
+            cells = []
+            for column in columns:
+                value = summary[column]
+                cells.append(f"{value:>12}" if isinstance(value, int) else f"{value:>12.2f}")
+            lines.append(f"{name:<26}" + "".join(cells))
+        return "\n".join(lines)
+
+
+class Workload:
+    """Аргументы для методов клиента и пулы уже созданных сущностей"""
+
+    CREATES = {"create_pet": "pets", "create_store_order": "orders", "create_user": "users"}
+    DELETES = {"delete_pet": "pets", "delete_store_order": "orders", "delete_user": "users"}
+
+    # Загрузки берут изображения из небольшого общего набора: память не растет с числом запросов
+    IMAGES = 16
+
+    def __init__(self, rng: random.Random, max_pool: Optional[int] = None):
+        """max_pool - предел пула ID: новый ID заменяет случайный (сущность остается на сервере),
+        чтобы долгий прогон не копил память в самом генераторе"""
+        self.rng = rng
+        self.max_pool = max_pool
+        self.pools: Dict[str, List[Any]] = {"pets": [], "orders": [], "users": []}
+        self._images: List[bytes] = []
+
+    def _pick(self, pool: str, take: bool = False) -> Any:
+        items = self.pools[pool]
+        if not items:
+            return 0
+        index = self.rng.randrange(len(items))
+        if take:
+            items[index], items[-1] = items[-1], items[index]
+            return items.pop()
+        return items[index]
+
+    def arguments(self, operation: str) -> Tuple[Any, ...]:
+        if operation in self.DELETES:
+            return (self._pick(self.DELETES[operation], take=True),)
+        if operation == "create_pet":
+            return (PetDataGenerator.generate_pet_data(),)
+        if operation == "update_pet":
+            return (PetDataGenerator.generate_pet_data(pet_id=self._pick("pets")),)
+        if operation == "get_pet":
+            return (self._pick("pets"),)
+        if operation == "update_pet_with_form":
+            return (self._pick("pets"), self.rng.choice(PetDataGenerator.NAMES), self.rng.choice(PetDataGenerator.STATUSES))
+        if operation == "upload_pet_image":
+            if not self._images:
+                self._images = ImageDataGenerator.generate_batch(self.IMAGES, seed=self.rng.getrandbits(32))
+            return (self._pick("pets"), None, "load", self.rng.choice(self._images))
+        if operation == "find_pets_by_status":
+            return (self.rng.choice(PetDataGenerator.STATUSES),)
+        if operation == "find_pets_by_tags":
+            return ([self.rng.choice(PetDataGenerator.TAGS)["name"]],)
+        if operation == "create_store_order":
+            return (OrderDataGenerator.generate_order_data(),)
+        if operation == "get_store_order":
+            return (self._pick("orders"),)
+        if operation == "create_user":
+            return (UserDataGenerator.generate_user_data(),)
+        if operation in ("get_user", "update_user", "login_user"):
+            username = self._pick("users") or "unknown"
+            if operation == "update_user":
+                return (username, UserDataGenerator.generate_user_data(username=username))
+            if operation == "login_user":
+                return (username, "password")
+            return (username,)
+        if operation in ("create_users_with_array", "create_users_with_list"):
+            return ([UserDataGenerator.generate_user_data() for _ in range(2)],)
+        if operation in ("get_store_inventory", "logout_user"):
+            return ()
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    def on_success(self, operation: str, args: Tuple[Any, ...]) -> None:
+        pool = self.CREATES.get(operation)
+        if pool is None:
+            return
+        data = args[0]
+        key = data["username"] if pool == "users" else data["id"]
+        items = self.pools[pool]
+        if self.max_pool is not None and len(items) >= self.max_pool:
+            items[self.rng.randrange(len(items))] = key
+        else:
+            items.append(key)
+
+
+class LoadGenerator:
+    """Запускает операции клиента по расписанию открытой модели"""
+
+    def __init__(
+        self,
+        client: AsyncPetstoreAPIClient,
+        profile: RateProfile,
+        operations: Dict[str, float],
+        process: str = "poisson",
+        max_in_flight: int = 10000,
+        seed: Optional[int] = None,
+    ):
+        for operation in operations:
+            if not callable(getattr(client, operation, None)):
+                raise ValueError(f"Unknown client method: {operation}")
+        self.client = client
+        self.profile = profile
+        self.operations = operations
+        self.process = process
+        self.max_in_flight = max_in_flight
+        self.rng = random.Random(seed)
+        self.workload = Workload(self.rng)
+        self.report = LoadReport()
+
+    async def seed(self, entities: int) -> None:
+        """Предварительно создает сущности, с которыми работают операции чтения и удаления"""
+        calls = []
+        for operation in ("create_pet", "create_store_order", "create_user"):
+            for _ in range(entities):
+                args = self.workload.arguments(operation)
+                calls.append((operation, args, getattr(self.client, operation)(*args)))
+        responses = await self.client.gather([call for _, _, call in calls])
+        for (operation, args, _), response in zip(calls, responses):
+            if response.status_code == 200:
+                self.workload.on_success(operation, args)
+
+    async def _execute(self, operation: str, scheduled: float) -> None:
+        loop = asyncio.get_running_loop()
+        stats = self.report.stats(operation)
+        args = self.workload.arguments(operation)
+        try:
+            response = await getattr(self.client, operation)(*args)
+            failed = response.status_code >= 400
+        except Exception:
+            failed = True
+        stats.latency.record(loop.time() - scheduled)
+        if failed:
+            stats.errors += 1
+        else:
+            self.workload.on_success(operation, args)
+
+    async def run(self) -> LoadReport:
+        loop = asyncio.get_running_loop()
+        names = list(self.operations)
+        weights = [self.operations[name] for name in names]
+        in_flight = set()
+        start = loop.time()
+        for offset in self.profile.arrivals(self.process, self.rng):
+            operation = self.rng.choices(names, weights)[0]
+            scheduled = start + offset
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.max_in_flight:
+                # Открытая модель: не копим бесконечную очередь, а учитываем отброшенные запросы
+                self.report.stats(operation).dropped += 1
+                continue
+            task = asyncio.ensure_future(self._execute(operation, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        self.report.elapsed = loop.time() - start
+        return self.report
+
+
+def _parse_operations(values: List[str]) -> Dict[str, float]:
+    operations = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        operations[name] = float(weight or 1)
+    return operations
+
+
+async def _run(args: argparse.Namespace, base_url: str) -> LoadReport:
+    async with AsyncPetstoreAPIClient(base_url=base_url, max_concurrency=args.concurrency) as client:
+        generator = LoadGenerator(
+            client,
+            RateProfile(args.rate, args.ramp_up, args.steady, args.ramp_down),
+            _parse_operations(args.op or ["get_pet"]),
+            process=args.process,
+            max_in_flight=args.max_in_flight,
+            seed=args.seed,
+        )
+        await generator.seed(args.seed_entities)
+        return await generator.run()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="petstore-load", description="Нагрузка на Petstore API в открытой модели")
+    parser.add_argument("--base-url", default=AsyncPetstoreAPIClient.BASE_URL)
+    parser.add_argument("--local-server", action="store_true", help="поднять локальный Petstore в отдельном процессе")
+    parser.add_argument("--rate", type=float, required=True, help="целевая интенсивность, запросов в секунду")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="длительность разгона, с")
+    parser.add_argument("--steady", type=float, default=10.0, help="длительность плато, с")
+    parser.add_argument("--ramp-down", type=float, default=0.0, help="длительность спада, с")
+    parser.add_argument("--op", action="append", help="метод клиента с весом: get_pet=3 (можно повторять)")
+    parser.add_argument("--process", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--concurrency", type=int, default=256, help="размер пула соединений")
+    parser.add_argument("--max-in-flight", type=int, default=10000)
+    parser.add_argument("--seed-entities", type=int, default=100)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="сохранить отчет в JSON")
+    args = parser.parse_args(argv)
+
+    if args.local_server:
+        with PetstoreServerProcess() as server:
+            report = asyncio.run(_run(args, server.base_url))
+    else:
+        report = asyncio.run(_run(args, args.base_url))
+
+    print(report.format_table())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
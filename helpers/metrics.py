@@ -0,0 +1,240 @@
+"""
+Метрики запросов клиента: HDR-подобные гистограммы задержек, коды ответов и объем трафика
+по шаблонам endpoint-ов (например, "GET /pet/{petId}").
+"""
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+class LatencyHistogram:
+    """Лог-линейная гистограмма задержек (в микросекундах) с ограниченной относительной ошибкой.
+
+    Значения меньше sub_bucket_count хранятся точно, большие - в корзинах,
+    ширина которых растет степенями двойки; относительная ошибка не превышает
+    2 / sub_bucket_count. Гистограммы с одинаковой конфигурацией складываются.
+    """
+
+    def __init__(self, sub_bucket_count: int = 2048):
+        if sub_bucket_count & (sub_bucket_count - 1) or sub_bucket_count < 2:
+            raise ValueError("sub_bucket_count must be a power of two")
+        self.sub_bucket_count = sub_bucket_count
+        self._sub_bits = sub_bucket_count.bit_length() - 1
+        self._half = sub_bucket_count // 2
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self.sub_bucket_count + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _bounds(self, index: int):
+        if index < self.sub_bucket_count:
+            return index, index
+        shift, offset = divmod(index - self.sub_bucket_count, self._half)
+        shift += 1
+        lower = (offset + self._half) << shift
+        return lower, lower + (1 << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.sub_bucket_count != self.sub_bucket_count:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def percentile(self, percent: float) -> float:
+        """Перцентиль в секундах (середина корзины, ограниченная min/max)"""
+        if not self.count:
+            return 0.0
+        target = max(1, -(-percent * self.count // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                lower, upper = self._bounds(index)
+                value = min(max((lower + upper) / 2, self.min), self.max)
+                return value / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": "us",
+            "sub_bucket_count": self.sub_bucket_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data["sub_bucket_count"])
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.status_codes: Counter = Counter()
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count
+
+    def merge(self, other: "EndpointMetrics") -> None:
+        self.latency.merge(other.latency)
+        self.status_codes.update(other.status_codes)
+        self.errors += other.errors
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_ms": {
+                "mean": self.latency.mean * 1000,
+                "p50": self.latency.percentile(50) * 1000,
+                "p90": self.latency.percentile(90) * 1000,
+                "p99": self.latency.percentile(99) * 1000,
+                "p99.9": self.latency.percentile(99.9) * 1000,
+                "max": (self.latency.max or 0) / 1000,
+            },
+            "histogram": self.latency.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EndpointMetrics":
+        metrics = cls()
+        metrics.latency = LatencyHistogram.from_dict(data["histogram"])
+        metrics.status_codes = Counter({int(code): count for code, count in data["status_codes"].items()})
+        metrics.errors = data["errors"]
+        metrics.bytes_sent = data["bytes_sent"]
+        metrics.bytes_received = data["bytes_received"]
+        return metrics
+
+
+class RequestMetrics:
+    """Потокобезопасный реестр метрик по ключу "<METHOD> <endpoint template>";
+    gauges - текущие значения (например, пределы интенсивности и параллельности)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.gauges: Dict[str, float] = {}
+
+    def _endpoint(self, method: str, template: str) -> EndpointMetrics:
+        key = f"{method} {template}"
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        return metrics
+
+    def record(
+        self,
+        method: str,
+        template: str,
+        elapsed: float,
+        status_code: Optional[int] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """Учитывает один запрос; status_code=None означает ошибку транспорта"""
+        with self._lock:
+            metrics = self._endpoint(method, template)
+            metrics.latency.record(elapsed)
+            if status_code is None:
+                metrics.errors += 1
+            else:
+                metrics.status_codes[status_code] += 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+
+    def set_gauge(self, name: str, value: float) -> None:
+        # Под той же блокировкой, что и merge/to_dict: словарь не меняется во время их обхода
+        with self._lock:
+            self.gauges[name] = value
+
+    def count(self, method: Optional[str] = None, template: Optional[str] = None) -> int:
+        """Число запросов, отфильтрованное по методу и/или шаблону endpoint-а"""
+        total = 0
+        with self._lock:
+            endpoints = list(self.endpoints.items())
+        for key, metrics in endpoints:
+            key_method, key_template = key.split(" ", 1)
+            if method not in (None, key_method) or template not in (None, key_template):
+                continue
+            total += metrics.requests
+        return total
+
+    def merge(self, other: "RequestMetrics") -> "RequestMetrics":
+        with self._lock:
+            for key, metrics in other.endpoints.items():
+                if key not in self.endpoints:
+                    self.endpoints[key] = EndpointMetrics()
+                self.endpoints[key].merge(metrics)
+            self.gauges.update(other.gauges)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "endpoints": {key: metrics.to_dict() for key, metrics in sorted(self.endpoints.items())},
+                "gauges": dict(sorted(self.gauges.items())),
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestMetrics":
+        metrics = cls()
+        metrics.endpoints = {key: EndpointMetrics.from_dict(value) for key, value in data["endpoints"].items()}
+        metrics.gauges = dict(data.get("gauges", {}))
+        return metrics
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "RequestMetrics":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
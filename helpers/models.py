@@ -0,0 +1,272 @@
+"""
+Компактные модели сущностей Petstore: Pet, Category, Tag, Order, User.
+
+Классы со __slots__ не держат __dict__ на каждый экземпляр, строки статусов
+интернируются (все питомцы со статусом "available" ссылаются на одну строку),
+а одинаковые категории и теги разделяются между питомцами. Поэтому большой
+набор сущностей занимает в памяти в несколько раз меньше, чем список словарей.
+
+from_dict/to_dict переводят модель из JSON-схемы Petstore и обратно
+(to_dict(from_dict(d)) == d для данных генераторов), decode_* разбирают
+тело ответа сразу в модели.
+"""
+import gc
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, TypeVar, Union
+
+PET_STATUSES = tuple(sys.intern(status) for status in ("available", "pending", "sold"))
+ORDER_STATUSES = tuple(sys.intern(status) for status in ("placed", "approved", "delivered"))
+
+M = TypeVar("M", bound="Model")
+
+_REFERENCE_CACHE_LIMIT = 4096
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_reenable = False
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """Циклический GC выключен, пока блок выполняется хотя бы в одном потоке.
+
+    GC общий для процесса: счетчик вложенных пауз под блокировкой гарантирует,
+    что его включит последний вышедший поток, и только если GC был включен до
+    первой паузы.
+    """
+    global _gc_pauses, _gc_reenable
+    with _gc_lock:
+        if not _gc_pauses:
+            _gc_reenable = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if not _gc_pauses and _gc_reenable:
+                gc.enable()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+
+class Model:
+    """Общая часть моделей: сравнение по полям и repr"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls: Type[M], data: Dict[str, Any]) -> M:
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @classmethod
+    def _field_names(cls) -> Tuple[str, ...]:
+        return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, "__slots__", ()))
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._field_names())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._field_names())
+        return f"{type(self).__name__}({fields})"
+
+
+class _Reference(Model):
+    """Пара id/name (категория или тег); одинаковые пары разделяются и не должны изменяться"""
+
+    __slots__ = ("id", "name")
+    _cache: Dict[Tuple[Any, Any], "_Reference"]
+
+    def __init__(self, id: Optional[int] = None, name: Optional[str] = None):
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        key = (data.get("id"), data.get("name"))
+        reference = cls._cache.get(key)
+        if reference is None:
+            reference = cls(*key)
+            if len(cls._cache) < _REFERENCE_CACHE_LIMIT:
+                cls._cache[key] = reference
+        return reference
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name}
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.name))
+
+
+class Category(_Reference):
+    __slots__ = ()
+    _cache: Dict[Tuple[Any, Any], "Category"] = {}
+
+
+class Tag(_Reference):
+    __slots__ = ()
+    _cache: Dict[Tuple[Any, Any], "Tag"] = {}
+
+
+class Pet(Model):
+    __slots__ = ("id", "name", "category", "photo_urls", "tags", "status")
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        name: Optional[str] = None,
+        category: Optional[Category] = None,
+        photo_urls: Optional[List[str]] = None,
+        tags: Optional[List[Tag]] = None,
+        status: Optional[str] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.photo_urls = photo_urls if photo_urls is not None else []
+        self.tags = tags if tags is not None else []
+        self.status = _intern(status)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Pet":
+        # Горячий путь разбора списков: без __init__ и с поиском тегов прямо в кеше
+        get = data.get
+        pet = cls.__new__(cls)
+        pet.id = get("id")
+        pet.name = get("name")
+        category = get("category")
+        pet.category = None if category is None else Category.from_dict(category)
+        pet.photo_urls = get("photoUrls") or []
+        tags = get("tags")
+        if tags:
+            cache = Tag._cache
+            pet.tags = [cache.get((tag.get("id"), tag.get("name"))) or Tag.from_dict(tag) for tag in tags]
+        else:
+            pet.tags = []
+        status = get("status")
+        pet.status = sys.intern(status) if type(status) is str else status
+        return pet
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"id": self.id, "name": self.name}
+        if self.category is not None:
+            data["category"] = self.category.to_dict()
+        data["photoUrls"] = list(self.photo_urls)
+        data["tags"] = [tag.to_dict() for tag in self.tags]
+        if self.status is not None:
+            data["status"] = self.status
+        return data
+
+
+class Order(Model):
+    __slots__ = ("id", "pet_id", "quantity", "ship_date", "status", "complete")
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        pet_id: Optional[int] = None,
+        quantity: Optional[int] = None,
+        ship_date: Optional[str] = None,
+        status: Optional[str] = None,
+        complete: bool = False,
+    ):
+        self.id = id
+        self.pet_id = pet_id
+        self.quantity = quantity
+        self.ship_date = ship_date
+        self.status = _intern(status)
+        self.complete = complete
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Order":
+        return cls(
+            data.get("id"),
+            data.get("petId"),
+            data.get("quantity"),
+            data.get("shipDate"),
+            data.get("status"),
+            data.get("complete", False),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"id": self.id, "petId": self.pet_id, "quantity": self.quantity}
+        if self.ship_date is not None:
+            data["shipDate"] = self.ship_date
+        if self.status is not None:
+            data["status"] = self.status
+        data["complete"] = self.complete
+        return data
+
+
+class User(Model):
+    __slots__ = ("id", "username", "first_name", "last_name", "email", "password", "phone", "user_status")
+
+    _FIELDS = (
+        ("id", "id"), ("username", "username"), ("first_name", "firstName"), ("last_name", "lastName"),
+        ("email", "email"), ("password", "password"), ("phone", "phone"), ("user_status", "userStatus"),
+    )
+
+    def __init__(
+        self,
+        id: Optional[int] = None,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        email: Optional[str] = None,
+        password: Optional[str] = None,
+        phone: Optional[str] = None,
+        user_status: Optional[int] = None,
+    ):
+        self.id = id
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.password = password
+        self.phone = phone
+        self.user_status = user_status
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "User":
+        get = data.get
+        return cls(get("id"), get("username"), get("firstName"), get("lastName"),
+                   get("email"), get("password"), get("phone"), get("userStatus"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, name) for name, key in self._FIELDS if getattr(self, name) is not None}
+
+
+def decode(model: Type[M], raw: Union[bytes, str]) -> Union[M, List[M]]:
+    """Тело ответа (объект или массив) сразу в модель или список моделей"""
+    # Как и при пакетной генерации: циклов среди создаваемых объектов нет,
+    # поэтому циклический GC на время разбора выключается
+    with paused_gc():
+        data = json.loads(raw)
+        if isinstance(data, list):
+            from_dict = model.from_dict
+            return [from_dict(item) for item in data]
+        return model.from_dict(data)
+
+
+def decode_pets(raw: Union[bytes, str]) -> List[Pet]:
+    return decode(Pet, raw)
+
+
+def to_json(value: Any) -> Any:
+    """Модель или список моделей в JSON-совместимые данные; прочие значения без изменений"""
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, list) and value and isinstance(value[0], Model):
+        return [item.to_dict() for item in value]
+    return value
@@ -0,0 +1,584 @@
+"""
+Локальная реализация Petstore API для прогонов без сети.
+
+Данные хранятся в памяти (PetstoreStore) со вторичными индексами по статусу,
+тегу и username. Сервер поднимается в фоновом потоке (LocalPetstoreServer)
+или отдельным процессом (PetstoreServerProcess, python -m helpers.petstore_server).
+"""
+import argparse
+import email.parser
+import email.policy
+import itertools
+import json
+import re
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class PetstoreError(Exception):
+    """Ошибка обработки запроса, превращаемая в HTTP-ответ"""
+
+    def __init__(self, status: int, body: Any = None):
+        super().__init__(status)
+        self.status = status
+        self.body = body
+
+
+def _api_response(code: int, message: str, type_: str = "unknown") -> Dict[str, Any]:
+    return {"code": code, "type": type_, "message": message}
+
+
+def _bad_input() -> PetstoreError:
+    return PetstoreError(400, _api_response(400, "bad input"))
+
+
+def _server_error() -> PetstoreError:
+    return PetstoreError(500, _api_response(500, "something bad happened"))
+
+
+def _require_int(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise _server_error()
+    return value
+
+
+def _require_str(value: Any) -> Optional[str]:
+    """Строка или None; другие значения (списки, объекты) не годятся в ключи индексов"""
+    if value is not None and not isinstance(value, str):
+        raise _server_error()
+    return value
+
+
+def _split_values(values: Iterable[str]) -> List[str]:
+    result = []
+    for value in values:
+        result.extend(item for item in value.split(",") if item)
+    return result
+
+
+class PetstoreStore:
+    """Потокобезопасное in-memory хранилище с индексами по статусу, тегу и username"""
+
+    GENERATED_ID_START = 9_200_000_000_000_000_000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pets: Dict[int, Dict[str, Any]] = {}
+        self._pets_by_status: Dict[str, Set[int]] = {}
+        self._pets_by_tag: Dict[str, Set[int]] = {}
+        self._orders: Dict[int, Dict[str, Any]] = {}
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(self.GENERATED_ID_START)
+        self._sessions = itertools.count(int(1e12))
+
+    # Pets
+    def _index_pet(self, pet: Dict[str, Any]) -> None:
+        pet_id = pet["id"]
+        status = pet.get("status")
+        if status is not None:
+            self._pets_by_status.setdefault(status, set()).add(pet_id)
+        for tag in pet["tags"]:
+            name = tag.get("name")
+            if name is not None:
+                self._pets_by_tag.setdefault(name, set()).add(pet_id)
+
+    def _unindex_pet(self, pet: Dict[str, Any]) -> None:
+        pet_id = pet["id"]
+        status = pet.get("status")
+        if status is not None:
+            ids = self._pets_by_status.get(status)
+            if ids is not None:
+                ids.discard(pet_id)
+                if not ids:
+                    del self._pets_by_status[status]
+        for tag in pet["tags"]:
+            ids = self._pets_by_tag.get(tag.get("name"))
+            if ids is not None:
+                ids.discard(pet_id)
+                if not ids:
+                    del self._pets_by_tag[tag["name"]]
+
+    def _normalize_pet(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            raise _bad_input()
+        pet = dict(data)
+        pet["id"] = _require_int(pet.get("id", 0))
+        category = pet.get("category")
+        if category is not None:
+            if not isinstance(category, dict):
+                raise _server_error()
+            if "id" in category:
+                _require_int(category["id"])
+        _require_str(pet.get("status"))
+        tags = pet.get("tags") or []
+        if not isinstance(tags, list) or not all(isinstance(tag, dict) for tag in tags):
+            raise _server_error()
+        for tag in tags:
+            _require_str(tag.get("name"))
+        pet["tags"] = tags
+        photo_urls = pet.get("photoUrls") or []
+        if not isinstance(photo_urls, list):
+            raise _server_error()
+        pet["photoUrls"] = photo_urls
+        return pet
+
+    def upsert_pet(self, data: Any) -> Dict[str, Any]:
+        pet = self._normalize_pet(data)
+        with self._lock:
+            if pet["id"] == 0:
+                pet["id"] = next(self._ids)
+            previous = self._pets.get(pet["id"])
+            if previous is not None:
+                self._unindex_pet(previous)
+            self._pets[pet["id"]] = pet
+            self._index_pet(pet)
+        return pet
+
+    def get_pet(self, pet_id: int) -> Optional[Dict[str, Any]]:
+        return self._pets.get(pet_id)
+
+    def update_pet_fields(self, pet_id: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            previous = self._pets.get(pet_id)
+            if previous is None:
+                return None
+            # Копия при записи: уже отданные наружу словари не меняются
+            pet = dict(previous, **fields)
+            self._unindex_pet(previous)
+            self._pets[pet_id] = pet
+            self._index_pet(pet)
+        return pet
+
+    def delete_pet(self, pet_id: int) -> bool:
+        with self._lock:
+            pet = self._pets.pop(pet_id, None)
+            if pet is None:
+                return False
+            self._unindex_pet(pet)
+        return True
+
+    def find_pets_by_status(self, statuses: Iterable[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = set()
+            for status in statuses:
+                ids.update(self._pets_by_status.get(status, ()))
+            return [self._pets[pet_id] for pet_id in ids]
+
+    def find_pets_by_tags(self, tags: Iterable[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = set()
+            for tag in tags:
+                ids.update(self._pets_by_tag.get(tag, ()))
+            return [self._pets[pet_id] for pet_id in ids]
+
+    def inventory(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: len(ids) for status, ids in self._pets_by_status.items()}
+
+    # Orders
+    def upsert_order(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            raise _bad_input()
+        order = dict(data)
+        order["id"] = _require_int(order.get("id", 0))
+        for field in ("petId", "quantity"):
+            if field in order:
+                _require_int(order[field])
+        if "complete" in order and not isinstance(order["complete"], bool):
+            raise _server_error()
+        order.setdefault("complete", False)
+        with self._lock:
+            if order["id"] == 0:
+                order["id"] = next(self._ids)
+            self._orders[order["id"]] = order
+        return order
+
+    def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        return self._orders.get(order_id)
+
+    def delete_order(self, order_id: int) -> bool:
+        with self._lock:
+            return self._orders.pop(order_id, None) is not None
+
+    # Users
+    def upsert_user(self, data: Any, username: Optional[str] = None) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            raise _bad_input()
+        user = dict(data)
+        user["id"] = _require_int(user.get("id", 0))
+        _require_str(user.get("username"))
+        if "userStatus" in user:
+            _require_int(user["userStatus"])
+        with self._lock:
+            if user["id"] == 0:
+                user["id"] = next(self._ids)
+            if username is not None and user.get("username") != username:
+                self._users.pop(username, None)
+            self._users[user.get("username") or ""] = user
+        return user
+
+    def get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        return self._users.get(username)
+
+    def delete_user(self, username: str) -> bool:
+        with self._lock:
+            return self._users.pop(username, None) is not None
+
+    def new_session(self) -> int:
+        return next(self._sessions)
+
+
+def _parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, Tuple[str, bytes]]]:
+    header = f"Content-Type: {content_type}\r\n\r\n".encode("latin-1")
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+    fields, files = {}, {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name is None:
+            continue
+        payload = part.get_payload(decode=True) or b""
+        filename = part.get_filename()
+        if filename is not None:
+            files[name] = (filename, payload)
+        else:
+            fields[name] = payload.decode("utf-8", "replace")
+    return fields, files
+
+
+class PetstoreRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 обработчик с keep-alive, маршрутизирующий запросы в PetstoreStore"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "PetstoreLocal/1.0"
+    # Заголовки и тело уходят отдельными write; без TCP_NODELAY ответ ждет delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+
+    ROUTES = [
+        ("GET", r"/pet/findByStatus", "find_pets_by_status"),
+        ("GET", r"/pet/findByTags", "find_pets_by_tags"),
+        ("POST", r"/pet", "create_pet"),
+        ("PUT", r"/pet", "update_pet"),
+        ("POST", r"/pet/(?P<pet_id>[^/]+)/uploadImage", "upload_image"),
+        ("GET", r"/pet/(?P<pet_id>[^/]+)", "get_pet"),
+        ("POST", r"/pet/(?P<pet_id>[^/]+)", "update_pet_with_form"),
+        ("DELETE", r"/pet/(?P<pet_id>[^/]+)", "delete_pet"),
+        ("GET", r"/store/inventory", "get_inventory"),
+        ("POST", r"/store/order", "create_order"),
+        ("GET", r"/store/order/(?P<order_id>[^/]+)", "get_order"),
+        ("DELETE", r"/store/order/(?P<order_id>[^/]+)", "delete_order"),
+        ("POST", r"/user/createWithArray", "create_users"),
+        ("POST", r"/user/createWithList", "create_users"),
+        ("GET", r"/user/login", "login"),
+        ("GET", r"/user/logout", "logout"),
+        ("POST", r"/user", "create_user"),
+        ("GET", r"/user/(?P<username>[^/]*)", "get_user"),
+        ("PUT", r"/user/(?P<username>[^/]*)", "update_user"),
+        ("DELETE", r"/user/(?P<username>[^/]*)", "delete_user"),
+    ]
+    _compiled_routes = [(method, re.compile(pattern + "$"), name) for method, pattern, name in ROUTES]
+
+    @property
+    def store(self) -> PetstoreStore:
+        return self.server.store
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Пропускаем trailer-заголовки до пустой строки
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self, method: str) -> None:
+        split = urlsplit(self.path)
+        path = split.path
+        base_path = self.server.base_path
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        self.query = parse_qs(split.query)
+        self.body = self._read_body()
+
+        allowed = False
+        for route_method, pattern, name in self._compiled_routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            try:
+                params = {key: unquote(value) for key, value in match.groupdict().items()}
+                status, payload, headers = getattr(self, "handle_" + name)(**params)
+            except PetstoreError as error:
+                status, payload, headers = error.status, error.body, None
+            except Exception:
+                # Любой необработанный ввод - ответ 500, а не оборванное соединение
+                error = _server_error()
+                status, payload, headers = error.status, error.body, None
+            self._send(status, payload, headers)
+            return
+        self._send(405 if allowed else 404, None)
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        if payload is None:
+            body = b""
+        elif isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json_body(self) -> Any:
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise _bad_input()
+
+    def _path_id(self, raw: str) -> int:
+        try:
+            return int(raw)
+        except ValueError:
+            raise PetstoreError(404, _api_response(
+                404, f'java.lang.NumberFormatException: For input string: "{raw}"'))
+
+    # Pet
+    def handle_create_pet(self):
+        return 200, self.store.upsert_pet(self._json_body()), None
+
+    def handle_update_pet(self):
+        return 200, self.store.upsert_pet(self._json_body()), None
+
+    def handle_get_pet(self, pet_id: str):
+        pet = self.store.get_pet(self._path_id(pet_id))
+        if pet is None:
+            raise PetstoreError(404, _api_response(1, "Pet not found", "error"))
+        return 200, pet, None
+
+    def handle_update_pet_with_form(self, pet_id: str):
+        pet_id = self._path_id(pet_id)
+        try:
+            form = parse_qs(self.body.decode("utf-8"))
+        except UnicodeDecodeError:
+            raise _bad_input()
+        fields = {key: form[key][0] for key in ("name", "status") if key in form}
+        if self.store.update_pet_fields(pet_id, fields) is None:
+            raise PetstoreError(404, _api_response(404, "not found"))
+        return 200, _api_response(200, str(pet_id)), None
+
+    def handle_delete_pet(self, pet_id: str):
+        pet_id = self._path_id(pet_id)
+        if not self.store.delete_pet(pet_id):
+            return 404, None, None
+        return 200, _api_response(200, str(pet_id)), None
+
+    def handle_upload_image(self, pet_id: str):
+        self._path_id(pet_id)
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            raise PetstoreError(415)
+        fields, files = _parse_multipart(content_type, self.body)
+        message = f"additionalMetadata: {fields.get('additionalMetadata')}\n"
+        if "file" in files:
+            filename, payload = files["file"]
+            message += f"File uploaded to ./{filename}, {len(payload)} bytes"
+        return 200, _api_response(200, message), None
+
+    def handle_find_pets_by_status(self):
+        return 200, self.store.find_pets_by_status(_split_values(self.query.get("status", []))), None
+
+    def handle_find_pets_by_tags(self):
+        return 200, self.store.find_pets_by_tags(_split_values(self.query.get("tags", []))), None
+
+    # Store
+    def handle_get_inventory(self):
+        return 200, self.store.inventory(), None
+
+    def handle_create_order(self):
+        return 200, self.store.upsert_order(self._json_body()), None
+
+    def handle_get_order(self, order_id: str):
+        order = self.store.get_order(self._path_id(order_id))
+        if order is None:
+            raise PetstoreError(404, _api_response(1, "Order not found", "error"))
+        return 200, order, None
+
+    def handle_delete_order(self, order_id: str):
+        order_id = self._path_id(order_id)
+        if not self.store.delete_order(order_id):
+            raise PetstoreError(404, _api_response(404, "Order Not Found"))
+        return 200, _api_response(200, str(order_id)), None
+
+    # User
+    def handle_create_user(self):
+        user = self.store.upsert_user(self._json_body())
+        return 200, _api_response(200, str(user["id"])), None
+
+    def handle_create_users(self):
+        users = self._json_body()
+        if not isinstance(users, list):
+            raise _bad_input()
+        for user in users:
+            self.store.upsert_user(user)
+        return 200, _api_response(200, "ok"), None
+
+    def handle_get_user(self, username: str):
+        user = self.store.get_user(username)
+        if user is None:
+            raise PetstoreError(404, _api_response(1, "User not found", "error"))
+        return 200, user, None
+
+    def handle_update_user(self, username: str):
+        user = self.store.upsert_user(self._json_body(), username=username)
+        return 200, _api_response(200, str(user["id"])), None
+
+    def handle_delete_user(self, username: str):
+        if not self.store.delete_user(username):
+            return 404, None, None
+        return 200, _api_response(200, username), None
+
+    def handle_login(self):
+        headers = {"X-Rate-Limit": "5000", "X-Expires-After": "3600"}
+        message = f"logged in user session:{self.store.new_session()}"
+        return 200, _api_response(200, message), headers
+
+    def handle_logout(self):
+        return 200, _api_response(200, "ok"), None
+
+
+class PetstoreHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], store: Optional[PetstoreStore] = None, base_path: str = "/v2"):
+        super().__init__(address, PetstoreRequestHandler)
+        self.store = store or PetstoreStore()
+        self.base_path = base_path
+
+
+class LocalPetstoreServer:
+    """Petstore в фоновом потоке текущего процесса"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, store: Optional[PetstoreStore] = None):
+        self.host = host
+        self.port = port
+        self.store = store or PetstoreStore()
+        self._server: Optional[PetstoreHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v2"
+
+    def start(self) -> "LocalPetstoreServer":
+        self._server = PetstoreHTTPServer((self.host, self.port), self.store)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="petstore-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "LocalPetstoreServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class PetstoreServerProcess:
+    """Petstore в отдельном процессе (python -m helpers.petstore_server)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.base_url: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self) -> "PetstoreServerProcess":
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "helpers.petstore_server", "--host", self.host, "--port", str(self.port)],
+            cwd=Path(__file__).resolve().parent.parent,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # Первая строка вывода - адрес, на котором сервер уже принимает соединения
+        line = self._process.stdout.readline().strip()
+        if not line:
+            self.stop()
+            raise RuntimeError("Petstore server process exited before start")
+        self.base_url = line
+        return self
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def __enter__(self) -> "PetstoreServerProcess":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Локальный Petstore API сервер")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    server = PetstoreHTTPServer((args.host, args.port))
+    host, port = server.server_address[:2]
+    print(f"http://{host}:{port}/v2", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
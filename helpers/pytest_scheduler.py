@@ -0,0 +1,206 @@
+"""
+Pytest-плагин параллельного прогона с планированием по истории длительностей.
+
+Длительность каждого теста (setup + call + teardown) сохраняется в кеше pytest
+(.pytest_cache) как экспоненциальное скользящее среднее. С опцией
+--petstore-workers N тесты распределяются между N процессами pytest по правилу
+LPT (longest processing time first): самый долгий из оставшихся тестов уходит
+наименее загруженному воркеру. Каждый воркер получает PETSTORE_WORKER_ID -
+собственный диапазон ID и собственный клиент, - а его отчеты воспроизводятся
+в управляющем процессе, так что вывод, коды выхода и lastfailed не меняются.
+
+Подключается из conftest.py: pytest_plugins = ["helpers.pytest_scheduler"].
+"""
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Sequence, Tuple
+
+import pytest
+
+DURATIONS_CACHE_KEY = "petstore/durations"
+DEFAULT_DURATION = 1.0
+SMOOTHING = 0.5
+
+crashes_key = pytest.StashKey[List[str]]()
+
+
+class SchedulerHookSpecs:
+    """Хуки для передачи воркерам дополнительных опций и сбора их артефактов"""
+
+    @pytest.hookspec
+    def pytest_petstore_worker_args(self, config, worker_id, workdir):
+        """Дополнительные аргументы командной строки воркера worker_id (список строк)"""
+
+    @pytest.hookspec
+    def pytest_petstore_workers_finished(self, config, worker_ids, workdir):
+        """Все воркеры завершились; workdir еще не удален"""
+
+
+def pytest_addhooks(pluginmanager):
+    pluginmanager.add_hookspecs(SchedulerHookSpecs)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("petstore")
+    group.addoption("--petstore-workers", type=int, default=0, metavar="N",
+                    help="Распределить тесты между N процессами по истории длительностей")
+    group.addoption("--petstore-worker-tests", help=argparse.SUPPRESS)
+    group.addoption("--petstore-worker-reports", help=argparse.SUPPRESS)
+
+
+def lpt_partition(durations: Sequence[float], workers: int) -> List[List[int]]:
+    """Индексы задач для каждого воркера по правилу LPT; внутри воркера - исходный порядок"""
+    heap = [(0.0, worker) for worker in range(workers)]
+    buckets: List[List[int]] = [[] for _ in range(workers)]
+    for index in sorted(range(len(durations)), key=lambda i: -durations[i]):
+        load, worker = heapq.heappop(heap)
+        buckets[worker].append(index)
+        heapq.heappush(heap, (load + durations[index], worker))
+    return [sorted(bucket) for bucket in buckets]
+
+
+def estimate_durations(nodeids: Sequence[str], history: Dict[str, float]) -> List[float]:
+    """Длительности из истории; для новых тестов - средняя по известным"""
+    known = [history[nodeid] for nodeid in nodeids if nodeid in history]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION
+    return [history.get(nodeid, default) for nodeid in nodeids]
+
+
+def _is_worker(config) -> bool:
+    return bool(config.getoption("--petstore-worker-reports"))
+
+
+def _load_history(config) -> Dict[str, float]:
+    cache = getattr(config, "cache", None)
+    return dict(cache.get(DURATIONS_CACHE_KEY, {})) if cache is not None else {}
+
+
+def _worker_command(config, worker_id: int, tests_path: str, reports_path: str, workdir: str) -> List[str]:
+    args = []
+    skip_next = False
+    for arg in config.invocation_params.args:
+        if skip_next:
+            skip_next = False
+        elif arg == "--petstore-workers":
+            skip_next = True
+        elif not arg.startswith("--petstore-workers="):
+            args.append(arg)
+    for extra in config.hook.pytest_petstore_worker_args(config=config, worker_id=worker_id, workdir=workdir):
+        args.extend(extra)
+    return [sys.executable, "-m", "pytest", *args, "-p", "no:cacheprovider",
+            f"--petstore-worker-tests={tests_path}", f"--petstore-worker-reports={reports_path}"]
+
+
+class DurationRecorder:
+    """Копит длительности тестов сессии (в том числе из отчетов воркеров) и пишет их в историю;
+    в воркере дополнительно сериализует каждый отчет для управляющего процесса"""
+
+    def __init__(self, config):
+        self.config = config
+        self.durations: Dict[str, float] = {}
+        self.reports_path = config.getoption("--petstore-worker-reports")
+
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+        if self.reports_path:
+            data = self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+            with open(self.reports_path, "a", encoding="utf-8") as reports_file:
+                reports_file.write(json.dumps(data) + "\n")
+
+    def pytest_sessionfinish(self):
+        cache = getattr(self.config, "cache", None)
+        if cache is None or self.reports_path or not self.durations:
+            return
+        history = _load_history(self.config)
+        for nodeid, duration in self.durations.items():
+            previous = history.get(nodeid)
+            history[nodeid] = duration if previous is None else SMOOTHING * duration + (1 - SMOOTHING) * previous
+        cache.set(DURATIONS_CACHE_KEY, history)
+
+
+def pytest_configure(config):
+    config.stash[crashes_key] = []
+    config.pluginmanager.register(DurationRecorder(config), "petstore-duration-recorder")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    tests_path = config.getoption("--petstore-worker-tests")
+    if not tests_path:
+        return
+    with open(tests_path, encoding="utf-8") as tests_file:
+        wanted = set(json.load(tests_file))
+    selected = [item for item in items if item.nodeid in wanted]
+    deselected = [item for item in items if item.nodeid not in wanted]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    workers = config.getoption("--petstore-workers")
+    if workers < 2 or _is_worker(config) or config.option.collectonly or not session.items:
+        return None
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        raise session.Interrupted(f"{session.testsfailed} errors during collection")
+
+    nodeids = [item.nodeid for item in session.items]
+    buckets = lpt_partition(estimate_durations(nodeids, _load_history(config)), min(workers, len(nodeids)))
+    with tempfile.TemporaryDirectory(prefix="petstore-workers-") as workdir:
+        processes: List[Tuple[int, subprocess.Popen, str, str]] = []
+        for worker_id, bucket in enumerate(buckets):
+            tests_path = os.path.join(workdir, f"tests-{worker_id}.json")
+            reports_path = os.path.join(workdir, f"reports-{worker_id}.jsonl")
+            output_path = os.path.join(workdir, f"output-{worker_id}.txt")
+            with open(tests_path, "w", encoding="utf-8") as tests_file:
+                json.dump([nodeids[index] for index in bucket], tests_file)
+            env = dict(os.environ, PETSTORE_WORKER_ID=str(worker_id))
+            with open(output_path, "wb") as output:
+                process = subprocess.Popen(
+                    _worker_command(config, worker_id, tests_path, reports_path, workdir),
+                    cwd=str(config.invocation_params.dir), env=env, stdout=output, stderr=subprocess.STDOUT,
+                )
+            processes.append((worker_id, process, reports_path, output_path))
+
+        for worker_id, process, reports_path, output_path in processes:
+            returncode = process.wait()
+            _replay_reports(config, reports_path)
+            # 0 - все прошло, 1 - есть упавшие тесты; остальное - сбой самого воркера
+            if returncode not in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED):
+                session.testsfailed += 1
+                with open(output_path, encoding="utf-8", errors="replace") as output:
+                    tail = output.read()[-2000:]
+                config.stash[crashes_key].append(f"worker {worker_id} exited with {returncode}:\n{tail}")
+        config.hook.pytest_petstore_workers_finished(
+            config=config, worker_ids=[worker_id for worker_id, *_ in processes], workdir=workdir,
+        )
+    return True
+
+
+def _replay_reports(config, reports_path: str) -> None:
+    if not os.path.exists(reports_path):
+        return
+    with open(reports_path, encoding="utf-8") as reports_file:
+        for line in reports_file:
+            report = config.hook.pytest_report_from_serializable(config=config, data=json.loads(line))
+            if report.when == "setup":
+                config.hook.pytest_runtest_logstart(nodeid=report.nodeid, location=report.location)
+            config.hook.pytest_runtest_logreport(report=report)
+            if report.when == "teardown":
+                config.hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=report.location)
+
+
+def pytest_terminal_summary(terminalreporter):
+    crashes = terminalreporter.config.stash.get(crashes_key, [])
+    if crashes:
+        terminalreporter.section("petstore workers", red=True)
+        for crash in crashes:
+            terminalreporter.write_line(crash)
+
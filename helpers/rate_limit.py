@@ -0,0 +1,201 @@
+"""
+Ограничение интенсивности и параллельности запросов клиента.
+
+TokenBucket / RateLimiter - токен-бакеты: общий бюджет запросов в секунду и
+отдельные бюджеты endpoint-ов (ключи как в метриках: "GET /pet/{petId}" или
+шаблон "/pet/{petId}" для всех методов). Запрос должен пройти все подходящие
+бакеты; если токенов нет, поток ждет своей очереди (резервирование, FIFO).
+
+AdaptiveConcurrencyLimit - AIMD-предел числа запросов в полете. Успешный ответ
+без роста задержки увеличивает предел на 1/limit (то есть примерно на единицу
+за "окно" из limit ответов). Статус перегрузки (по умолчанию RETRY_STATUSES:
+429, 502, 503, 504), ошибка транспорта или рост задержки -
+краткосрочное среднее больше долгосрочного в tolerance раз - уменьшают его
+в backoff раз, но не чаще одного раза на окно: запросы, начатые до предыдущего
+уменьшения, его не повторяют. Так клиент находит наибольшую устойчивую
+пропускную способность и отступает, когда сервис начинает перегружаться.
+Прочие ошибки (500 Petstore на некорректный ввод, 4xx) перегрузкой не
+считаются и учитываются как обычные ответы.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from helpers.resilience import RETRY_STATUSES
+
+
+class TokenBucket:
+    """Бакет на rate токенов в секунду с запасом burst (по умолчанию - секунда работы)"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+        self.waits = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Забирает токены (в долг, если их нет); возвращает, сколько секунд ждать"""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Забирает токены, только если они есть прямо сейчас"""
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Ждет токены; возвращает время ожидания"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            with self._lock:
+                self.waits += 1
+                self.waited += delay
+            self._sleep(delay)
+        return delay
+
+    def set_rate(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = rate
+
+
+class RateLimiter:
+    """Общий бюджет rate (запросов в секунду) и бюджеты отдельных endpoint-ов"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        endpoints: Optional[Dict[str, float]] = None,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._global = TokenBucket(rate, burst, clock, sleep) if rate else None
+        self._buckets = {key: TokenBucket(value, burst, clock, sleep) for key, value in (endpoints or {}).items()}
+        self._resolved: Dict[str, List[TokenBucket]] = {}
+
+    def buckets(self, method: str, template: str) -> List[TokenBucket]:
+        key = f"{method} {template}"
+        buckets = self._resolved.get(key)
+        if buckets is None:
+            buckets = [bucket for bucket in (self._global, self._buckets.get(key), self._buckets.get(template))
+                       if bucket is not None]
+            self._resolved[key] = buckets
+        return buckets
+
+    def acquire(self, method: str, template: str) -> float:
+        """Ждет токены во всех бакетах запроса; возвращает суммарное ожидание"""
+        return sum(bucket.acquire() for bucket in self.buckets(method, template))
+
+    def limits(self) -> Dict[str, float]:
+        limits = {key: bucket.rate for key, bucket in self._buckets.items()}
+        if self._global is not None:
+            limits["*"] = self._global.rate
+        return limits
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD-предел числа запросов в полете"""
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.1,
+        long_smoothing: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+        overload_statuses: Iterable[int] = RETRY_STATUSES,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.long_smoothing = long_smoothing
+        self.overload_statuses = frozenset(overload_statuses)
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._limit = float(initial)
+        self._last_decrease = float("-inf")
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Ждет места под предел; возвращает момент начала запроса для release"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self._limit), timeout):
+                raise TimeoutError(f"No concurrency slot within {timeout}s (limit {self.limit})")
+            self.in_flight += 1
+            return self._clock()
+
+    def release(self, started: float, status_code: Optional[int]) -> None:
+        """Учитывает завершение запроса; status_code=None - ошибка транспорта"""
+        now = self._clock()
+        elapsed = now - started
+        with self._condition:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            overloaded = status_code is None or status_code in self.overload_statuses
+            if not overloaded:
+                if self.latency is None:
+                    self.latency = self.long_latency = elapsed
+                else:
+                    self.latency += self.smoothing * (elapsed - self.latency)
+                    self.long_latency += self.long_smoothing * (elapsed - self.long_latency)
+                overloaded = self.latency > self.long_latency * self.latency_tolerance
+            if overloaded:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+            elif 2 * in_flight >= self._limit and self._limit < self.max_limit:
+                # Растем, только если предел действительно используется
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+                self.increases += 1
+            self._condition.notify_all()
+
+    def to_dict(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
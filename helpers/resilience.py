@@ -0,0 +1,260 @@
+"""
+Повторы запросов и предохранитель (circuit breaker) на уровне клиента.
+
+RetryPolicy повторяет только безопасные и идемпотентные методы (GET, HEAD,
+OPTIONS, PUT, DELETE) при ошибке соединения/таймауте и ответах 429/502/503/504.
+Неидемпотентные POST (create_store_order и т.п.) повторяются, только если
+политика создана с retry_non_idempotent=True. Задержки - backoff_delays
+из helpers.waiting (Retry-After сервера учитывается), общее число повторов
+ограничено бюджетом: каждый исходный запрос пополняет его на ratio, каждый
+повтор тратит единицу, поэтому во время инцидента повторы добавляют не больше
+~ratio к нагрузке.
+
+CircuitBreakers - предохранители по endpoint-ам ("GET /pet/{petId}"). После
+failure_threshold подряд ошибок соединения или ответов 502/503/504 endpoint
+считается недоступным: запросы к нему сразу завершаются CircuitOpenError, пока
+не пройдет reset_timeout. Затем один пробный запрос решает, закрыть ли цепь.
+Ответ 500 Petstore возвращает на некорректные данные, отказом он не считается.
+
+Исходы запросов по endpoint-ам копятся в ResilienceStats.
+"""
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, Optional
+
+import requests
+
+from helpers.waiting import backoff_delays
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES: FrozenSet[int] = frozenset({429, 502, 503, 504})
+UNAVAILABLE_STATUSES: FrozenSet[int] = frozenset({502, 503, 504})
+
+# Исходы запроса (после всех попыток)
+OK = "ok"                              # успех с первой попытки
+RECOVERED = "recovered"                # успех после повторов
+FAILED = "failed"                      # ошибка, повтор не положен (метод, статус)
+GAVE_UP = "gave_up"                    # ошибка после max_attempts попыток
+BUDGET_EXHAUSTED = "budget_exhausted"  # ошибка, бюджет повторов исчерпан
+SHORT_CIRCUITED = "short_circuited"    # цепь разомкнута, запрос не отправлялся
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Endpoint недоступен: предохранитель разомкнут, запрос не отправлялся"""
+
+    def __init__(self, key: str, retry_in: float):
+        self.key = key
+        self.retry_in = retry_in
+        super().__init__(f"Circuit for {key} is open, next probe in {retry_in:.1f}s")
+
+
+class RetryBudget:
+    """Бюджет повторов: ratio повтора на исходный запрос, но не меньше min_retries в запасе"""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, capacity: float = 100.0):
+        self.ratio = ratio
+        self.capacity = max(capacity, min_retries)
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+
+class RetryPolicy:
+    """Когда и с какой задержкой повторять запрос"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_delay: float = 0.05,
+        max_delay: float = 1.0,
+        factor: float = 2.0,
+        jitter: float = 0.5,
+        statuses: Iterable[int] = RETRY_STATUSES,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+        retry_non_idempotent: bool = False,
+        budget: Optional[RetryBudget] = None,
+        max_retry_after: float = 5.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.budget = budget if budget is not None else RetryBudget()
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+
+    def allows(self, method: str) -> bool:
+        return self.max_attempts > 1 and (method in self.methods or self.retry_non_idempotent)
+
+    def delays(self) -> Iterator[float]:
+        return backoff_delays(self.initial_delay, self.factor, self.max_delay, self.jitter)
+
+    def retryable(self, response: Optional[requests.Response], error: Optional[Exception]) -> bool:
+        if error is not None:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout)) \
+                and not isinstance(error, CircuitOpenError)
+        return response.status_code in self.statuses
+
+    def retry_after(self, response: Optional[requests.Response]) -> Optional[float]:
+        """Пауза из заголовка Retry-After (секунды или HTTP-дата)"""
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """Предохранитель одного endpoint-а: closed -> open -> half_open -> closed"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float]):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+
+    def before(self, key: str) -> None:
+        """Пропускает запрос или бросает CircuitOpenError"""
+        if self.state == self.CLOSED:
+            return
+        now = self._clock()
+        if self.state == self.OPEN:
+            retry_in = self.opened_at + self.reset_timeout - now
+            if retry_in > 0:
+                raise CircuitOpenError(key, retry_in)
+            self.state = self.HALF_OPEN
+        if self._probing:
+            raise CircuitOpenError(key, 0.0)
+        self._probing = True
+
+    def cancel(self) -> None:
+        """Пропущенный запрос не состоялся - исход неизвестен"""
+        self._probing = False
+
+    def record(self, success: bool) -> None:
+        self._probing = False
+        if success:
+            self.state = self.CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opens += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+
+class CircuitBreakers:
+    """Предохранители по ключу "<METHOD> <endpoint template>" """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        statuses: Iterable[int] = UNAVAILABLE_STATUSES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.statuses = frozenset(statuses)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.circuits: Dict[str, CircuitBreaker] = {}
+
+    def _circuit(self, key: str) -> CircuitBreaker:
+        circuit = self.circuits.get(key)
+        if circuit is None:
+            circuit = self.circuits[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self._clock)
+        return circuit
+
+    def before(self, key: str) -> None:
+        with self._lock:
+            self._circuit(key).before(key)
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._circuit(key).cancel()
+
+    def record(self, key: str, response: Optional[requests.Response], error: Optional[Exception]) -> None:
+        if error is not None:
+            success = not isinstance(error, (requests.ConnectionError, requests.Timeout))
+        else:
+            success = response.status_code not in self.statuses
+        with self._lock:
+            self._circuit(key).record(success)
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            circuit = self.circuits.get(key)
+            return circuit.state if circuit is not None else CircuitBreaker.CLOSED
+
+    def open_circuits(self) -> Dict[str, float]:
+        """Разомкнутые цепи и сколько секунд до пробного запроса"""
+        now = self._clock()
+        with self._lock:
+            return {
+                key: max(0.0, circuit.opened_at + circuit.reset_timeout - now)
+                for key, circuit in self.circuits.items() if circuit.state != CircuitBreaker.CLOSED
+            }
+
+
+class ResilienceStats:
+    """Исходы запросов (OK, RECOVERED, ...) и число повторов по endpoint-ам"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.outcomes: Dict[str, Counter] = {}
+        self.retries: Counter = Counter()
+
+    def record(self, key: str, outcome: str, retries: int) -> None:
+        with self._lock:
+            self.outcomes.setdefault(key, Counter())[outcome] += 1
+            if retries:
+                self.retries[key] += retries
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                key: {**dict(sorted(outcomes.items())), "retries": self.retries[key]}
+                for key, outcomes in sorted(self.outcomes.items())
+            }
+
+    def incidents(self) -> Dict[str, Dict[str, int]]:
+        """Только endpoint-ы, где были повторы или отказы"""
+        return {key: item for key, item in self.to_dict().items() if set(item) - {OK, "retries"} or item["retries"]}
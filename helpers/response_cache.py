@@ -0,0 +1,246 @@
+"""
+Кеш ответов идемпотентных GET-запросов клиента с инвалидацией по записям.
+
+Каждый закешированный ответ помечается тегами сущностей, от которых он зависит:
+    pet:<id>, status:<status>, tag:<name>, order:<id>, user:<username>, inventory.
+Списки (findByStatus, findByTags) дополнительно помечаются ID всех вошедших в них
+питомцев, поэтому изменение питомца сбрасывает и списки его старого статуса.
+Запись через тот же клиент вычисляет затронутые теги и сбрасывает зависимые записи.
+Вытеснение - LRU с ограничением числа записей и суммарного размера тел плюс TTL.
+
+Чтение, начатое до записи, может получить уже устаревший ответ и положить его
+в кеш после инвалидации. Поэтому GET берет поколение кеша (begin) до запроса,
+инвалидация помечает теги новым поколением, а put отбрасывает ответ, если
+какой-то из его тегов сброшен после начала чтения.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import requests
+
+CACHEABLE_TEMPLATES = {
+    "/pet/{petId}",
+    "/pet/findByStatus",
+    "/pet/findByTags",
+    "/store/inventory",
+    "/store/order/{orderId}",
+    "/user/{username}",
+}
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def cache_key(endpoint: str, params: Optional[Dict[str, Any]]) -> CacheKey:
+    return endpoint, tuple(sorted((str(key), str(value)) for key, value in (params or {}).items()))
+
+
+def _path_id(endpoint: str) -> str:
+    return endpoint.split("/")[2] if endpoint.startswith("/pet/") else endpoint.rsplit("/", 1)[-1]
+
+
+def _split(value: Any) -> Iterable[str]:
+    return [item for item in str(value or "").split(",") if item]
+
+
+def _pet_tags(pet: Any) -> Set[str]:
+    if not isinstance(pet, dict):
+        return set()
+    tags = {f"status:{pet.get('status')}"}
+    if pet.get("id"):
+        tags.add(f"pet:{pet['id']}")
+    for tag in pet.get("tags") or []:
+        if isinstance(tag, dict) and tag.get("name") is not None:
+            tags.add(f"tag:{tag['name']}")
+    return tags
+
+
+def read_tags(template: str, endpoint: str, params: Optional[Dict[str, Any]], response: requests.Response) -> Set[str]:
+    """Теги, от которых зависит ответ GET-запроса"""
+    params = params or {}
+    if template == "/pet/{petId}":
+        return {f"pet:{_path_id(endpoint)}"}
+    if template == "/store/order/{orderId}":
+        return {f"order:{_path_id(endpoint)}"}
+    if template == "/user/{username}":
+        return {f"user:{_path_id(endpoint)}"}
+    if template == "/store/inventory":
+        return {"inventory"}
+    if template == "/pet/findByStatus":
+        tags = {f"status:{status}" for status in _split(params.get("status"))}
+    else:
+        tags = {f"tag:{name}" for name in _split(params.get("tags"))}
+    try:
+        pets = response.json()
+    except ValueError:
+        pets = []
+    if isinstance(pets, list):
+        tags.update(f"pet:{pet['id']}" for pet in pets if isinstance(pet, dict) and "id" in pet)
+    return tags
+
+
+def write_tags(method: str, template: str, endpoint: str, kwargs: Dict[str, Any]) -> Optional[Set[str]]:
+    """Теги, затронутые записью; None - влияние неизвестно и кеш нужно сбросить целиком"""
+    body = kwargs.get("json")
+    data = kwargs.get("data") if isinstance(kwargs.get("data"), dict) else {}
+    if template == "/pet":
+        return _pet_tags(body) | {"inventory"}
+    if template == "/pet/{petId}":
+        tags = {f"pet:{_path_id(endpoint)}", "inventory"}
+        if data.get("status"):
+            tags.add(f"status:{data['status']}")
+        return tags
+    if template == "/pet/{petId}/uploadImage":
+        return {f"pet:{_path_id(endpoint)}"}
+    if template in ("/store/order", "/store/order/{orderId}"):
+        order_id = body.get("id") if isinstance(body, dict) else _path_id(endpoint)
+        return {f"order:{order_id}", "inventory"}
+    if template in ("/user", "/user/createWithArray", "/user/createWithList", "/user/{username}"):
+        users = body if isinstance(body, list) else [body]
+        tags = {f"user:{user.get('username')}" for user in users if isinstance(user, dict)}
+        if template == "/user/{username}":
+            tags.add(f"user:{_path_id(endpoint)}")
+        return tags
+    return None
+
+
+class _Entry:
+    __slots__ = ("response", "tags", "expires", "size")
+
+    def __init__(self, response: requests.Response, tags: Set[str], expires: float, size: int):
+        self.response = response
+        self.tags = tags
+        self.expires = expires
+        self.size = size
+
+
+class ResponseCache:
+    """LRU + TTL кеш ответов с ограничением по числу записей и объему тел"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 30.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._by_tag: Dict[str, Set[CacheKey]] = {}
+        # Поколение растет при каждой инвалидации; тег -> поколение его последнего сброса
+        # хранится, только пока есть чтения в полете, которые начались раньше
+        self._generation = 0
+        self._cleared = 0
+        self._invalidated: Dict[str, int] = {}
+        self._reading: Counter = Counter()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[requests.Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.response
+
+    def begin(self) -> int:
+        """Поколение перед запросом на чтение; его нужно передать в put и затем в end"""
+        with self._lock:
+            self._reading[self._generation] += 1
+            return self._generation
+
+    def end(self, since: int) -> None:
+        """Завершение чтения, начатого в поколении since"""
+        with self._lock:
+            self._reading[since] -= 1
+            if not self._reading[since]:
+                del self._reading[since]
+            if not self._reading:
+                self._invalidated.clear()
+            elif len(self._invalidated) > self.max_entries:
+                oldest = min(self._reading)
+                self._invalidated = {tag: generation for tag, generation in self._invalidated.items()
+                                     if generation > oldest}
+
+    def put(self, key: CacheKey, response: requests.Response, tags: Set[str], since: Optional[int] = None) -> None:
+        """since - поколение из begin: ответ не кешируется, если его теги сброшены после начала чтения"""
+        size = len(response.content or b"")
+        if size > self.max_bytes:
+            return
+        expires = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if since is not None and (self._cleared > since or
+                                      any(self._invalidated.get(tag, -1) > since for tag in tags)):
+                self.stale += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(response, tags, expires, size)
+            self.size += size
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Удаляет записи, помеченные любым из тегов; возвращает число удаленных"""
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                if self._reading:
+                    self._invalidated[tag] = self._generation
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared = self._generation
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_tag.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale": self.stale,
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
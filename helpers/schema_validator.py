@@ -0,0 +1,316 @@
+"""
+Проверка ответов по схемам Swagger Petstore, скомпилированным в Python-функции.
+
+Определения из спецификации один раз превращаются в исходный код: для каждой
+схемы генерируются две функции -
+    _valid_<Name>(value) -> bool              быстрая проверка без сбора ошибок;
+    _errors_<Name>(value, path, errors)       полный обход с JSON-путями нарушений.
+Код компилируется через compile/exec, поэтому при проверке схема не
+интерпретируется: остаются только сравнения типов и поиск в frozenset.
+Ошибки собираются медленным путем, только если быстрый вернул False.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# Определения из https://petstore.swagger.io/v2/swagger.json
+PETSTORE_DEFINITIONS: Dict[str, Dict[str, Any]] = {
+    "ApiResponse": {
+        "type": "object",
+        "properties": {
+            "code": {"type": "integer", "format": "int32"},
+            "type": {"type": "string"},
+            "message": {"type": "string"},
+        },
+    },
+    "Category": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+        },
+    },
+    "Pet": {
+        "type": "object",
+        "required": ["name", "photoUrls"],
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "category": {"$ref": "#/definitions/Category"},
+            "name": {"type": "string", "example": "doggie"},
+            "photoUrls": {"type": "array", "items": {"type": "string"}},
+            "tags": {"type": "array", "items": {"$ref": "#/definitions/Tag"}},
+            "status": {"type": "string", "description": "pet status in the store",
+                       "enum": ["available", "pending", "sold"]},
+        },
+    },
+    "Tag": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+        },
+    },
+    "Order": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "petId": {"type": "integer", "format": "int64"},
+            "quantity": {"type": "integer", "format": "int32"},
+            "shipDate": {"type": "string", "format": "date-time"},
+            "status": {"type": "string", "description": "Order Status",
+                       "enum": ["placed", "approved", "delivered"]},
+            "complete": {"type": "boolean"},
+        },
+    },
+    "User": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "username": {"type": "string"},
+            "firstName": {"type": "string"},
+            "lastName": {"type": "string"},
+            "email": {"type": "string"},
+            "password": {"type": "string"},
+            "phone": {"type": "string"},
+            "userStatus": {"type": "integer", "format": "int32", "description": "User Status"},
+        },
+    },
+    # Ответ GET /store/inventory: статус -> количество
+    "Inventory": {
+        "type": "object",
+        "additionalProperties": {"type": "integer", "format": "int32"},
+    },
+}
+
+_INTEGER_RANGES = {
+    "int32": (-(1 << 31), (1 << 31) - 1),
+    "int64": (-(1 << 63), (1 << 63) - 1),
+}
+_DATE_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+class SchemaError:
+    """Нарушение схемы: JSON-путь и описание"""
+
+    __slots__ = ("path", "message")
+
+    def __init__(self, path: str, message: str):
+        self.path = path
+        self.message = message
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, SchemaError) and (self.path, self.message) == (other.path, other.message)
+
+    def __repr__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class SchemaValidationError(AssertionError):
+    """Ответ не соответствует схеме; errors - все найденные нарушения"""
+
+    def __init__(self, name: str, errors: List[SchemaError], limit: int = 20):
+        self.errors = errors
+        lines = [repr(error) for error in errors[:limit]]
+        if len(errors) > limit:
+            lines.append(f"... and {len(errors) - limit} more")
+        super().__init__(f"{len(errors)} {name} schema violation(s):\n" + "\n".join(lines))
+
+
+class _CodeGenerator:
+    """Превращает схемы в исходный код функций проверки"""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]]):
+        self.definitions = definitions
+        self.constants: Dict[str, Any] = {}
+        self.lines: List[str] = []
+        self._counter = 0
+
+    def constant(self, value: Any) -> str:
+        name = f"_C{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def variable(self) -> str:
+        self._counter += 1
+        return f"v{self._counter}"
+
+    def resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        ref = schema.get("$ref")
+        if ref is None:
+            return schema
+        return self.definitions[ref.rsplit("/", 1)[-1]]
+
+    def type_test(self, schema: Dict[str, Any], var: str) -> Optional[str]:
+        """Выражение, истинное для значения неверного типа (None - тип не ограничен)"""
+        kind = schema.get("type")
+        if kind == "integer":
+            low, high = _INTEGER_RANGES.get(schema.get("format"), (None, None))
+            if low is None:
+                return f"type({var}) is not int"
+            return f"type({var}) is not int or not {low} <= {var} <= {high}"
+        if kind == "number":
+            return f"type({var}) not in (int, float)"
+        if kind == "string":
+            return f"type({var}) is not str"
+        if kind == "boolean":
+            return f"type({var}) is not bool"
+        if kind == "array":
+            return f"type({var}) is not list"
+        if kind == "object" or "properties" in schema:
+            return f"type({var}) is not dict"
+        return None
+
+    # Быстрый путь: return False при первом нарушении
+    def emit_valid(self, schema: Dict[str, Any], var: str, indent: str) -> None:
+        schema = self.resolve(schema)
+        out = self.lines.append
+        test = self.type_test(schema, var)
+        if test:
+            out(f"{indent}if {test}: return False")
+        if "enum" in schema:
+            out(f"{indent}if {var} not in {self.constant(frozenset(schema['enum']))}: return False")
+        if schema.get("format") == "date-time":
+            out(f"{indent}if not {self.constant(_DATE_TIME.match)}({var}): return False")
+        if schema.get("type") == "array":
+            item = self.variable()
+            out(f"{indent}for {item} in {var}:")
+            before = len(self.lines)
+            self.emit_valid(schema.get("items", {}), item, indent + "    ")
+            if len(self.lines) == before:
+                out(f"{indent}    pass")
+        for name in schema.get("required", []):
+            out(f"{indent}if {name!r} not in {var}: return False")
+        for name, prop in schema.get("properties", {}).items():
+            value = self.variable()
+            out(f"{indent}{value} = {var}.get({name!r}, _MISSING)")
+            out(f"{indent}if {value} is not _MISSING:")
+            before = len(self.lines)
+            self.emit_valid(prop, value, indent + "    ")
+            if len(self.lines) == before:
+                out(f"{indent}    pass")
+        if isinstance(schema.get("additionalProperties"), dict):
+            key, value = self.variable(), self.variable()
+            out(f"{indent}for {key}, {value} in {var}.items():")
+            before = len(self.lines)
+            self.emit_valid(schema["additionalProperties"], value, indent + "    ")
+            if len(self.lines) == before:
+                out(f"{indent}    pass")
+
+    # Медленный путь: все нарушения с путями
+    def emit_errors(self, schema: Dict[str, Any], var: str, path: str, indent: str) -> None:
+        schema = self.resolve(schema)
+        out = self.lines.append
+        test = self.type_test(schema, var)
+        body = indent
+        if test:
+            expected = schema.get("type") or "object"
+            if schema.get("format") in _INTEGER_RANGES:
+                expected = f"{expected} ({schema['format']})"
+            message = f"expected {expected}, got "
+            out(f"{indent}if {test}:")
+            out(f"{indent}    errors.append(SchemaError({path}, {message!r} + repr({var})[:50]))")
+            out(f"{indent}else:")
+            body = indent + "    "
+        before = len(self.lines)
+        if "enum" in schema:
+            enum = self.constant(frozenset(schema["enum"]))
+            message = f"expected one of {sorted(schema['enum'])}, got "
+            out(f"{body}if {var} not in {enum}:")
+            out(f"{body}    errors.append(SchemaError({path}, {message!r} + repr({var})[:50]))")
+        if schema.get("format") == "date-time":
+            out(f"{body}if not {self.constant(_DATE_TIME.match)}({var}):")
+            out(f"{body}    errors.append(SchemaError({path}, 'expected date-time, got ' + repr({var})[:50]))")
+        if schema.get("type") == "array":
+            index, item = self.variable(), self.variable()
+            out(f"{body}for {index}, {item} in enumerate({var}):")
+            inner = len(self.lines)
+            self.emit_errors(schema.get("items", {}), item, f"{path} + '[' + str({index}) + ']'", body + "    ")
+            if len(self.lines) == inner:
+                out(f"{body}    pass")
+        for name in schema.get("required", []):
+            out(f"{body}if {name!r} not in {var}:")
+            out(f"{body}    errors.append(SchemaError({path} + {'.' + name!r}, 'required property is missing'))")
+        for name, prop in schema.get("properties", {}).items():
+            value = self.variable()
+            out(f"{body}{value} = {var}.get({name!r}, _MISSING)")
+            out(f"{body}if {value} is not _MISSING:")
+            inner = len(self.lines)
+            self.emit_errors(prop, value, f"{path} + {'.' + name!r}", body + "    ")
+            if len(self.lines) == inner:
+                out(f"{body}    pass")
+        if isinstance(schema.get("additionalProperties"), dict):
+            key, value = self.variable(), self.variable()
+            out(f"{body}for {key}, {value} in {var}.items():")
+            inner = len(self.lines)
+            self.emit_errors(schema["additionalProperties"], value, f"{path} + '.' + str({key})", body + "    ")
+            if len(self.lines) == inner:
+                out(f"{body}    pass")
+        if test and len(self.lines) == before:
+            # Кроме типа проверять нечего - ветка else не нужна
+            del self.lines[-1]
+
+    def generate(self) -> str:
+        for name, schema in self.definitions.items():
+            self.lines.append(f"def _valid_{name}(v0):")
+            self.emit_valid(schema, "v0", "    ")
+            self.lines.append("    return True")
+            self.lines.append("")
+            self.lines.append(f"def _valid_many_{name}(values):")
+            self.lines.append("    if type(values) is not list: return False")
+            self.lines.append("    for v0 in values:")
+            self.emit_valid(schema, "v0", "        ")
+            self.lines.append("    return True")
+            self.lines.append("")
+            self.lines.append(f"def _errors_{name}(v0, path, errors):")
+            self.emit_errors(schema, "v0", "path", "    ")
+            self.lines.append("")
+        return "\n".join(self.lines) + "\n"
+
+
+class SchemaValidator:
+    """Проверка значений по именованным схемам; код функций доступен в source"""
+
+    def __init__(self, definitions: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.definitions = definitions or PETSTORE_DEFINITIONS
+        generator = _CodeGenerator(self.definitions)
+        self.source = generator.generate()
+        namespace: Dict[str, Any] = {"_MISSING": object(), "SchemaError": SchemaError}
+        namespace.update(generator.constants)
+        exec(compile(self.source, "<petstore-schema>", "exec"), namespace)
+        self._valid = {name: namespace[f"_valid_{name}"] for name in self.definitions}
+        self._valid_many = {name: namespace[f"_valid_many_{name}"] for name in self.definitions}
+        self._errors = {name: namespace[f"_errors_{name}"] for name in self.definitions}
+
+    def is_valid(self, name: str, value: Any, many: bool = False) -> bool:
+        """Быстрая проверка; many=True - value это список значений схемы name"""
+        return (self._valid_many if many else self._valid)[name](value)
+
+    def errors(self, name: str, value: Any, many: bool = False, path: str = "$") -> List[SchemaError]:
+        """Все нарушения с JSON-путями (пустой список - значение корректно)"""
+        if self.is_valid(name, value, many):
+            return []
+        errors: List[SchemaError] = []
+        collect = self._errors[name]
+        if not many:
+            collect(value, path, errors)
+        elif type(value) is not list:
+            errors.append(SchemaError(path, "expected array, got " + repr(value)[:50]))
+        else:
+            for index, item in enumerate(value):
+                collect(item, f"{path}[{index}]", errors)
+        return errors
+
+    def assert_valid(self, name: str, value: Any, many: bool = False) -> None:
+        errors = self.errors(name, value, many)
+        if errors:
+            raise SchemaValidationError(name, errors)
+
+
+_default_validator: Optional[SchemaValidator] = None
+
+
+def default_validator() -> SchemaValidator:
+    """Валидатор схем Petstore, компилируется при первом обращении"""
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = SchemaValidator()
+    return _default_validator
@@ -0,0 +1,491 @@
+"""
+Длительный (soak) прогон синхронного клиента с поиском утечек.
+
+Потоки в замкнутом цикле выполняют смешанную нагрузку на pet, store и user
+через один PetstoreAPIClient. Через каждые interval секунд снимается
+состояние процесса: RSS, объем и главные источники аллокаций tracemalloc
+(рост относительно снимка после прогрева), число объектов gc, открытые
+дескрипторы и сокеты, пул соединений транспорта, кеш ответов. Снимки
+пишутся временным рядом (JSON Lines) по мере появления, поэтому прерванный
+прогон тоже оставляет данные.
+
+После прогрева ряды проверяются на монотонный рост: тау Кендалла показывает,
+насколько устойчиво значения растут, наклон Тейла-Сена - насколько быстро.
+Рост считается утечкой, если тренд устойчив и за прогон превысил порог
+метрики (LEAK_THRESHOLDS).
+
+    python -m helpers.soak --duration 3600 --interval 30 --threads 8 --local-server \\
+        --samples soak.jsonl --json soak.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import stat
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.data_generators import ImageDataGenerator
+from helpers.load_generator import Workload, _parse_operations
+from helpers.petstore_server import PetstoreServerProcess
+from helpers.rate_limit import RateLimiter
+from helpers.response_cache import ResponseCache
+from helpers.transport import TRANSPORTS
+
+# Смешанная нагрузка: создания уравновешены удалениями, чтобы данные на сервере не копились
+DEFAULT_OPERATIONS = {
+    "get_pet": 4,
+    "create_pet": 1,
+    "update_pet": 1,
+    "update_pet_with_form": 1,
+    "upload_pet_image": 1,
+    "find_pets_by_status": 1,
+    "delete_pet": 1,
+    "create_store_order": 1,
+    "get_store_order": 2,
+    "get_store_inventory": 1,
+    "delete_store_order": 1,
+    "create_user": 1,
+    "get_user": 2,
+    "update_user": 1,
+    "login_user": 1,
+    "delete_user": 1,
+}
+
+# Минимальный рост метрики за прогон, который считается утечкой
+LEAK_THRESHOLDS = {
+    "rss_bytes": 8 * 1024 * 1024,
+    "traced_bytes": 2 * 1024 * 1024,
+    "gc_objects": 10000,
+    "fds": 4,
+    "sockets": 4,
+    "pool_pools": 2,
+    "pool_idle_connections": 4,
+    "cache_entries": 100,
+    "cache_bytes": 1024 * 1024,
+}
+
+# Тренд по парам точек - O(n^2), поэтому длинные ряды прореживаются
+MAX_TREND_POINTS = 200
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _descriptors() -> Tuple[Optional[int], Optional[int]]:
+    """Открытые дескрипторы процесса и сколько из них сокеты (Linux: /proc/self/fd, macOS: /dev/fd)"""
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        fds = sockets = 0
+        for name in names:
+            try:
+                mode = os.fstat(int(name)).st_mode
+            except (OSError, ValueError):
+                # Дескриптор самого listdir уже закрыт
+                continue
+            fds += 1
+            if stat.S_ISSOCK(mode):
+                sockets += 1
+        return fds, sockets
+    return None, None
+
+
+def growth_trend(times: List[float], values: List[float]) -> Tuple[float, float]:
+    """Тау Кендалла (1 - ряд только растет) и наклон Тейла-Сена (единиц в секунду)"""
+    if len(values) > MAX_TREND_POINTS:
+        step = len(values) / MAX_TREND_POINTS
+        indexes = [int(i * step) for i in range(MAX_TREND_POINTS)] + [len(values) - 1]
+        times = [times[i] for i in indexes]
+        values = [values[i] for i in indexes]
+    score = 0
+    slopes = []
+    for i in range(len(values)):
+        for j in range(i + 1, len(values)):
+            delta = values[j] - values[i]
+            score += (delta > 0) - (delta < 0)
+            if times[j] > times[i]:
+                slopes.append(delta / (times[j] - times[i]))
+    pairs = len(values) * (len(values) - 1) / 2
+    return (score / pairs if pairs else 0.0), (statistics.median(slopes) if slopes else 0.0)
+
+
+class LeakFinding:
+    __slots__ = ("metric", "tau", "slope", "first", "last", "span")
+
+    def __init__(self, metric: str, tau: float, slope: float, first: float, last: float, span: float):
+        self.metric = metric
+        self.tau = tau
+        self.slope = slope
+        self.first = first
+        self.last = last
+        self.span = span
+
+    @property
+    def growth(self) -> float:
+        """Рост по тренду за анализируемый отрезок"""
+        return self.slope * self.span
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "metric": self.metric,
+            "tau": round(self.tau, 3),
+            "per_hour": self.slope * 3600,
+            "growth": self.growth,
+            "first": self.first,
+            "last": self.last,
+        }
+
+    def __repr__(self) -> str:
+        return f"LeakFinding({self.metric}: {self.first} -> {self.last}, tau={self.tau:.2f})"
+
+
+def find_leaks(samples: List[Dict[str, Any]], warmup: float, min_samples: int = 5,
+               min_tau: float = 0.6) -> List[LeakFinding]:
+    """Метрики из LEAK_THRESHOLDS с устойчивым ростом после прогрева"""
+    samples = [sample for sample in samples if sample["t"] >= warmup]
+    if len(samples) < min_samples:
+        return []
+    findings = []
+    for metric, threshold in LEAK_THRESHOLDS.items():
+        points = [(sample["t"], sample[metric]) for sample in samples if sample.get(metric) is not None]
+        if len(points) < min_samples:
+            continue
+        times = [t for t, _ in points]
+        values = [value for _, value in points]
+        tau, slope = growth_trend(times, values)
+        finding = LeakFinding(metric, tau, slope, values[0], values[-1], times[-1] - times[0])
+        if tau >= min_tau and finding.growth >= threshold:
+            findings.append(finding)
+    return findings
+
+
+class SoakReport:
+    def __init__(self, samples: List[Dict[str, Any]], findings: List[LeakFinding],
+                 top_allocators: List[Dict[str, Any]], operations: Dict[str, Dict[str, int]], elapsed: float):
+        self.samples = samples
+        self.findings = findings
+        self.top_allocators = top_allocators
+        self.operations = operations
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": self.elapsed,
+            "ok": self.ok,
+            "leaks": [finding.to_dict() for finding in self.findings],
+            "top_allocators": self.top_allocators,
+            "operations": self.operations,
+            "samples": len(self.samples),
+        }
+
+    def format_table(self) -> str:
+        flagged = {finding.metric for finding in self.findings}
+        lines = [f"{'metric':<24}{'first':>16}{'last':>16}  leak"]
+        for metric in LEAK_THRESHOLDS:
+            values = [sample[metric] for sample in self.samples if sample.get(metric) is not None]
+            if values:
+                lines.append(f"{metric:<24}{values[0]:>16}{values[-1]:>16}  "
+                             + ("YES" if metric in flagged else "no"))
+        requests_total = sum(item["requests"] for item in self.operations.values())
+        errors_total = sum(item["errors"] for item in self.operations.values())
+        lines.append(f"requests={requests_total} errors={errors_total} elapsed={self.elapsed:.0f}s")
+        for allocator in self.top_allocators:
+            lines.append(f"  {allocator['size_diff']:+d} B {allocator['count_diff']:+d} blocks  {allocator['where']}")
+        return "\n".join(lines)
+
+
+class SoakRunner:
+    """Замкнутый цикл операций клиента в нескольких потоках со снимками состояния процесса"""
+
+    def __init__(
+        self,
+        client: PetstoreAPIClient,
+        operations: Optional[Dict[str, float]] = None,
+        duration: float = 3600.0,
+        interval: float = 30.0,
+        warmup: float = 60.0,
+        threads: int = 4,
+        seed: Optional[int] = None,
+        seed_entities: int = 20,
+        max_pool: int = 1000,
+        tracemalloc_frames: int = 1,
+        top: int = 5,
+        on_sample: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """tracemalloc_frames - глубина стека аллокаций (0 - без tracemalloc, он замедляет
+        клиент в разы); top - сколько источников роста памяти включать в снимок;
+        on_sample(sample) вызывается для каждого снимка по мере прогона"""
+        self.operations = dict(operations or DEFAULT_OPERATIONS)
+        for operation in self.operations:
+            if not callable(getattr(client, operation, None)):
+                raise ValueError(f"Unknown client method: {operation}")
+        self.client = client
+        self.duration = duration
+        self.interval = interval
+        self.warmup = warmup
+        self.threads = threads
+        self.seed_entities = seed_entities
+        self.tracemalloc_frames = tracemalloc_frames
+        self.top = top
+        self.on_sample = on_sample
+        self.rng = random.Random(seed)
+        self.workload = Workload(self.rng, max_pool=max_pool)
+        self.samples: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._counts: Dict[str, Dict[str, int]] = {name: {"requests": 0, "errors": 0} for name in self.operations}
+        self._image_paths: List[str] = []
+        self._baseline: Optional[Dict[Tuple[str, int], Tuple[int, int]]] = None
+        self._top_allocators: List[Dict[str, Any]] = []
+
+    def _arguments(self, operation: str) -> Tuple[Any, ...]:
+        with self._lock:
+            if operation == "upload_pet_image":
+                # Загрузка из файла: проверяем, что отображения и дескрипторы файлов не копятся
+                return (self.workload.arguments("get_pet")[0], self.rng.choice(self._image_paths), "soak")
+            return self.workload.arguments(operation)
+
+    def _call(self, operation: str) -> bool:
+        args = self._arguments(operation)
+        try:
+            response = getattr(self.client, operation)(*args)
+            ok = response.status_code < 400
+            response.close()
+        except Exception:
+            ok = False
+        with self._lock:
+            counts = self._counts[operation]
+            counts["requests"] += 1
+            if ok:
+                self.workload.on_success(operation, args)
+            else:
+                counts["errors"] += 1
+        return ok
+
+    def _loop(self) -> None:
+        names = list(self.operations)
+        weights = [self.operations[name] for name in names]
+        while not self._stop.is_set():
+            self._running.wait()
+            with self._lock:
+                operation = self.rng.choices(names, weights)[0]
+            self._call(operation)
+
+    def _allocators(self) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+        if not tracemalloc.is_tracing():
+            return None, []
+        # Сводка по строкам считается один раз на снимок: compare_to и filter_traces
+        # перебирают все трассы на Python и на сотнях тысяч трасс занимают секунды.
+        # Аллокации самого прогона (временной ряд снимков) не учитываются
+        current = {
+            (stat.traceback[0].filename, stat.traceback[0].lineno): (stat.size, stat.count)
+            for stat in tracemalloc.take_snapshot().statistics("lineno")
+            if stat.traceback[0].filename not in (tracemalloc.__file__, __file__, "<unknown>")
+        }
+        traced = sum(size for size, _ in current.values())
+        if self._baseline is None:
+            self._baseline = current
+            return traced, []
+        growth = []
+        for where, (size, count) in current.items():
+            base_size, base_count = self._baseline.get(where, (0, 0))
+            if size > base_size:
+                growth.append((size - base_size, count - base_count, where))
+        growth.sort(reverse=True)
+        return traced, [
+            {"where": f"{filename}:{lineno}", "size_diff": size_diff, "count_diff": count_diff}
+            for size_diff, count_diff, (filename, lineno) in growth[:self.top]
+        ]
+
+    def sample(self, elapsed: float) -> Dict[str, Any]:
+        fds, sockets = _descriptors()
+        with self._lock:
+            requests_total = sum(counts["requests"] for counts in self._counts.values())
+            errors_total = sum(counts["errors"] for counts in self._counts.values())
+            workload_ids = sum(len(pool) for pool in self.workload.pools.values())
+        sample: Dict[str, Any] = {
+            "t": round(elapsed, 3),
+            "requests": requests_total,
+            "errors": errors_total,
+            "rss_bytes": _rss_bytes(),
+            "gc_objects": len(gc.get_objects()),
+            "fds": fds,
+            "sockets": sockets,
+            "workload_ids": workload_ids,
+        }
+        sample.update((f"pool_{name}", value) for name, value in self.client.transport.pool_stats().items())
+        if self.client.cache is not None:
+            stats = self.client.cache.stats()
+            sample["cache_entries"] = stats["entries"]
+            sample["cache_bytes"] = stats["bytes"]
+        # Базовый снимок аллокаций - первый после прогрева, рост до него не интересен
+        if elapsed >= self.warmup or self._baseline is not None:
+            # Снимок tracemalloc разбирается на Python: без паузы потоки нагрузки растягивают его в разы
+            self._running.clear()
+            try:
+                traced, top = self._allocators()
+            finally:
+                self._running.set()
+            sample["traced_bytes"] = traced
+            sample["top_allocators"] = top
+            if top:
+                self._top_allocators = top
+        # В памяти ряд хранится без списка аллокаторов: словари только с числами не попадают в gc
+        self.samples.append({name: value for name, value in sample.items() if name != "top_allocators"})
+        if self.on_sample is not None:
+            self.on_sample(sample)
+        return sample
+
+    def _seed(self) -> None:
+        for operation in ("create_pet", "create_store_order", "create_user"):
+            if operation in self.operations:
+                for _ in range(self.seed_entities):
+                    self._call(operation)
+        with self._lock:
+            self._counts = {name: {"requests": 0, "errors": 0} for name in self.operations}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> SoakReport:
+        images_dir = tempfile.mkdtemp(prefix="petstore-soak-")
+        started_tracing = self.tracemalloc_frames > 0 and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.tracemalloc_frames)
+        workers = [threading.Thread(target=self._loop, name=f"soak-{i}", daemon=True) for i in range(self.threads)]
+        start = time.monotonic()
+        try:
+            images = ImageDataGenerator.generate_batch(Workload.IMAGES, seed=self.rng.getrandbits(32))
+            for index, image in enumerate(images):
+                path = os.path.join(images_dir, f"pet-{index}.png")
+                with open(path, "wb") as f:
+                    f.write(image)
+                self._image_paths.append(path)
+            self._seed()
+            start = time.monotonic()
+            for worker in workers:
+                worker.start()
+            self.sample(0.0)
+            deadline = start + self.duration
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                self._stop.wait(min(self.interval - (now - start) % self.interval, deadline - now))
+                if time.monotonic() < deadline and not self._stop.is_set():
+                    self.sample(time.monotonic() - start)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            self._running.set()
+            for worker in workers:
+                if worker.is_alive():
+                    worker.join()
+            shutil.rmtree(images_dir, ignore_errors=True)
+        elapsed = time.monotonic() - start
+        self.sample(elapsed)
+        if started_tracing:
+            tracemalloc.stop()
+        with self._lock:
+            operations = {name: dict(counts) for name, counts in self._counts.items()}
+        return SoakReport(self.samples, find_leaks(self.samples, self.warmup), self._top_allocators,
+                          operations, elapsed)
+
+
+def _run(args: argparse.Namespace, base_url: str) -> SoakReport:
+    client = PetstoreAPIClient(
+        base_url=base_url,
+        transport=args.transport,
+        pool_maxsize=max(10, args.threads),
+        timeout=args.timeout,
+        rate_limiter=RateLimiter(args.rate) if args.rate else None,
+        cache=ResponseCache() if args.cache else None,
+    )
+    samples_file = open(args.samples, "w") if args.samples else None
+
+    def on_sample(sample: Dict[str, Any]) -> None:
+        print(f"t={sample['t']:.0f}s requests={sample['requests']} errors={sample['errors']} "
+              f"rss={sample['rss_bytes']} fds={sample['fds']} sockets={sample['sockets']}", file=sys.stderr)
+        if samples_file is not None:
+            samples_file.write(json.dumps(sample) + "\n")
+            samples_file.flush()
+
+    try:
+        runner = SoakRunner(
+            client,
+            _parse_operations(args.op) if args.op else None,
+            duration=args.duration,
+            interval=args.interval,
+            warmup=args.warmup,
+            threads=args.threads,
+            seed=args.seed,
+            tracemalloc_frames=args.tracemalloc_frames,
+            top=args.top,
+            on_sample=on_sample,
+        )
+        return runner.run()
+    finally:
+        client.close()
+        if samples_file is not None:
+            samples_file.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="petstore-soak", description="Длительный прогон клиента с поиском утечек")
+    parser.add_argument("--base-url", default=PetstoreAPIClient.BASE_URL)
+    parser.add_argument("--local-server", action="store_true", help="поднять локальный Petstore в отдельном процессе")
+    parser.add_argument("--duration", type=float, default=3600.0, help="длительность прогона, с")
+    parser.add_argument("--interval", type=float, default=30.0, help="интервал снимков, с")
+    parser.add_argument("--warmup", type=float, default=60.0, help="прогрев, не учитываемый в поиске утечек, с")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--rate", type=float, help="ограничение интенсивности, запросов в секунду")
+    parser.add_argument("--op", action="append", help="метод клиента с весом: get_pet=3 (можно повторять)")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="requests")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--cache", action="store_true", help="включить кеш ответов клиента")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1, help="глубина стека tracemalloc (0 - выключить)")
+    parser.add_argument("--top", type=int, default=5, help="источников роста памяти в снимке")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--samples", help="временной ряд снимков (JSON Lines)")
+    parser.add_argument("--json", help="сохранить итоговый отчет в JSON")
+    args = parser.parse_args(argv)
+
+    if args.local_server:
+        with PetstoreServerProcess() as server:
+            report = _run(args, server.base_url)
+    else:
+        report = _run(args, args.base_url)
+
+    print(report.format_table())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    # Ненулевой код, чтобы долгие задания падали при найденной утечке
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Трассировка запросов клиента в формате Chrome Trace Event (JSON).
+
+Файл открывается в https://ui.perfetto.dev или chrome://tracing. Каждый запрос -
+span "<METHOD> <endpoint template>", внутри него по времени вложены фазы:
+    rate_limit_wait, concurrency_wait - ожидание бюджета и места под предел;
+    attempt - одна попытка; retry_sleep - пауза перед повтором;
+    dns, connect, tls - установка нового соединения;
+    send - отправка запроса; ttfb - ожидание первого байта ответа (время
+    сервера и сети); download - чтение тела.
+Все span-ы помечены node id текущего pytest-теста и шаблоном endpoint-а, а
+сами тесты (setup/call/teardown) пишутся отдельными span-ами того же потока.
+
+Транспорты отмечают фазы через phase(name): если в потоке нет активного
+запроса с трассировкой, это общий объект-заглушка без затрат на замер.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def tag(self, **args) -> None:
+        """Дополнительные метки span-а (фазы запроса сохраняют исходные)"""
+        self.args = {**self.args, **args}
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.tag(error=exc_type.__name__)
+        self.tracer.add(self.name, self.category, self.start, time.perf_counter_ns(), self.args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def phase(name: str):
+    """Фаза текущего запроса (контекстный менеджер); без трассировки ничего не делает"""
+    tracer = getattr(_local, "tracer", None)
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name, "phase", _local.args)
+
+
+def active() -> bool:
+    """Идет ли в этом потоке запрос с трассировкой"""
+    return getattr(_local, "tracer", None) is not None
+
+
+def record(name: str, start_ns: int) -> None:
+    """Фаза текущего запроса, начавшаяся в start_ns (perf_counter_ns) и закончившаяся сейчас"""
+    tracer = getattr(_local, "tracer", None)
+    if tracer is not None:
+        tracer.add(name, "phase", start_ns, time.perf_counter_ns(), _local.args)
+
+
+class _RequestSpan(_Span):
+    __slots__ = ("previous",)
+
+    def __enter__(self) -> "_RequestSpan":
+        self.previous = (getattr(_local, "tracer", None), getattr(_local, "args", None))
+        _local.tracer, _local.args = self.tracer, self.args
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _local.tracer, _local.args = self.previous
+        super().__exit__(exc_type, exc, tb)
+
+
+class Tracer:
+    """Собирает span-ы процесса; node_id - тест, которому приписываются новые запросы"""
+
+    def __init__(self, process_name: str = "pytest"):
+        self.process_name = process_name
+        self.node_id: Optional[str] = None
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._merged: List[Dict[str, Any]] = []
+        self._pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+        # Смещение до эпохи: файлы воркеров и управляющего процесса сводятся на одну шкалу
+        self._epoch_us = time.time_ns() // 1000 - (time.perf_counter_ns() - self._origin) // 1000
+
+    def request(self, name: str, endpoint: str) -> _RequestSpan:
+        """Span запроса; фазы транспорта внутри него получают те же метки"""
+        return _RequestSpan(self, name, "request", {"node": self.node_id, "endpoint": endpoint})
+
+    def span(self, name: str, category: str, **args) -> _Span:
+        return _Span(self, name, category, {"node": self.node_id, **args})
+
+    def add(self, name: str, category: str, start_ns: int, end_ns: int, args: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        tid = thread.ident or 0
+        if tid not in self._threads:
+            self._threads[tid] = thread.name
+        self._events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._epoch_us + (start_ns - self._origin) // 1000,
+            "dur": max(0, (end_ns - start_ns) // 1000),
+            "pid": self._pid,
+            "tid": tid,
+            "args": args,
+        })
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        return list(self._events)
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """События вместе с метаданными (имена процесса и потоков) и событиями воркеров"""
+        metadata = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self.process_name}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in sorted(self._threads.items())
+        ]
+        return metadata + self.events + self._merged
+
+    def merge(self, events: List[Dict[str, Any]]) -> None:
+        """Добавить события другого процесса (воркера) - у них свой pid и та же шкала времени"""
+        self._merged.extend(events)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def load_trace_events(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["traceEvents"]
+
+
+def summarize(events: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Суммарное время (мс) и число span-ов по фазам и запросам - куда ушло время"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for event in events:
+        if event.get("ph") != "X" or event.get("cat") not in ("request", "phase"):
+            continue
+        item = summary.setdefault(event["name"] if event["cat"] == "phase" else "request",
+                                  {"count": 0, "total_ms": 0.0})
+        item["count"] += 1
+        item["total_ms"] += event["dur"] / 1000
+    return summary
@@ -0,0 +1,661 @@
+"""
+Транспорты PetstoreAPIClient: как запрос уходит в сеть.
+
+Transport.request(method, url, **kwargs) принимает те же аргументы, что
+requests.Session.request (params, json, data, headers, timeout, stream), и
+возвращает requests.Response, поэтому методы клиента, метрики, кассеты и кеш
+от транспорта не зависят.
+
+RequestsTransport - requests.Session с HTTPAdapter, транспорт по умолчанию.
+
+RawHTTPTransport - HTTP/1.1 поверх socket из стандартной библиотеки для
+высокоинтенсивных сценариев против быстрого (локального) сервера. У requests
+на каждый вызов уходят сотни микросекунд CPU: Request -> PreparedRequest,
+слияние настроек сессии, хуки, cookie jar, urllib3 и разбор заголовков через
+email.parser. Здесь запрос собирается одной строкой байтов, ответ читается из
+буферизованного файла сокета, соединения держатся в пуле keep-alive. Не
+поддерживаются прокси из окружения, редиректы и Set-Cookie (cookies из
+transport.cookies отправляются).
+
+Оба транспорта отмечают фазы запроса для helpers.tracing: dns, connect, tls,
+send, ttfb, download (у RequestsTransport DNS входит в connect).
+"""
+import json
+import select
+import socket
+import ssl
+import threading
+import time
+import zlib
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.utils import get_encoding_from_headers, requote_uri
+
+from helpers.tracing import active, phase, record
+from helpers.multipart import MultipartEncoder
+from helpers.resilience import IDEMPOTENT_METHODS
+
+Timeout = Optional[Union[float, Tuple[Optional[float], Optional[float]]]]
+
+MAX_LINE = 65536
+# Тело меньше этого размера отправляется одним sendall вместе с заголовками
+INLINE_BODY = 16384
+
+
+class Transport:
+    """Отправка запросов клиента; headers и cookies - значения по умолчанию для всех запросов"""
+
+    headers: CaseInsensitiveDict
+    cookies: RequestsCookieJar
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Состояние пула: число пулов по хостам и простаивающих соединений"""
+        return {}
+
+
+# Конец ожидания ответа в текущем потоке: от него до возврата из requests идет чтение тела
+_response_started = threading.local()
+
+
+class _TracedConnection:
+    """Фазы трассировки для соединений urllib3; DNS входит в connect - urllib3 разрешает имя
+    внутри create_connection"""
+
+    def _new_conn(self):
+        with phase("connect"):
+            sock = super()._new_conn()
+        self._connected_ns = time.perf_counter_ns()
+        return sock
+
+    def request(self, *args, **kwargs):
+        with phase("send"):
+            return super().request(*args, **kwargs)
+
+    def getresponse(self):
+        with phase("ttfb"):
+            response = super().getresponse()
+        _response_started.ns = time.perf_counter_ns()
+        return response
+
+
+class _TracedHTTPConnection(_TracedConnection, HTTPConnection):
+    pass
+
+
+class _TracedHTTPSConnection(_TracedConnection, HTTPSConnection):
+    def connect(self) -> None:
+        super().connect()
+        record("tls", self._connected_ns)
+
+
+class _TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+class _TracedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TracedHTTPConnectionPool,
+                                                   "https": _TracedHTTPSConnectionPool}
+
+
+class RequestsTransport(Transport):
+    """requests.Session с пулом соединений HTTPAdapter"""
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True):
+        self.session = requests.Session()
+        adapter = _TracedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    @property
+    def headers(self) -> CaseInsensitiveDict:
+        return self.session.headers
+
+    @headers.setter
+    def headers(self, value: CaseInsensitiveDict) -> None:
+        self.session.headers = value
+
+    @property
+    def cookies(self) -> RequestsCookieJar:
+        return self.session.cookies
+
+    @cookies.setter
+    def cookies(self, value: RequestsCookieJar) -> None:
+        self.session.cookies = value
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not active():
+            return self.session.request(method, url, **kwargs)
+        _response_started.ns = None
+        response = self.session.request(method, url, **kwargs)
+        if _response_started.ns is not None and not kwargs.get("stream"):
+            record("download", _response_started.ns)
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+    def pool_stats(self) -> Dict[str, int]:
+        pools = idle = 0
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                pools += 1
+                # Очередь urllib3 заполнена None вместо еще не открытых соединений
+                idle += sum(1 for connection in list(pool.pool.queue) if connection is not None)
+        return {"pools": pools, "idle_connections": idle}
+
+
+class _Connection:
+    __slots__ = ("sock", "reader", "reused")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader = sock.makefile("rb", buffering=MAX_LINE)
+        self.reused = False
+
+    def dropped(self) -> bool:
+        """Простаивающее соединение, читаемое без запроса, закрыто сервером"""
+        try:
+            if hasattr(select, "poll"):
+                # poll, а не select: select не работает с дескрипторами больше FD_SETSIZE
+                poller = select.poll()
+                poller.register(self.sock, select.POLLIN)
+                return bool(poller.poll(0))
+            return bool(select.select([self.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class _StaleConnection(Exception):
+    """Переиспользованное соединение закрыто до ответа - запрос можно отправить заново"""
+
+
+def _open_socket(addresses: List[Tuple], timeout: Optional[float]) -> socket.socket:
+    """Как socket.create_connection: первый адрес, к которому удалось подключиться"""
+    error: Optional[OSError] = None
+    for family, kind, proto, _, address in addresses:
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(address)
+            return sock
+        except OSError as exc:
+            sock.close()
+            error = exc
+    raise error or OSError("getaddrinfo returned no addresses")
+
+
+class _ConnectionPool:
+    """Простаивающие keep-alive соединения к одному хосту (не больше maxsize)"""
+
+    def __init__(self, scheme: str, host: str, port: int, maxsize: int, block: bool,
+                 ssl_context: Optional[ssl.SSLContext]):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxsize = maxsize
+        self._ssl_context = ssl_context
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxsize) if block else None
+
+    def get(self, connect_timeout: Optional[float]) -> _Connection:
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return self._connect(connect_timeout)
+                if not connection.dropped():
+                    connection.reused = True
+                    return connection
+                connection.close()
+        except BaseException:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+
+    def _connect(self, timeout: Optional[float]) -> _Connection:
+        try:
+            # Разрешение имени отдельно от соединения, чтобы в трассировке были обе фазы
+            with phase("dns"):
+                addresses = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+            with phase("connect"):
+                sock = _open_socket(addresses, timeout)
+        except socket.timeout as exc:
+            raise requests.ConnectTimeout(f"Connection to {self.host}:{self.port} timed out") from exc
+        except OSError as exc:
+            raise requests.ConnectionError(f"Failed to connect to {self.host}:{self.port}: {exc}") from exc
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._ssl_context is not None:
+            try:
+                with phase("tls"):
+                    sock = self._ssl_context.wrap_socket(sock, server_hostname=self.host)
+            except ssl.SSLError as exc:
+                sock.close()
+                raise requests.exceptions.SSLError(str(exc)) from exc
+            except OSError as exc:
+                sock.close()
+                raise requests.ConnectionError(str(exc)) from exc
+        return _Connection(sock)
+
+    def put(self, connection: _Connection, keep: bool) -> None:
+        if keep:
+            with self._lock:
+                if len(self._idle) < self.maxsize:
+                    self._idle.append(connection)
+                    connection = None
+        if connection is not None:
+            connection.close()
+        if self._slots is not None:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class _StreamBody:
+    """raw для stream=True: тело читается из соединения по мере iter_content,
+    соединение возвращается в пул, когда тело дочитано"""
+
+    def __init__(self, pool: _ConnectionPool, connection: _Connection, length: Optional[int], chunked: bool,
+                 keep: bool):
+        self._pool = pool
+        self._connection = connection
+        self._remaining = length
+        self._chunked = chunked
+        self._chunk_left = 0
+        self._keep = keep
+
+    def read(self, size: int = -1) -> bytes:
+        connection = self._connection
+        if connection is None:
+            return b""
+        try:
+            if self._chunked:
+                data = self._read_chunked(connection.reader, size)
+            elif self._remaining is None:
+                data = connection.reader.read(size) if size >= 0 else connection.reader.read()
+                if not data:
+                    self._release(keep=False)
+                return data
+            else:
+                wanted = self._remaining if size < 0 else min(size, self._remaining)
+                data = connection.reader.read(wanted)
+                if len(data) < wanted:
+                    raise requests.exceptions.ChunkedEncodingError("Connection closed before the body ended")
+                self._remaining -= len(data)
+                if not self._remaining:
+                    self._release(self._keep)
+                return data
+        except requests.RequestException:
+            self._release(keep=False)
+            raise
+        except (OSError, ValueError) as exc:
+            self._release(keep=False)
+            raise requests.ConnectionError(str(exc)) from exc
+        return data
+
+    def _read_chunked(self, reader, size: int) -> bytes:
+        if not self._chunk_left:
+            self._chunk_left = int(reader.readline(MAX_LINE).split(b";", 1)[0], 16)
+            if not self._chunk_left:
+                while reader.readline(MAX_LINE) not in (b"\r\n", b"\n", b""):
+                    pass
+                self._release(self._keep)
+                return b""
+        wanted = self._chunk_left if size < 0 else min(size, self._chunk_left)
+        data = reader.read(wanted)
+        self._chunk_left -= len(data)
+        if not self._chunk_left:
+            reader.readline(MAX_LINE)
+        return data
+
+    def _release(self, keep: bool) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool.put(connection, keep)
+
+    def close(self) -> None:
+        # Недочитанное тело оставило бы в соединении мусор - его нельзя переиспользовать
+        self._release(keep=False)
+
+    def release_conn(self) -> None:
+        self.close()
+
+
+def _split_timeout(timeout: Timeout) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+class RawHTTPTransport(Transport):
+    """HTTP/1.1 на сокетах стандартной библиотеки с пулом keep-alive соединений"""
+
+    USER_AGENT = "petstore-raw-http/1.0"
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, ssl_context: Optional[ssl.SSLContext] = None):
+        """pool_connections - для совместимости с RequestsTransport (пулы по хостам не ограничены);
+        ssl_context по умолчанию проверяет сертификаты по тому же набору CA, что requests"""
+        self.headers = CaseInsensitiveDict({
+            "User-Agent": self.USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+            "Accept": "*/*",
+            "Connection": "keep-alive" if keep_alive else "close",
+        })
+        self.cookies = RequestsCookieJar()
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._ssl_context = ssl_context
+        self._pools: Dict[Tuple[str, str, int], _ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, host: str, port: Optional[int]) -> _ConnectionPool:
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    context = None
+                    if scheme == "https":
+                        if self._ssl_context is None:
+                            self._ssl_context = ssl.create_default_context(cafile=requests.certs.where())
+                        context = self._ssl_context
+                    default_port = 443 if scheme == "https" else 80
+                    pool = self._pools[key] = _ConnectionPool(
+                        scheme, host, port or default_port, self.pool_maxsize, self.pool_block, context,
+                    )
+        return pool
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def pool_stats(self) -> Dict[str, int]:
+        pools = list(self._pools.values())
+        return {"pools": len(pools), "idle_connections": sum(len(pool._idle) for pool in pools)}
+
+    def _encode_body(self, kwargs: Dict[str, Any], headers: Dict[str, str]) -> Any:
+        if kwargs.get("json") is not None:
+            headers.setdefault("Content-Type", "application/json")
+            return json.dumps(kwargs["json"], allow_nan=False).encode("utf-8")
+        files = kwargs.get("files")
+        data = kwargs.get("data")
+        if files:
+            data = MultipartEncoder(
+                {str(key): str(value) for key, value in (data or {}).items()},
+                {name: value if isinstance(value, tuple) else (name, value) for name, value in files.items()},
+            )
+            headers["Content-Type"] = data.content_type
+            return data
+        if data is None or data == {}:
+            return None
+        if isinstance(data, dict):
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+            return urlencode(list(data.items()), doseq=True).encode("utf-8")
+        if isinstance(data, str):
+            return data.encode("utf-8")
+        return data
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        split = urlsplit(url)
+        path = split.path or "/"
+        if not path.isascii() or " " in path:
+            path = requote_uri(path)
+        query = split.query
+        params = kwargs.get("params")
+        if params:
+            encoded = urlencode([(key, value) for key, value in params.items() if value is not None], doseq=True)
+            query = f"{query}&{encoded}" if query else encoded
+        target = f"{path}?{query}" if query else path
+
+        headers = dict(self.headers)
+        for name, value in (kwargs.get("headers") or {}).items():
+            # Как в requests: None убирает заголовок по умолчанию
+            for existing in [key for key in headers if key.lower() == name.lower()]:
+                del headers[existing]
+            if value is not None:
+                headers[name] = value
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{cookie.name}={cookie.value}" for cookie in self.cookies)
+        body = self._encode_body(kwargs, headers)
+        if body is not None:
+            if isinstance(body, (bytes, bytearray, memoryview)) or hasattr(body, "__len__"):
+                headers["Content-Length"] = str(len(body))
+            else:
+                headers["Transfer-Encoding"] = "chunked"
+        elif method not in ("GET", "HEAD", "DELETE", "OPTIONS"):
+            headers["Content-Length"] = "0"
+
+        host = split.hostname or ""
+        netloc_host = split.netloc.rsplit("@", 1)[-1]
+        head = "".join([f"{method} {target} HTTP/1.1\r\nHost: {netloc_host}\r\n"]
+                       + [f"{name}: {value}\r\n" for name, value in headers.items()]
+                       + ["\r\n"]).encode("latin-1")
+
+        connect_timeout, read_timeout = _split_timeout(kwargs.get("timeout"))
+        pool = self._pool(split.scheme, host, split.port)
+        stream = bool(kwargs.get("stream"))
+        retried = False
+        while True:
+            connection = pool.get(connect_timeout)
+            try:
+                connection.sock.settimeout(read_timeout)
+                with phase("send"):
+                    self._send(connection, head, body)
+                response = self._read_response(pool, connection, method, stream)
+                break
+            except _StaleConnection:
+                pool.put(connection, keep=False)
+                if retried or method not in IDEMPOTENT_METHODS:
+                    raise requests.ConnectionError(f"Connection to {host} closed before response")
+                retried = True
+            except requests.RequestException:
+                # Подклассы OSError: ответ уже начал приходить, повторять нельзя
+                pool.put(connection, keep=False)
+                raise
+            except socket.timeout as exc:
+                pool.put(connection, keep=False)
+                raise requests.ReadTimeout(f"Read timed out ({read_timeout}s) for {method} {url}") from exc
+            except OSError as exc:
+                pool.put(connection, keep=False)
+                if connection.reused and not retried and method in IDEMPOTENT_METHODS:
+                    retried = True
+                    continue
+                raise requests.ConnectionError(f"{method} {url}: {exc}") from exc
+            except BaseException:
+                pool.put(connection, keep=False)
+                raise
+
+        request = requests.PreparedRequest()
+        request.method = method
+        request.url = url
+        request.headers = CaseInsensitiveDict(headers)
+        request.body = body
+        response.request = request
+        response.url = url
+        response.elapsed = timedelta(seconds=time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _send(connection: _Connection, head: bytes, body: Any) -> None:
+        sock = connection.sock
+        if body is None:
+            sock.sendall(head)
+        elif isinstance(body, (bytes, bytearray)) and len(body) <= INLINE_BODY:
+            sock.sendall(head + body)
+        elif isinstance(body, (bytes, bytearray, memoryview)):
+            sock.sendall(head)
+            sock.sendall(body)
+        elif hasattr(body, "__len__"):
+            sock.sendall(head)
+            for chunk in body:
+                sock.sendall(chunk)
+        else:
+            sock.sendall(head)
+            for chunk in body:
+                if chunk:
+                    sock.sendall(b"%x\r\n" % len(chunk) + bytes(chunk) + b"\r\n")
+            sock.sendall(b"0\r\n\r\n")
+
+    def _read_response(self, pool: _ConnectionPool, connection: _Connection, method: str,
+                       stream: bool) -> requests.Response:
+        reader = connection.reader
+        with phase("ttfb"):
+            while True:
+                try:
+                    line = reader.readline(MAX_LINE)
+                except ConnectionResetError:
+                    line = b""
+                if not line:
+                    if connection.reused:
+                        raise _StaleConnection()
+                    raise requests.ConnectionError("Remote end closed connection without response")
+                parts = line.rstrip(b"\r\n").split(b" ", 2)
+                if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+                    raise requests.ConnectionError(f"Bad status line: {line[:100]!r}")
+                status = int(parts[1])
+                raw_headers = self._read_headers(reader)
+                if status != 100:
+                    break
+
+        version = parts[0]
+        headers = CaseInsensitiveDict()
+        for name, value in raw_headers:
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        connection_header = headers.get("Connection", "").lower()
+        keep = (connection_header != "close" if version == b"HTTP/1.1" else connection_header == "keep-alive") \
+            and self.headers.get("Connection", "").lower() != "close"
+        chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        length = None
+        if not chunked and "Content-Length" in headers:
+            length = int(headers["Content-Length"])
+        no_body = method == "HEAD" or status in (204, 304) or 100 <= status < 200
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = parts[2].decode("latin-1") if len(parts) > 2 else ""
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+
+        if no_body:
+            response._content = b""
+            pool.put(connection, keep)
+        elif stream and not headers.get("Content-Encoding"):
+            response.raw = _StreamBody(pool, connection, length, chunked, keep)
+            return response
+        else:
+            with phase("download"):
+                if chunked:
+                    content = self._read_chunked(reader)
+                elif length is not None:
+                    content = reader.read(length)
+                    if len(content) < length:
+                        raise requests.exceptions.ChunkedEncodingError("Connection closed before the body ended")
+                else:
+                    content = reader.read()
+                    keep = False
+                response._content = self._decode(content, headers.get("Content-Encoding", ""))
+            pool.put(connection, keep)
+        response._content_consumed = True
+        return response
+
+    @staticmethod
+    def _read_headers(reader) -> List[Tuple[str, str]]:
+        headers = []
+        while True:
+            line = reader.readline(MAX_LINE)
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip(), value.strip()))
+
+    @staticmethod
+    def _read_chunked(reader) -> bytes:
+        chunks = []
+        while True:
+            size = int(reader.readline(MAX_LINE).split(b";", 1)[0], 16)
+            if not size:
+                while reader.readline(MAX_LINE) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(reader.read(size))
+            reader.readline(MAX_LINE)
+
+    @staticmethod
+    def _decode(content: bytes, encoding: str) -> bytes:
+        encoding = encoding.lower()
+        if not content or encoding in ("", "identity"):
+            return content
+        try:
+            if encoding == "gzip":
+                return zlib.decompress(content, 16 + zlib.MAX_WBITS)
+            if encoding == "deflate":
+                try:
+                    return zlib.decompress(content)
+                except zlib.error:
+                    return zlib.decompress(content, -zlib.MAX_WBITS)
+        except zlib.error as exc:
+            raise requests.exceptions.ContentDecodingError(str(exc)) from exc
+        return content
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "raw": RawHTTPTransport,
+}
+
+
+def make_transport(name: str, **kwargs) -> Transport:
+    try:
+        factory = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {sorted(TRANSPORTS)}") from None
+    return factory(**kwargs)
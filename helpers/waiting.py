@@ -0,0 +1,106 @@
+"""
+Ожидание eventual consistency: повтор действия с экспоненциальной задержкой и джиттером
+до выполнения условия или истечения общего дедлайна.
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 10.0
+
+
+def backoff_delays(
+    initial_delay: float = 0.05,
+    factor: float = 2.0,
+    max_delay: float = 1.0,
+    jitter: float = 0.5,
+    rng: Optional[random.Random] = None,
+) -> Iterator[float]:
+    """Бесконечная последовательность задержек: экспоненциальный рост до max_delay,
+    каждая задержка случайно уменьшена не более чем на долю jitter"""
+    rng = rng or random
+    delay = initial_delay
+    while True:
+        yield delay * (1 - jitter * rng.random())
+        delay = min(delay * factor, max_delay)
+
+
+class WaitRecord:
+    __slots__ = ("name", "attempts", "elapsed", "satisfied")
+
+    def __init__(self, name: str, attempts: int, elapsed: float, satisfied: bool):
+        self.name = name
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.satisfied = satisfied
+
+
+class WaitStats:
+    """Журнал фактических ожиданий для подбора таймаутов"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[WaitRecord] = []
+
+    def add(self, record: WaitRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            records = list(self.records)
+        result: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            item = result.setdefault(record.name, {"waits": 0, "attempts": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            item["waits"] += 1
+            item["attempts"] += record.attempts
+            item["total"] += record.elapsed
+            item["max"] = max(item["max"], record.elapsed)
+            item["timeouts"] += not record.satisfied
+        for item in result.values():
+            item["mean"] = item["total"] / item["waits"]
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+
+wait_stats = WaitStats()
+
+
+def wait_until(
+    action: Callable[[], T],
+    predicate: Callable[[T], bool] = bool,
+    timeout: float = DEFAULT_TIMEOUT,
+    initial_delay: float = 0.05,
+    max_delay: float = 1.0,
+    factor: float = 2.0,
+    jitter: float = 0.5,
+    name: Optional[str] = None,
+    stats: Optional[WaitStats] = wait_stats,
+) -> T:
+    """Вызывает action, пока predicate(результат) не станет истинным или не истечет timeout.
+
+    Возвращает последний результат action - проверку оставляем вызывающему коду,
+    чтобы assert показывал реальный ответ. Для requests.Response предикат по
+    умолчанию (bool) означает "код ответа меньше 400".
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    attempts = 0
+    delays = backoff_delays(initial_delay, factor, max_delay, jitter)
+    while True:
+        result = action()
+        attempts += 1
+        satisfied = predicate(result)
+        remaining = deadline - time.monotonic()
+        if satisfied or remaining <= 0:
+            break
+        time.sleep(min(next(delays), remaining))
+    if stats is not None:
+        stats.add(WaitRecord(name or getattr(action, "__name__", "wait"), attempts, time.monotonic() - start, satisfied))
+    return result
@@ -0,0 +1,50 @@
+"""
+Тесты API клиента - пул соединений и изоляция состояния сессии между тестами
+"""
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+
+
+class TestConnectionPool:
+    """Тесты настройки пула соединений"""
+
+    def test_pool_settings_applied(self):
+        """Проверка параметров HTTPAdapter, смонтированного в сессию"""
+        client = PetstoreAPIClient(pool_connections=3, pool_maxsize=25, pool_block=True, keep_alive=False)
+        adapter = client.session.get_adapter("https://petstore.swagger.io/v2")
+
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 25
+        assert adapter._pool_block is True
+        assert client.session.headers["Connection"] == "close"
+        client.close()
+
+    @pytest.mark.live
+    def test_connection_reused_across_requests(self, petstore_base_url):
+        """Проверка повторного использования keep-alive соединения"""
+        api_client = PetstoreAPIClient(base_url=petstore_base_url, transport="requests")
+        api_client.get_store_inventory()
+        pools = api_client.session.get_adapter(api_client.base_url).poolmanager.pools
+        [pool] = [pools[key] for key in pools.keys()]
+        connections, requests_sent = pool.num_connections, pool.num_requests
+
+        for _ in range(5):
+            api_client.get_store_inventory()
+
+        assert pool.num_requests - requests_sent == 5
+        assert pool.num_connections == connections
+        api_client.close()
+
+
+class TestSessionIsolation:
+    """Тесты изоляции заголовков и cookies"""
+
+    def test_isolated_restores_headers_and_cookies(self, api_client):
+        """Проверка отката изменений сессии после блока isolated"""
+        with api_client.isolated():
+            api_client.transport.headers["X-Test"] = "1"
+            api_client.transport.cookies.set("session", "abc")
+
+        assert "X-Test" not in api_client.transport.headers
+        assert "session" not in api_client.transport.cookies
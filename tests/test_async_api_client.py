@@ -0,0 +1,56 @@
+"""
+Тесты асинхронного API клиента - зеркальные методы и пакетный запуск через gather
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.mark.live
+class TestAsyncClient:
+    """Тесты AsyncPetstoreAPIClient"""
+
+    def test_create_and_get_pet(self, async_api_client_factory, pet_data_generator):
+        """Проверка создания и получения питомца асинхронным клиентом"""
+        pet_data = pet_data_generator.generate_pet_data()
+
+        async def scenario():
+            async with async_api_client_factory() as client:
+                create_response = await client.create_pet(pet_data)
+                get_response = await client.get_pet(pet_data["id"])
+                return create_response, get_response
+
+        create_response, get_response = asyncio.run(scenario())
+        assert create_response.status_code == 200
+        assert get_response.status_code == 200
+        assert get_response.json()["name"] == pet_data["name"]
+        assert get_response.headers.get("content-type") == "application/json"
+
+    def test_gather_with_concurrency_limit(self, async_api_client_factory, order_data_generator):
+        """Проверка пакетного создания заказов с ограничением конкурентности"""
+        orders = [order_data_generator.generate_order_data() for _ in range(50)]
+
+        async def scenario():
+            async with async_api_client_factory(max_concurrency=8) as client:
+                return await client.gather(client.create_store_order(order) for order in orders)
+
+        responses = asyncio.run(scenario())
+        assert [response.status_code for response in responses] == [200] * len(orders)
+        assert [response.json()["id"] for response in responses] == [order["id"] for order in orders]
+
+    def test_upload_image_from_file(self, async_api_client_factory, pooled_pet, tmp_path):
+        """Проверка потоковой загрузки файла и ошибки для отсутствующего файла"""
+        path = tmp_path / "photo.png"
+        path.write_bytes(bytes(range(256)) * 1024)
+
+        async def scenario():
+            async with async_api_client_factory() as client:
+                response = await client.upload_pet_image(pooled_pet["id"], file_path=str(path),
+                                                         additional_metadata="async")
+                with pytest.raises(FileNotFoundError):
+                    await client.upload_pet_image(pooled_pet["id"], file_path=str(tmp_path / "missing.png"))
+                return response
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 200
+        assert response.json()["message"] == "additionalMetadata: async\nFile uploaded to ./photo.png, 262144 bytes"
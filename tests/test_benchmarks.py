@@ -0,0 +1,196 @@
+"""
+Бенчмарки endpoint-ов клиента и генераторов данных, а также тесты статистики бенчмарков
+"""
+import pytest
+
+from helpers.benchmark import (
+    BenchmarkRegression, BenchmarkResult, BenchmarkRunner, Comparison, load_baseline, mann_whitney_u, save_results,
+)
+from helpers.data_generators import OrderDataGenerator, PetDataGenerator, UserDataGenerator
+
+
+def _created_pet(client):
+    pet = PetDataGenerator.generate_pet_data(status="available")
+    assert client.create_pet(pet).status_code == 200
+    return pet
+
+
+def _created_order(client):
+    order = OrderDataGenerator.generate_order_data()
+    assert client.create_store_order(order).status_code == 200
+    return order
+
+
+def _created_user(client):
+    user = UserDataGenerator.generate_user_data()
+    assert client.create_user(user).status_code == 200
+    return user
+
+
+# Каждый случай по клиенту и временному каталогу возвращает (вызов, setup):
+# setup выполняется вне замера и готовит аргументы очередного вызова
+ENDPOINT_CASES = {
+    "get_pet": lambda client, tmp: (client.get_pet, lambda: (_created_pet(client)["id"],)),
+    "create_pet": lambda client, tmp: (client.create_pet, lambda: (PetDataGenerator.generate_pet_data(),)),
+    "update_pet": lambda client, tmp: (
+        client.update_pet, lambda: ({**_created_pet(client), "status": "sold"},)),
+    "delete_pet": lambda client, tmp: (client.delete_pet, lambda: (_created_pet(client)["id"],)),
+    "find_pets_by_status": lambda client, tmp: (client.find_pets_by_status, lambda: ("pending",)),
+    "find_pets_by_tags": lambda client, tmp: (client.find_pets_by_tags, lambda: (["tag1", "tag2"],)),
+    "iter_pets_by_status": lambda client, tmp: (
+        lambda status: sum(1 for _ in client.iter_pets_by_status(status)), lambda: ("pending",)),
+    "iter_pets_by_tags": lambda client, tmp: (
+        lambda tags: sum(1 for _ in client.iter_pets_by_tags(tags)), lambda: (["tag1"],)),
+    "update_pet_with_form": lambda client, tmp: (
+        client.update_pet_with_form, lambda: (_created_pet(client)["id"], "Renamed", "pending")),
+    "upload_pet_image": lambda client, tmp: (
+        client.upload_pet_image, lambda: (_created_pet(client)["id"], str(tmp), "benchmark")),
+    "get_store_inventory": lambda client, tmp: (client.get_store_inventory, lambda: ()),
+    "create_store_order": lambda client, tmp: (
+        client.create_store_order, lambda: (OrderDataGenerator.generate_order_data(),)),
+    "get_store_order": lambda client, tmp: (client.get_store_order, lambda: (_created_order(client)["id"],)),
+    "delete_store_order": lambda client, tmp: (
+        client.delete_store_order, lambda: (_created_order(client)["id"],)),
+    "create_user": lambda client, tmp: (client.create_user, lambda: (UserDataGenerator.generate_user_data(),)),
+    "create_users_with_array": lambda client, tmp: (
+        client.create_users_with_array, lambda: ([UserDataGenerator.generate_user_data() for _ in range(5)],)),
+    "create_users_with_list": lambda client, tmp: (
+        client.create_users_with_list, lambda: ([UserDataGenerator.generate_user_data() for _ in range(5)],)),
+    "get_user": lambda client, tmp: (client.get_user, lambda: (_created_user(client)["username"],)),
+    "update_user": lambda client, tmp: (
+        client.update_user, lambda: (lambda user: (user["username"], {**user, "firstName": "Updated"}))(
+            _created_user(client))),
+    "delete_user": lambda client, tmp: (client.delete_user, lambda: (_created_user(client)["username"],)),
+    "login_user": lambda client, tmp: (
+        client.login_user, lambda: (lambda user: (user["username"], user["password"]))(_created_user(client))),
+    "logout_user": lambda client, tmp: (client.logout_user, lambda: ()),
+    "create_pets_bulk": lambda client, tmp: (
+        lambda pets: client.create_pets_bulk(pets).wait(),
+        lambda: ([PetDataGenerator.generate_pet_data() for _ in range(20)],)),
+    "delete_pets_bulk": lambda client, tmp: (
+        lambda ids: client.delete_pets_bulk(ids).wait(),
+        lambda: ([_created_pet(client)["id"] for _ in range(5)],)),
+    "create_orders_bulk": lambda client, tmp: (
+        lambda orders: client.create_orders_bulk(orders).wait(),
+        lambda: ([OrderDataGenerator.generate_order_data() for _ in range(20)],)),
+    "delete_orders_bulk": lambda client, tmp: (
+        lambda ids: client.delete_orders_bulk(ids).wait(),
+        lambda: ([_created_order(client)["id"] for _ in range(5)],)),
+    "create_users_bulk": lambda client, tmp: (
+        lambda users: client.create_users_bulk(users).wait(),
+        lambda: ([UserDataGenerator.generate_user_data() for _ in range(20)],)),
+    "delete_users_bulk": lambda client, tmp: (
+        lambda usernames: client.delete_users_bulk(usernames).wait(),
+        lambda: ([_created_user(client)["username"] for _ in range(5)],)),
+}
+
+GENERATOR_CASES = {
+    "generate_pet_data": (PetDataGenerator.generate_pet_data, ()),
+    "generate_order_data": (OrderDataGenerator.generate_order_data, ()),
+    "generate_user_data": (UserDataGenerator.generate_user_data, ()),
+    "pet_generate_batch": (PetDataGenerator.generate_batch, (1000,)),
+    "order_generate_batch": (OrderDataGenerator.generate_batch, (1000,)),
+    "user_generate_batch": (UserDataGenerator.generate_batch, (1000,)),
+}
+
+
+@pytest.mark.live
+class TestEndpointBenchmarks:
+    """Бенчмарки всех endpoint-ов PetstoreAPIClient"""
+
+    @pytest.mark.parametrize("case", sorted(ENDPOINT_CASES))
+    def test_endpoint(self, api_client, benchmark, tmp_path, case):
+        """Замер endpoint-а; регрессия относительно базовой выборки роняет тест"""
+        image = tmp_path / "pet.png"
+        image.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(256))
+        call, setup = ENDPOINT_CASES[case](api_client, image)
+
+        result = benchmark(call, setup=setup)
+
+        if hasattr(result, "status_code"):
+            assert result.status_code == 200
+        elif hasattr(result, "ok"):
+            assert result.ok, result.to_dict()["failures"]
+
+
+class TestGeneratorBenchmarks:
+    """Бенчмарки генераторов тестовых данных"""
+
+    @pytest.mark.parametrize("case", sorted(GENERATOR_CASES))
+    def test_generator(self, benchmark, case):
+        """Замер генерации одной сущности или пакета из 1000"""
+        generate, args = GENERATOR_CASES[case]
+        assert benchmark(generate, *args)
+
+
+class TestBenchmarkStatistics:
+    """Тесты статистики и сравнения с базовой выборкой"""
+
+    def test_result_statistics(self):
+        """Проверка медианы, перцентилей и интервала для медианы"""
+        result = BenchmarkResult("x", [5, 1, 4, 2, 3])
+
+        assert result.median == 3
+        assert result.percentile(0) == 1
+        assert result.percentile(100) == 5
+        assert result.percentile(90) == pytest.approx(4.6)
+        low, high = result.median_interval(resamples=500)
+        assert 1 <= low <= 3 <= high <= 5
+
+    def test_mann_whitney_u(self):
+        """Проверка U-критерия: сдвинутая выборка значима, одинаковая - нет"""
+        baseline = [1.0 + i / 100 for i in range(20)]
+        slower = [value + 0.5 for value in baseline]
+
+        u, p_value = mann_whitney_u(baseline, slower)
+        assert u == 400
+        assert p_value < 0.001
+        assert mann_whitney_u(baseline, baseline)[1] > 0.4
+        assert mann_whitney_u(baseline, [value - 0.5 for value in baseline])[1] > 0.99
+
+    def test_regression_requires_significance_and_ratio(self):
+        """Проверка, что регрессия - значимое замедление не меньше min_ratio"""
+        baseline = BenchmarkResult("x", [1.0 + i / 1000 for i in range(20)])
+        slightly_slower = BenchmarkResult("x", [value * 1.05 for value in baseline.samples])
+        much_slower = BenchmarkResult("x", [value * 1.5 for value in baseline.samples])
+
+        assert not Comparison([baseline], slightly_slower, alpha=0.01, min_ratio=1.1).regressed
+        assert Comparison([baseline], much_slower, alpha=0.01, min_ratio=1.1).regressed
+        assert not Comparison([baseline], BenchmarkResult("x", baseline.samples), alpha=0.01, min_ratio=1.0).regressed
+
+    def test_ratio_against_slowest_baseline_session(self):
+        """Проверка, что разброс между базовыми сессиями не считается регрессией"""
+        fast = BenchmarkResult("x", [1.0 + i / 1000 for i in range(20)])
+        slow = BenchmarkResult("x", [value * 1.4 for value in fast.samples])
+        current = BenchmarkResult("x", [value * 1.45 for value in fast.samples])
+
+        assert Comparison([fast], current, alpha=0.01, min_ratio=1.25).regressed
+        comparison = Comparison([fast, slow], current, alpha=0.01, min_ratio=1.25)
+        assert not comparison.regressed
+        assert comparison.ratio == pytest.approx(1.45 / 1.4)
+
+    def test_runner_warmup_and_regression(self):
+        """Проверка прогревочных запусков, setup вне замера и BenchmarkRegression"""
+        ticks = iter(range(1000))
+        calls = []
+        runner = BenchmarkRunner("x", rounds=10, warmup=2, clock=lambda: next(ticks))
+
+        assert runner(calls.append, setup=lambda: ("item",)) is None
+        assert len(calls) == 12
+        assert runner.result.samples == [1] * 10
+
+        baseline = [BenchmarkResult("x", [1 + i / 100 for i in range(10)])]
+        slow_ticks = iter(range(0, 1000, 2))
+        with pytest.raises(BenchmarkRegression) as error:
+            BenchmarkRunner("x", rounds=10, warmup=0, baseline=baseline, clock=lambda: next(slow_ticks))(len, "")
+        assert error.value.comparison.ratio > 1.9
+
+    def test_baseline_round_trip(self, tmp_path):
+        """Проверка сохранения сессий в файл с ограничением истории"""
+        path = str(tmp_path / "baseline.json")
+        for session in range(4):
+            save_results(path, {"x": BenchmarkResult("x", [session, 0.2, 0.3], warmup=2)}, history=3)
+
+        loaded = load_baseline(path)
+        assert [result.samples[0] for result in loaded["x"]] == [1, 2, 3]
+        assert loaded["x"][-1].warmup == 2
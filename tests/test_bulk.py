@@ -0,0 +1,89 @@
+"""
+Тесты массовых операций клиента - порядок результатов, обратное давление и отчет об ошибках
+"""
+import threading
+import time
+
+import pytest
+import requests
+
+from helpers.bulk import BulkOperation
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b""
+    return response
+
+
+class TestBulkOperation:
+    """Тесты BulkOperation без сервера"""
+
+    def test_ordered_results_and_bounded_in_flight(self):
+        """Проверка порядка результатов и ограничения числа одновременных вызовов"""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def call(item):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.002 * (item % 3))
+            with lock:
+                state["active"] -= 1
+            if item == 7:
+                raise ValueError(item)
+            return _response(404 if item == 9 else 200)
+
+        operation = BulkOperation("numbers", call, range(40), max_in_flight=4)
+        indexes = [result.index for result in operation]
+
+        assert indexes == list(range(40))
+        assert state["peak"] <= 4
+        report = operation.report
+        assert (report.total, report.succeeded) == (40, 38)
+        assert sorted(failure.item for failure in report.failures) == [7, 9]
+        assert report.status_codes == {200: 38, 404: 1, "error": 1}
+
+    def test_lazy_source_is_pulled_with_backpressure(self):
+        """Проверка, что источник читается не дальше окна max_in_flight"""
+        pulled = []
+
+        def source():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        operation = BulkOperation("lazy", lambda item: _response(200), source(), max_in_flight=5, ordered=False)
+        for result in operation:
+            if operation.report.total == 3:
+                break
+        assert len(pulled) <= 3 + 5
+
+
+@pytest.mark.live
+class TestClientBulk:
+    """Тесты массовых методов PetstoreAPIClient"""
+
+    def test_create_and_delete_pets_bulk(self, api_client, pet_data_generator):
+        """Проверка создания и удаления питомцев из ленивого генератора"""
+        pets = list(pet_data_generator.generate_batch(200))
+        report = api_client.create_pets_bulk(iter(pets), max_in_flight=8, ordered=False).wait()
+        assert (report.total, report.succeeded, report.ok) == (200, 200, True)
+
+        ids = [pet["id"] for pet in pets]
+        results = list(api_client.delete_pets_bulk(ids + [ids[0]]))
+        assert [result.item for result in results] == ids + [ids[0]]
+        assert [result.status_code for result in results] == [200] * 200 + [404]
+
+    def test_failure_report(self, api_client, user_data_generator):
+        """Проверка структурированного отчета по неуспешным элементам"""
+        users = [user_data_generator.generate_user_data() for _ in range(3)]
+        api_client.create_users_bulk(users).wait()
+        operation = api_client.delete_users_bulk([users[0]["username"], "missing_user_bulk", users[2]["username"]])
+        report = operation.wait()
+
+        assert report.succeeded == 2
+        failure = report.to_dict()["failures"][0]
+        assert (failure["index"], failure["item"], failure["status_code"]) == (1, "missing_user_bulk", 404)
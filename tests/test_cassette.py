@@ -0,0 +1,87 @@
+"""
+Тесты кассет - запись ответов и воспроизведение без обращения к серверу
+"""
+import pytest
+import requests
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.cassette import Cassette, CassetteMiss
+
+
+def _fake_response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers["Content-Type"] = "application/json"
+    response._content = content
+    return response
+
+
+class TestCassette:
+    """Тесты Cassette"""
+
+    @pytest.mark.live
+    def test_record_and_replay_client(self, tmp_path, petstore_base_url, pet_data_generator):
+        """Проверка воспроизведения записанного сценария клиентом без сети"""
+        path = str(tmp_path / "pets.cas")
+        pet_data = pet_data_generator.generate_pet_data()
+        with Cassette(path, mode="record") as cassette:
+            client = PetstoreAPIClient(base_url=petstore_base_url, cassette=cassette)
+            client.create_pet(pet_data)
+            recorded = [client.get_pet(pet_data["id"]), client.delete_pet(pet_data["id"]),
+                        client.get_pet(pet_data["id"])]
+            client.close()
+
+        with Cassette(path) as cassette:
+            client = PetstoreAPIClient(base_url="http://127.0.0.1:1/v2", cassette=cassette)
+            client.create_pet(pet_data)
+            replayed = [client.get_pet(pet_data["id"]), client.delete_pet(pet_data["id"]),
+                        client.get_pet(pet_data["id"])]
+            client.close()
+
+            assert [r.status_code for r in replayed] == [r.status_code for r in recorded] == [200, 200, 404]
+            assert replayed[0].json() == recorded[0].json()
+            assert cassette.hits == 4
+
+    def test_repeats_and_misses(self, tmp_path):
+        """Проверка повторов сверх записанного и промаха в строгом режиме"""
+        path = str(tmp_path / "repeats.cas")
+        with Cassette(path, mode="record") as cassette:
+            cassette.record("GET", "/pet/1", {}, _fake_response(404, b"{}"))
+            cassette.record("GET", "/pet/1", {}, _fake_response(200, b'{"id": 1}'))
+
+        with Cassette(path) as cassette:
+            codes = [cassette.play("GET", "/pet/1", "http://h/v2/pet/1", {}).status_code for _ in range(3)]
+            assert codes == [404, 200, 200]
+
+        with Cassette(path, allow_repeats=False) as cassette:
+            cassette.play("GET", "/pet/1", "http://h/v2/pet/1", {})
+            cassette.play("GET", "/pet/1", "http://h/v2/pet/1", {})
+            with pytest.raises(CassetteMiss):
+                cassette.play("GET", "/pet/1", "http://h/v2/pet/1", {})
+            with pytest.raises(CassetteMiss):
+                cassette.play("GET", "/pet/2", "http://h/v2/pet/2", {})
+            assert cassette.misses == [("GET", "/pet/1"), ("GET", "/pet/2")]
+
+    def test_request_body_is_part_of_key(self, tmp_path):
+        """Проверка, что запросы с разным телом не смешиваются"""
+        path = str(tmp_path / "bodies.cas")
+        with Cassette(path, mode="record") as cassette:
+            cassette.record("POST", "/pet", {"json": {"id": 1}}, _fake_response(200, b'{"id": 1}'))
+            cassette.record("POST", "/pet", {"json": {"id": 2}}, _fake_response(200, b'{"id": 2}'))
+
+        with Cassette(path) as cassette:
+            second = cassette.play("POST", "/pet", "http://h/v2/pet", {"json": {"id": 2}})
+            assert second.json() == {"id": 2}
+            assert second.request.body == b'{"id": 2}'
+
+    def test_large_index(self, tmp_path):
+        """Проверка поиска по индексу с тысячами записей"""
+        path = str(tmp_path / "large.cas")
+        with Cassette(path, mode="record") as cassette:
+            for i in range(5000):
+                cassette.record("GET", f"/pet/{i}", {}, _fake_response(200, b'{"id": %d}' % i))
+
+        with Cassette(path) as cassette:
+            assert len(cassette) == 5000
+            for i in (0, 1234, 4999):
+                assert cassette.play("GET", f"/pet/{i}", f"http://h/v2/pet/{i}", {}).json() == {"id": i}
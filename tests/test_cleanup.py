@@ -0,0 +1,95 @@
+"""
+Тесты очистки созданных сущностей - учет созданий и удалений, порог и отчет об ошибках
+"""
+import asyncio
+
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.async_api_client import AsyncPetstoreAPIClient
+from helpers.cleanup import CleanupRegistry
+
+
+@pytest.mark.live
+class TestCleanupRegistry:
+    """Тесты CleanupRegistry на отдельном клиенте"""
+
+    def test_tracks_creates_and_deletes(self, petstore_base_url, pet_data_generator, order_data_generator,
+                                        user_data_generator):
+        """Проверка учета созданных сущностей и удаления всех при flush"""
+        client = PetstoreAPIClient(base_url=petstore_base_url)
+        registry = CleanupRegistry(client)
+        pet = pet_data_generator.generate_pet_data()
+        client.create_pet(pet)
+        assigned_id = client.create_pet(pet_data_generator.generate_pet_data(pet_id=0)).json()["id"]
+        order = order_data_generator.generate_order_data()
+        client.create_store_order(order)
+        users = [user_data_generator.generate_user_data() for _ in range(2)]
+        client.create_users_with_array(users)
+        client.create_pet({"id": "not_a_number", "name": "x"})
+        deleted_order = order_data_generator.generate_order_data()
+        client.create_store_order(deleted_order)
+        client.delete_store_order(deleted_order["id"])
+
+        assert len(registry) == 5
+        assert registry.flush() == 5
+        assert len(registry) == 0
+        assert client.get_pet(pet["id"]).status_code == 404
+        assert client.get_pet(assigned_id).status_code == 404
+        assert client.get_store_order(order["id"]).status_code == 404
+        assert [client.get_user(user["username"]).status_code for user in users] == [404, 404]
+        assert registry.failures == []
+        registry.detach()
+        client.close()
+
+    def test_tracks_async_client(self, petstore_base_url, order_data_generator, user_data_generator):
+        """Проверка учета сущностей, созданных асинхронным клиентом, и их удаления синхронным"""
+        client = PetstoreAPIClient(base_url=petstore_base_url)
+        registry = CleanupRegistry(client)
+        orders = [order_data_generator.generate_order_data() for _ in range(3)]
+        user = user_data_generator.generate_user_data()
+
+        async def scenario():
+            async with AsyncPetstoreAPIClient(base_url=petstore_base_url) as async_client:
+                async_client.add_listener(registry.on_response)
+                await async_client.gather(async_client.create_store_order(order) for order in orders)
+                await async_client.create_user(user)
+                await async_client.delete_store_order(orders[0]["id"])
+
+        asyncio.run(scenario())
+
+        assert len(registry) == 3
+        assert registry.flush() == 3
+        assert [client.get_store_order(order["id"]).status_code for order in orders] == [404] * 3
+        assert client.get_user(user["username"]).status_code == 404
+        registry.detach()
+        client.close()
+
+    def test_checkpoint_threshold_keeps_pinned(self, petstore_base_url, pet_data_generator):
+        """Проверка промежуточной очистки по порогу без закрепленных сущностей"""
+        client = PetstoreAPIClient(base_url=petstore_base_url)
+        registry = CleanupRegistry(client, threshold=3)
+        pets = [pet_data_generator.generate_pet_data() for _ in range(3)]
+        for pet in pets[:2]:
+            client.create_pet(pet)
+        assert registry.checkpoint() == 0
+
+        client.create_pet(pets[2])
+        registry.pin("pets", pets[0]["id"])
+        assert registry.checkpoint() == 2
+        assert client.get_pet(pets[0]["id"]).status_code == 200
+        assert registry.flush(include_pinned=True) == 1
+        assert client.get_pet(pets[0]["id"]).status_code == 404
+        client.close()
+
+    def test_reports_undeleted_entities(self):
+        """Проверка отчета о сущностях, которые не удалось удалить"""
+        client = PetstoreAPIClient(base_url="http://127.0.0.1:1/v2", timeout=1)
+        registry = CleanupRegistry(client)
+        registry.track("users", "ghost")
+
+        assert registry.flush() == 0
+        failure, = registry.failures
+        assert (failure.kind, failure.key, failure.status_code) == ("users", "ghost", None)
+        assert "ConnectionError" in failure.reason
+        client.close()
@@ -0,0 +1,91 @@
+"""
+Тесты генераторов данных - пакетная генерация generate_batch и синтетические изображения
+"""
+import struct
+import types
+import zlib
+
+import pytest
+
+from helpers.data_generators import ImageDataGenerator, OrderDataGenerator, PetDataGenerator, UserDataGenerator
+from helpers.id_allocator import default_id_allocator
+
+GENERATORS = [
+    (PetDataGenerator, PetDataGenerator.generate_pet_data),
+    (OrderDataGenerator, OrderDataGenerator.generate_order_data),
+    (UserDataGenerator, UserDataGenerator.generate_user_data),
+]
+
+
+class TestGenerateBatch:
+    """Тесты generate_batch для всех генераторов"""
+
+    @pytest.mark.parametrize("generator, generate_one", GENERATORS)
+    def test_schema_matches_single_generation(self, generator, generate_one):
+        """Проверка совпадения схемы пакета со схемой одиночной генерации"""
+        batch = generator.generate_batch(50, seed=1)
+        single = generate_one()
+
+        assert len(batch) == 50
+        for item in batch:
+            assert list(item) == list(single)
+            for key, value in item.items():
+                assert type(value) is type(single[key])
+
+    @pytest.mark.parametrize("generator, generate_one", GENERATORS)
+    def test_reproducible_and_lazy(self, generator, generate_one):
+        """Проверка воспроизводимости по seed и эквивалентности ленивого режима"""
+        batch = generator.generate_batch(1000, seed=42, chunk_size=64)
+        lazy = generator.generate_batch(1000, seed=42, lazy=True, chunk_size=64)
+
+        assert isinstance(lazy, types.GeneratorType)
+        assert list(lazy) == batch
+        assert generator.generate_batch(1000, seed=42, chunk_size=64) == batch
+        assert generator.generate_batch(1000, seed=43, chunk_size=64) != batch
+
+    @pytest.mark.parametrize("generator, generate_one", GENERATORS)
+    def test_ids_unique_across_calls(self, generator, generate_one):
+        """Проверка отсутствия коллизий ID между пакетами и одиночной генерацией"""
+        ids = [item["id"] for item in generator.generate_batch(5000)]
+        ids += [item["id"] for item in generator.generate_batch(5000, seed=1)]
+        ids += [item["id"] for item in generator.generate_batch(5000, seed=2, lazy=True)]
+        ids += [generate_one()["id"] for _ in range(100)]
+        assert len(set(ids)) == len(ids)
+        assert all(map(default_id_allocator().owns, ids))
+
+    def test_pet_values_in_domains(self):
+        """Проверка допустимых значений полей питомца"""
+        for pet in PetDataGenerator.generate_batch(2000, seed=7):
+            assert pet["status"] in PetDataGenerator.STATUSES
+            assert pet["category"] in PetDataGenerator.CATEGORIES
+            assert 1 <= len(pet["tags"]) <= 3
+            assert len({tag["id"] for tag in pet["tags"]}) == len(pet["tags"])
+            assert pet["photoUrls"] == [f"https://example.com/photos/{pet['name'].lower()}.jpg"]
+
+
+class TestImageDataGenerator:
+    """Тесты синтетических PNG"""
+
+    def test_png_structure(self):
+        """Проверка сигнатуры, IHDR и размера распакованных строк"""
+        png = ImageDataGenerator.generate_png(width=5, height=3, seed=1)
+
+        assert png[:8] == ImageDataGenerator.PNG_SIGNATURE
+        _, kind = struct.unpack(">I4s", png[8:16])
+        assert kind == b"IHDR"
+        assert struct.unpack(">II", png[16:24]) == (5, 3)
+        idat_length, idat_kind = struct.unpack(">I4s", png[33:41])
+        assert idat_kind == b"IDAT"
+        assert len(zlib.decompress(png[41:41 + idat_length])) == 3 * (1 + 5 * 3)
+        assert png.endswith(b"IEND\xaeB`\x82")
+
+    def test_batch_reproducible_and_lazy(self):
+        """Проверка воспроизводимости по seed, различия изображений и ленивого режима"""
+        images = ImageDataGenerator.generate_batch(4, width=8, height=8, seed=3)
+        lazy = ImageDataGenerator.generate_batch(4, width=8, height=8, seed=3, lazy=True)
+
+        assert isinstance(lazy, types.GeneratorType)
+        assert list(lazy) == images
+        assert len(set(images)) == 4
+        with pytest.raises(ValueError):
+            ImageDataGenerator.generate_png(width=0)
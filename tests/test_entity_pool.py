@@ -0,0 +1,85 @@
+"""
+Тесты пула сущностей - общая и монопольная аренда, восстановление и рост пула
+"""
+import requests
+
+from helpers.entity_pool import EntityPool
+
+
+class TestEntityPool:
+    """Тесты EntityPool"""
+
+    def test_warm_creates_visible_entities(self, api_client):
+        """Проверка создания сущностей пула и их доступности"""
+        pool = EntityPool.for_orders(api_client, size=3)
+        pool.warm(api_client)
+
+        assert pool.created == 3
+        for order in pool.entities:
+            assert api_client.get_store_order(order["id"]).status_code == 200
+
+    def test_shared_leases_rotate(self, api_client):
+        """Проверка распределения общих аренд по разным сущностям"""
+        pool = EntityPool.for_pets(api_client, size=2)
+        pool.warm(api_client)
+        first, second = pool.lease(), pool.lease()
+
+        assert first.entity["id"] != second.entity["id"]
+        first.entity["name"] = "changed by test"
+        assert pool.entities[first.index]["name"] != "changed by test"
+        first.release()
+        second.release()
+
+    def test_exclusive_lease_restores_entity(self, api_client):
+        """Проверка восстановления сущности после монопольной аренды"""
+        pool = EntityPool.for_pets(api_client, size=1)
+        pool.warm(api_client)
+
+        with pool.lease(exclusive=True) as pet:
+            api_client.update_pet_with_form(pet["id"], name="Mutated")
+            api_client.delete_pet(pet["id"])
+
+        response = api_client.get_pet(pool.entities[0]["id"])
+        assert response.status_code == 200
+        assert response.json()["name"] == pool.entities[0]["name"]
+        assert pool.restored == 1
+
+    def test_exclusive_lease_grows_busy_pool(self, api_client):
+        """Проверка создания новой сущности, когда все заняты"""
+        pool = EntityPool.for_users(api_client, size=1)
+        pool.warm(api_client)
+        shared = pool.lease()
+        exclusive = pool.lease(exclusive=True)
+
+        assert exclusive.entity["username"] != shared.entity["username"]
+        assert len(pool.entities) == 2
+        # Пока сущность в монопольной аренде, общие аренды ее не получают
+        assert pool.lease().entity["username"] == shared.entity["username"]
+        exclusive.release()
+        shared.release()
+
+    def test_failed_restore_takes_entity_out_of_pool(self, api_client):
+        """Проверка, что сущность с неудачным восстановлением не считается восстановленной и не выдается снова"""
+        pool = EntityPool.for_pets(api_client, size=1)
+        pool.warm(api_client)
+        failures = [requests.ConnectionError("connection reset"), {"id": "not-a-number"}]
+
+        def failing_restore(pet):
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            # Ответ 500 на некорректный ввод вместо восстановления
+            return api_client.create_pet(failure)
+
+        first = pool.lease(exclusive=True)
+        second = pool.lease(exclusive=True)
+        pool._create = failing_restore
+        first.release()
+        second.release()
+
+        assert (pool.restored, pool.broken) == (0, 2)
+        pool._create = api_client.create_pet
+        with pool.lease(exclusive=True) as pet:
+            assert pet["id"] not in (first.entity["id"], second.entity["id"])
+        assert pool.lease().entity["id"] == pet["id"]
+        assert pool.restored == 1
@@ -0,0 +1,75 @@
+"""
+Тесты выдачи ID - перестановка Фейстеля и непересекающиеся диапазоны воркеров
+"""
+import threading
+
+from helpers.id_allocator import FeistelPermutation, IdAllocator, worker_id_from_env
+
+
+class TestFeistelPermutation:
+    """Тесты биективности перестановки"""
+
+    def test_bijection_on_small_domain(self):
+        """Проверка того, что перестановка - биекция, а inverse ее обращает"""
+        permutation = FeistelPermutation(bits=12, key=5)
+        values = [permutation.permute(i) for i in range(1 << 12)]
+
+        assert sorted(values) == list(range(1 << 12))
+        assert [permutation.inverse(v) for v in values] == list(range(1 << 12))
+        assert permutation.permute_many(range(1 << 12)) == values
+
+
+class TestIdAllocator:
+    """Тесты уникальности выдаваемых ID"""
+
+    def test_unique_across_threads(self):
+        """Проверка отсутствия коллизий при параллельной выдаче"""
+        allocator = IdAllocator(worker_id=1)
+        results = [[] for _ in range(8)]
+
+        def worker(bucket):
+            for _ in range(2000):
+                bucket.append(allocator.allocate())
+            bucket.extend(allocator.allocate_many(2000))
+
+        threads = [threading.Thread(target=worker, args=(bucket,)) for bucket in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [value for bucket in results for value in bucket]
+        assert len(set(ids)) == len(ids) == 8 * 4000
+        assert all(allocator.owns(value) for value in ids)
+        assert max(ids) < 2 ** 53
+
+    def test_worker_ranges_disjoint(self, monkeypatch):
+        """Проверка непересекающихся диапазонов разных воркеров и процесса"""
+        monkeypatch.delenv("PETSTORE_WORKER_ID", raising=False)
+        monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+        worker_0, worker_1, process = IdAllocator(worker_id=0), IdAllocator(worker_id=1), IdAllocator()
+        values = worker_0.allocate_many(1000)
+
+        assert not any(worker_1.owns(value) or process.owns(value) for value in values)
+        assert set(values).isdisjoint(worker_1.allocate_many(1000))
+
+    def test_worker_id_from_env(self, monkeypatch):
+        """Проверка определения номера воркера из окружения"""
+        monkeypatch.delenv("PETSTORE_WORKER_ID", raising=False)
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+        assert worker_id_from_env() == 3
+
+        monkeypatch.setenv("PETSTORE_WORKER_ID", "7")
+        assert worker_id_from_env() == 7
+
+    def test_seeded_regions_disjoint(self):
+        """Проверка воспроизводимости ID области seed и ее непересечения с обычными ID и другими seed"""
+        allocator = IdAllocator(worker_id=2)
+        plain = allocator.allocate_many(200_000)
+        first = allocator.seeded(1).allocate_many(200_000)
+        second = allocator.seeded(2).allocate_many(200_000)
+
+        assert allocator.seeded(1).allocate_many(200_000) == first
+        assert len(set(plain) | set(first) | set(second)) == 3 * 200_000
+        assert all(map(allocator.owns, first + second))
+        assert allocator.allocate() not in first
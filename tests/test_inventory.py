@@ -0,0 +1,97 @@
+"""
+Тесты сверки инвентаря магазина
+"""
+import json
+import uuid
+
+import pytest
+import requests
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.inventory import InventoryReconciler
+
+
+def _response(status_code, body=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode() if body is not None else b""
+    return response
+
+
+@pytest.fixture
+def statuses():
+    """Уникальные статусы: на общем сервере их инвентарь меняет только этот тест"""
+    suffix = uuid.uuid4().hex[:8]
+    return f"reconcile-a-{suffix}", f"reconcile-b-{suffix}"
+
+
+class TestInventoryCounters:
+    """Тесты инкрементальных счетчиков InventoryReconciler"""
+
+    def test_counters_follow_responses(self):
+        """Проверка пересчета по ответам клиента: создание, смена статуса, удаление, ошибки"""
+        reconciler = InventoryReconciler(PetstoreAPIClient(), baseline={"sold": 2, "available": 1})
+
+        reconciler.on_response("POST", "/pet", {}, _response(200, {"id": 1, "status": "available"}))
+        reconciler.on_response("POST", "/pet", {}, _response(200, {"id": 2}))
+        reconciler.on_response("PUT", "/pet", {}, _response(200, {"id": 1, "status": "sold"}))
+        reconciler.on_response("POST", "/pet/2", {"data": {"status": "pending"}}, _response(200, {"code": 200}))
+        reconciler.on_response("DELETE", "/pet/2", {}, _response(200))
+        reconciler.on_response("DELETE", "/pet/1", {}, _response(404))
+        reconciler.on_response("POST", "/pet", {}, _response(500))
+        reconciler.on_response("GET", "/pet/1", {}, _response(200, {"id": 1, "status": "pending"}))
+
+        assert reconciler.expected() == {"sold": 3, "available": 1}
+        assert reconciler.untracked == 0
+
+    def test_unknown_pets_are_untracked(self):
+        """Проверка, что изменения питомцев с неизвестным статусом не угадываются, а считаются"""
+        reconciler = InventoryReconciler(PetstoreAPIClient(), baseline={"sold": 1})
+
+        reconciler.on_response("PUT", "/pet", {}, _response(200, {"id": 7, "status": "available"}))
+        reconciler.on_response("POST", "/pet/7", {"data": {"name": "Renamed"}}, _response(200))
+        reconciler.on_response("POST", "/pet/7", {"data": {"status": "pending"}}, _response(200))
+        reconciler.on_response("DELETE", "/pet/7", {}, _response(200))
+
+        assert reconciler.expected() == {"sold": 1}
+        assert reconciler.untracked == 3
+
+
+@pytest.mark.live
+class TestInventoryReconciliation:
+    """Тесты сверки с GET /store/inventory"""
+
+    def test_matches_after_mutations(self, api_client, pet_data_generator, statuses):
+        """Проверка отсутствия расхождений после создания, обновлений и удаления через клиент"""
+        first, second = statuses
+        reconciler = InventoryReconciler(api_client)
+        pets = [pet_data_generator.generate_pet_data(status=first) for _ in range(3)]
+
+        assert api_client.create_pets_bulk(pets).wait().ok
+        api_client.update_pet({**pets[0], "status": second})
+        api_client.update_pet_with_form(pets[1]["id"], status=second)
+        api_client.delete_pet(pets[2]["id"])
+        report = reconciler.reconcile(statuses)
+        reconciler.detach()
+
+        assert report.ok, report.to_dict()
+        assert report.actual.get(first, 0) == 0 and report.actual[second] == 2
+
+    def test_reports_drift_from_other_writers(self, api_client, petstore_base_url, pet_data_generator, statuses):
+        """Проверка расхождения по статусу, который меняет клиент без сверки"""
+        first, second = statuses
+        reconciler = InventoryReconciler(api_client)
+        other = PetstoreAPIClient(base_url=petstore_base_url)
+        pet = pet_data_generator.generate_pet_data(status=first)
+        other.create_pet(pet)
+        api_client.create_pet(pet_data_generator.generate_pet_data(status=second))
+
+        report = reconciler.reconcile(statuses)
+        api_client.delete_pet(pet["id"])
+        reconciler.detach()
+        other.close()
+
+        assert [(drift.status, drift.expected, drift.actual, drift.drift) for drift in report.drifts] == \
+            [(first, 0, 1, 1)]
+        assert reconciler.untracked == 1
+        assert report.to_dict()["drifts"][first]["drift"] == 1
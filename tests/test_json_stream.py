@@ -0,0 +1,64 @@
+"""
+Тесты потокового разбора JSON-массивов и потоковых методов поиска питомцев
+"""
+import json
+
+import pytest
+
+from helpers.json_stream import JSONStreamError, iter_json_array
+
+
+def _chunks(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestIterJsonArray:
+    """Тесты iter_json_array"""
+
+    @pytest.mark.parametrize("size", [1, 3, 64, 1 << 20])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_matches_json_loads(self, size, indent):
+        """Проверка совпадения с json.loads при любом разбиении на куски"""
+        data = [{"id": i, "name": f"Пёс ] [ \" , {i}", "tags": [{"w": 1.5e3}]} for i in range(50)]
+        data += [123456, -0.5, 1e-7, "x", None, True, [], {}]
+        raw = json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
+
+        assert list(iter_json_array(_chunks(raw, size))) == data
+
+    def test_empty_array(self):
+        """Проверка пустого массива с пробелами"""
+        assert list(iter_json_array([b" [ ", b" ] "])) == []
+
+    def test_items_are_yielded_before_stream_ends(self):
+        """Проверка, что первый элемент доступен до получения остальных кусков"""
+        def source():
+            yield b'[{"id": 1},'
+            raise AssertionError("Второй кусок не должен читаться раньше первого элемента")
+
+        assert next(iter_json_array(source())) == {"id": 1}
+
+    @pytest.mark.parametrize("raw", [b"", b"{}", b"[1", b"[1,]", b"[,1]", b"[1 2]", b"[1]x", b"[1,,2]"])
+    def test_malformed_stream(self, raw):
+        """Проверка ошибок на некорректных и оборванных потоках"""
+        for size in (1, 100):
+            with pytest.raises(JSONStreamError):
+                list(iter_json_array(_chunks(raw, size)))
+
+
+class TestClientStreaming:
+    """Тесты iter_pets_by_status и iter_pets_by_tags"""
+
+    def test_iter_pets_by_tags(self, api_client, pet_data_generator):
+        """Проверка потокового поиска по тегу"""
+        tag = {"id": 501, "name": f"stream_{pet_data_generator.generate_pet_data()['id']}"}
+        pets = [pet_data_generator.generate_pet_data(tags=[tag]) for _ in range(30)]
+        api_client.create_pets_bulk(pets).wait()
+
+        streamed = list(api_client.iter_pets_by_tags([tag["name"]], chunk_size=100))
+        assert sorted(pet["id"] for pet in streamed) == sorted(pet["id"] for pet in pets)
+
+    def test_iter_pets_by_status_matches_find(self, api_client, pooled_pet):
+        """Проверка совпадения потокового и обычного поиска по статусу"""
+        streamed = list(api_client.iter_pets_by_status("available"))
+        assert streamed == api_client.find_pets_by_status("available").json()
+        assert pooled_pet["id"] in [pet["id"] for pet in streamed]
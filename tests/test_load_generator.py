@@ -0,0 +1,57 @@
+"""
+Тесты генератора нагрузки - профиль интенсивности и короткий прогон
+"""
+import asyncio
+import random
+
+import pytest
+
+from helpers.load_generator import LoadGenerator, RateProfile
+
+
+class TestRateProfile:
+    """Тесты расписания прибытия запросов"""
+
+    def test_uniform_arrivals_follow_profile(self):
+        """Проверка числа и монотонности прибытий для равномерного процесса"""
+        profile = RateProfile(rate=100, ramp_up=2, steady=3, ramp_down=2)
+        arrivals = list(profile.arrivals("uniform"))
+
+        assert len(arrivals) == int(profile.total_arrivals)
+        assert arrivals == sorted(arrivals)
+        assert arrivals[-1] <= profile.duration
+        # На разгоне прибытия реже, чем на плато
+        assert sum(1 for t in arrivals if t < 1) < sum(1 for t in arrivals if 2 <= t < 3)
+
+    def test_poisson_arrivals_total(self):
+        """Проверка среднего числа прибытий пуассоновского процесса"""
+        profile = RateProfile(rate=200, steady=10)
+        arrivals = list(profile.arrivals("poisson", random.Random(7)))
+        assert abs(len(arrivals) - 2000) < 200
+
+
+@pytest.mark.live
+class TestLoadGenerator:
+    """Тесты прогона нагрузки против Petstore"""
+
+    def test_short_run_report(self, async_api_client_factory):
+        """Проверка отчета короткого прогона по нескольким методам клиента"""
+
+        async def scenario():
+            async with async_api_client_factory() as client:
+                generator = LoadGenerator(
+                    client,
+                    RateProfile(rate=100, steady=0.5),
+                    {"get_pet": 2, "create_pet": 1, "get_store_inventory": 1, "upload_pet_image": 1},
+                    seed=1,
+                )
+                await generator.seed(5)
+                return await generator.run()
+
+        report = asyncio.run(scenario()).to_dict()
+        endpoints = report["endpoints"]
+        assert set(endpoints) <= {"get_pet", "create_pet", "get_store_inventory", "upload_pet_image"}
+        assert sum(stats["requests"] for stats in endpoints.values()) > 0
+        for stats in endpoints.values():
+            assert stats["error_rate"] == 0.0
+            assert stats["p50_ms"] <= stats["p99_ms"] <= stats["p99.9_ms"]
@@ -0,0 +1,78 @@
+"""
+Тесты метрик клиента - гистограммы задержек, шаблоны endpoint-ов и фикстура request_metrics
+"""
+import random
+
+from helpers.api_client import endpoint_template
+from helpers.metrics import LatencyHistogram, RequestMetrics
+
+
+class TestLatencyHistogram:
+    """Тесты HDR-подобной гистограммы"""
+
+    def test_percentiles_within_relative_error(self):
+        """Проверка точности перцентилей относительно точных значений"""
+        rng = random.Random(3)
+        values = sorted(rng.lognormvariate(-5, 1) for _ in range(10000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percent in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * percent / 100) - 1]
+            assert abs(histogram.percentile(percent) - exact) / exact < 0.01
+
+    def test_merge_equals_single_histogram(self):
+        """Проверка того, что слияние гистограмм эквивалентно общей записи"""
+        combined, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(1, 2000):
+            combined.record(i / 10000)
+            (left if i % 2 else right).record(i / 10000)
+
+        merged = LatencyHistogram.from_dict(left.to_dict()).merge(right)
+        assert merged.counts == combined.counts
+        assert merged.percentile(99) == combined.percentile(99)
+        assert (merged.min, merged.max, merged.count) == (combined.min, combined.max, combined.count)
+
+
+class TestRequestMetrics:
+    """Тесты сбора метрик в PetstoreAPIClient"""
+
+    def test_endpoint_templates(self):
+        """Проверка сведения конкретных путей к шаблонам"""
+        assert endpoint_template("/pet/123") == "/pet/{petId}"
+        assert endpoint_template("/pet/123/uploadImage") == "/pet/{petId}/uploadImage"
+        assert endpoint_template("/pet/findByStatus") == "/pet/findByStatus"
+        assert endpoint_template("/store/order/5") == "/store/order/{orderId}"
+        assert endpoint_template("/user/login") == "/user/login"
+        assert endpoint_template("/user/ivan") == "/user/{username}"
+
+    def test_per_test_counts(self, api_client, request_metrics, pet_data_generator):
+        """Проверка подсчета запросов, кодов ответа и объема трафика за тест"""
+        pet_data = pet_data_generator.generate_pet_data()
+        api_client.create_pet(pet_data)
+        api_client.get_pet(pet_data["id"])
+        api_client.get_pet(9999999999999)
+
+        assert request_metrics.count() == 3
+        assert request_metrics.count("GET", "/pet/{petId}") == 2
+        get_metrics = request_metrics.endpoints["GET /pet/{petId}"]
+        assert get_metrics.status_codes == {200: 1, 404: 1}
+        assert request_metrics.endpoints["POST /pet"].bytes_sent > 0
+        assert get_metrics.bytes_received > 0
+
+    def test_dump_and_load(self, tmp_path):
+        """Проверка сохранения метрик в JSON и загрузки обратно"""
+        metrics = RequestMetrics()
+        metrics.record("GET", "/pet/{petId}", 0.01, 200, 0, 120)
+        metrics.record("GET", "/pet/{petId}", 0.5)
+        metrics.set_gauge("concurrency_limit", 12)
+        path = tmp_path / "metrics.json"
+        metrics.dump(str(path))
+
+        loaded = RequestMetrics.load(str(path))
+        endpoint = loaded.endpoints["GET /pet/{petId}"]
+        assert endpoint.requests == 2
+        assert endpoint.errors == 1
+        assert endpoint.bytes_received == 120
+        assert loaded.gauges == {"concurrency_limit": 12}
@@ -0,0 +1,94 @@
+"""
+Тесты моделей сущностей - преобразование из JSON-схемы и обратно, разбор ответов
+"""
+import gc
+import json
+import sys
+import threading
+
+import pytest
+import requests
+
+from helpers.models import Category, Order, Pet, Tag, User, decode, decode_pets, paused_gc
+
+
+class TestModels:
+    """Тесты Pet, Order и User"""
+
+    def test_round_trip_generated_data(self, pet_data_generator, order_data_generator, user_data_generator):
+        """Проверка, что to_dict(from_dict(d)) совпадает с данными генераторов"""
+        pet = pet_data_generator.generate_pet_data()
+        order = order_data_generator.generate_order_data()
+        user = user_data_generator.generate_user_data()
+
+        assert Pet.from_dict(pet).to_dict() == pet
+        assert Order.from_dict(order).to_dict() == order
+        assert User.from_dict(user).to_dict() == user
+
+    def test_decode_shares_statuses_and_references(self, pet_data_generator):
+        """Проверка интернирования статусов и разделения одинаковых категорий и тегов"""
+        pets = pet_data_generator.generate_batch(50, seed=3)
+        decoded = decode_pets(json.dumps(pets).encode("utf-8"))
+
+        assert [pet.to_dict() for pet in decoded] == pets
+        available = [pet for pet in decoded if pet.status == "available"]
+        assert all(pet.status is sys.intern("available") for pet in available)
+        dogs = [pet.category for pet in decoded if pet.category.name == "Dogs"]
+        assert all(category is dogs[0] for category in dogs)
+        assert not hasattr(decoded[0], "__dict__")
+
+    def test_equality_and_repr(self):
+        """Проверка сравнения моделей по всем полям"""
+        assert Category(1, "Dogs") != Category(2, "Cats")
+        assert Tag(1, "x") == Tag(1, "x")
+        assert Pet(1, "a", tags=[Tag(1, "x")]) == Pet.from_dict({"id": 1, "name": "a", "tags": [{"id": 1, "name": "x"}]})
+        assert repr(Order(5, 7, 1)).startswith("Order(id=5, pet_id=7, quantity=1")
+
+    def test_decode_single_object(self):
+        """Проверка разбора одиночного объекта"""
+        user = decode(User, b'{"id": 1, "username": "u", "userStatus": 0}')
+        assert (user.username, user.user_status, user.email) == ("u", 0, None)
+
+    def test_paused_gc_across_threads(self):
+        """Проверка, что GC включает поток, вышедший из паузы последним, а не первым"""
+        assert gc.isenabled()
+        entered, leave = threading.Event(), threading.Event()
+
+        def pause():
+            with paused_gc():
+                entered.set()
+                leave.wait()
+
+        thread = threading.Thread(target=pause)
+        thread.start()
+        entered.wait()
+        with paused_gc():
+            leave.set()
+            thread.join()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+        gc.disable()
+        try:
+            with paused_gc():
+                pass
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+
+class TestClientModels:
+    """Тесты as_model в методах клиента"""
+
+    def test_client_accepts_and_returns_models(self, api_client, pet_data_generator):
+        """Проверка отправки модели и получения моделей вместо ответов"""
+        pet = pet_data_generator.generate_batch(1, as_model=True)[0]
+        assert api_client.create_pet(pet).status_code == 200
+
+        assert api_client.get_pet(pet.id, as_model=True) == pet
+        assert pet.id in [found.id for found in api_client.find_pets_by_status(pet.status, as_model=True)]
+        streamed = list(api_client.iter_pets_by_status(pet.status, as_model=True))
+        assert all(isinstance(found, Pet) for found in streamed)
+        with pytest.raises(requests.HTTPError):
+            api_client.get_pet(9999999999999, as_model=True)
+
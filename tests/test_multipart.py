@@ -0,0 +1,115 @@
+"""
+Тесты потоковой multipart-загрузки изображений
+"""
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.cassette import Cassette, request_key
+from helpers.data_generators import ImageDataGenerator
+from helpers.multipart import MultipartEncoder
+from helpers.petstore_server import _parse_multipart
+
+
+class TestMultipartEncoder:
+    """Тесты MultipartEncoder"""
+
+    def test_body_parses_and_length_matches(self, tmp_path):
+        """Проверка, что тело разбирается сервером, а __len__ совпадает с фактическим размером"""
+        path = tmp_path / "pet.png"
+        image = ImageDataGenerator.generate_png(width=40, height=30, seed=1)
+        path.write_bytes(image)
+        encoder = MultipartEncoder({"additionalMetadata": "кот"},
+                                   {"file": ("pet.png", str(path)), "thumb": ("t.png", memoryview(image)[:100])},
+                                   chunk_size=1000)
+
+        body = encoder.to_bytes()
+        assert len(body) == len(encoder)
+        fields, files = _parse_multipart(encoder.content_type, body)
+        assert fields == {"additionalMetadata": "кот"}
+        assert files == {"file": ("pet.png", image), "thumb": ("t.png", image[:100])}
+        assert b"Content-Type: image/png" in body
+
+    def test_streams_views_and_is_reusable(self, tmp_path):
+        """Проверка, что файл отдается срезами memoryview, а тело можно прочитать повторно (повтор запроса)"""
+        path = tmp_path / "pet.png"
+        path.write_bytes(bytes(range(256)) * 40)
+        encoder = MultipartEncoder(files={"file": ("pet.png", path)}, chunk_size=4096)
+
+        chunks = list(encoder)
+        views = [chunk for chunk in chunks if isinstance(chunk, memoryview)]
+        assert [len(view) for view in views] == [4096, 4096, 2048]
+        first = b"".join(chunks)
+        del chunks, views
+        assert encoder.to_bytes() == first
+
+    def test_missing_and_empty_files(self, tmp_path):
+        """Проверка FileNotFoundError для отсутствующего файла и загрузки пустого"""
+        with pytest.raises(FileNotFoundError):
+            MultipartEncoder(files={"file": ("x.png", str(tmp_path / "missing.png"))})
+
+        (tmp_path / "empty.png").write_bytes(b"")
+        encoder = MultipartEncoder(files={"file": ("empty.png", str(tmp_path / "empty.png"))})
+        assert _parse_multipart(encoder.content_type, encoder.to_bytes())[1] == {"file": ("empty.png", b"")}
+
+    def test_cassette_key_ignores_boundary(self):
+        """Проверка, что ключ кассеты зависит от содержимого, а не от случайного boundary"""
+        image = ImageDataGenerator.generate_png(seed=2)
+
+        def key(data):
+            body = MultipartEncoder({"a": "1"}, {"file": ("p.png", data)})
+            return request_key("POST", "/pet/1/uploadImage", {"data": body})
+
+        assert key(image) == key(bytearray(image))
+        assert key(image) != key(image[:-1])
+
+
+@pytest.mark.live
+class TestImageUpload:
+    """Тесты загрузки изображений клиентом"""
+
+    def test_upload_from_file_and_buffer(self, api_client, pooled_pet, tmp_path):
+        """Проверка загрузки из файла и из буфера в памяти"""
+        image = ImageDataGenerator.generate_png(width=64, height=64, seed=3)
+        path = tmp_path / "pet.png"
+        path.write_bytes(image)
+
+        from_file = api_client.upload_pet_image(pooled_pet["id"], str(path), "from file")
+        from_buffer = api_client.upload_pet_image(pooled_pet["id"], additional_metadata="from buffer",
+                                                  image=image, filename="buffer.png")
+
+        assert from_file.status_code == from_buffer.status_code == 200
+        assert f"pet.png, {len(image)} bytes" in from_file.json()["message"]
+        assert "additionalMetadata: from buffer" in from_buffer.json()["message"]
+        assert f"buffer.png, {len(image)} bytes" in from_buffer.json()["message"]
+
+    def test_missing_file_is_an_error(self, api_client, tmp_path):
+        """Проверка, что отсутствующий файл не превращается в загрузку без файла"""
+        with pytest.raises(FileNotFoundError):
+            api_client.upload_pet_image(1, str(tmp_path / "missing.png"))
+
+    def test_bulk_upload_from_lazy_generator(self, api_client, pooled_pet):
+        """Проверка массовой загрузки из ленивого генератора изображений"""
+        images = ImageDataGenerator.generate_batch(30, width=32, height=32, seed=4, lazy=True)
+
+        report = api_client.upload_pet_images(((pooled_pet["id"], image) for image in images),
+                                              additional_metadata="bulk", max_in_flight=4).wait()
+
+        assert report.ok, report.to_dict()["failures"]
+        assert report.status_codes == {200: 30}
+
+    def test_upload_replays_from_cassette(self, tmp_path, petstore_base_url, pooled_pet):
+        """Проверка записи и воспроизведения загрузки: boundary разный, ключ тот же"""
+        path = str(tmp_path / "upload.cas")
+        image = ImageDataGenerator.generate_png(seed=5)
+        with Cassette(path, mode="record") as cassette:
+            client = PetstoreAPIClient(base_url=petstore_base_url, cassette=cassette)
+            recorded = client.upload_pet_image(pooled_pet["id"], image=image)
+            client.close()
+
+        with Cassette(path) as cassette:
+            client = PetstoreAPIClient(base_url="http://127.0.0.1:1/v2", cassette=cassette)
+            replayed = client.upload_pet_image(pooled_pet["id"], image=image)
+            client.close()
+            assert cassette.hits == 1
+
+        assert replayed.json() == recorded.json()
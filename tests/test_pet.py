@@ -3,13 +3,14 @@
 некорректные данные, идемпотентность, уникальность и структуру ответов
 """
 import pytest
-import time
+
+from helpers.waiting import wait_until
 
 
 class TestPetCRUD:
     """Тесты базовых операций CRUD для питомцев"""
 
-    def test_create_pet_success(self, api_client, pet_data_generator):
+    def test_create_pet_success(self, api_client, pet_data_generator, schema_validator):
         """Проверка успешного создания питомца с проверкой структуры ответа"""
         pet_data = pet_data_generator.generate_pet_data()
         response = api_client.create_pet(pet_data)
@@ -18,50 +19,26 @@ class TestPetCRUD:
         created_pet = response.json()
         assert created_pet["id"] == pet_data["id"]
         assert created_pet["name"] == pet_data["name"]
-        assert isinstance(created_pet["id"], int)
-        assert isinstance(created_pet["name"], str)
-        if "status" in created_pet:
-            assert created_pet["status"] in ["available", "pending", "sold"]
+        schema_validator.assert_valid("Pet", created_pet)
 
-    def test_get_existing_pet(self, api_client, pet_data_generator):
+    def test_get_existing_pet(self, api_client, pooled_pet, schema_validator):
         """Проверка получения существующего питомца с проверкой структуры"""
-        pet_data = pet_data_generator.generate_pet_data()
-        create_response = api_client.create_pet(pet_data)
-        assert create_response.status_code == 200
+        pet_id = pooled_pet["id"]
+        response = api_client.get_pet(pet_id)
 
-        # Используем ID из ответа создания, чтобы убедиться в корректности
-        created_pet = create_response.json()
-        pet_id = created_pet["id"]
-        
-        # Используем retry механизм для получения питомца
-        # (демо API Petstore может иметь нестабильную задержку распространения данных)
-        max_attempts = 5
-        response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:  # Задержка перед повторными попытками
-                time.sleep(0.5 * attempt)  # Увеличивающаяся задержка: 0.5, 1.0, 1.5, 2.0 сек
-            response = api_client.get_pet(pet_id)
-            if response.status_code == 200:
-                break
-        
-        assert response.status_code == 200, f"Не удалось получить питомца после {max_attempts} попыток. Последний ответ: {response.text if response else 'None'}"
+        assert response.status_code == 200, f"Не удалось получить питомца. Последний ответ: {response.text}"
         pet = response.json()
         assert pet["id"] == pet_id
-        assert isinstance(pet["id"], int)
-        assert isinstance(pet["name"], str)
+        schema_validator.assert_valid("Pet", pet)
 
     def test_get_nonexistent_pet(self, api_client):
         """Проверка HTTP статуса 404 для несуществующего питомца"""
         response = api_client.get_pet(9999999999999)
         assert response.status_code in [404]
 
-    def test_update_pet_success(self, api_client, pet_data_generator):
+    def test_update_pet_success(self, api_client, pet_data_generator, exclusive_pet):
         """Проверка успешного обновления с проверкой структуры ответа"""
-        initial_pet_data = pet_data_generator.generate_pet_data()
-        create_response = api_client.create_pet(initial_pet_data)
-        assert create_response.status_code == 200
-
-        pet_id = initial_pet_data["id"]
+        pet_id = exclusive_pet["id"]
         updated_pet_data = pet_data_generator.generate_pet_data(
             pet_id=pet_id,
             name="Updated Name",
@@ -86,25 +63,13 @@ class TestPetCRUD:
         pet_id = created_pet["id"]
         
         # Убеждаемся, что питомец существует перед удалением
-        # (используем retry, так как демо API Petstore имеет задержку распространения данных)
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            get_response = api_client.get_pet(pet_id)
-            if get_response.status_code == 200:
-                break
-        
-        # Удаляем питомца с retry механизмом
-        delete_response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            delete_response = api_client.delete_pet(pet_id)
-            if delete_response.status_code == 200:
-                break
-        
-        assert delete_response.status_code == 200, f"Не удалось удалить питомца после {max_attempts} попыток. Последний ответ: {delete_response.text if delete_response else 'None'}"
+        # (демо API Petstore имеет задержку распространения данных)
+        wait_until(lambda: api_client.get_pet(pet_id), lambda r: r.status_code == 200, name="get_pet")
+
+        delete_response = wait_until(lambda: api_client.delete_pet(pet_id), lambda r: r.status_code == 200,
+                                     name="delete_pet")
+
+        assert delete_response.status_code == 200, f"Не удалось удалить питомца. Последний ответ: {delete_response.text}"
         
         # Проверяем, что питомец действительно удален
         verify_response = api_client.get_pet(pet_id)
@@ -200,9 +165,9 @@ class TestPetIdempotency:
         create_response = api_client.create_pet(pet_data)
         assert create_response.status_code == 200
 
-        time.sleep(5)
-
         pet_id = pet_data["id"]
+        wait_until(lambda: api_client.get_pet(pet_id), lambda r: r.status_code == 200, name="get_pet")
+
         delete_response1 = api_client.delete_pet(pet_id)
         assert delete_response1.status_code in [200]
 
@@ -213,18 +178,30 @@ class TestPetIdempotency:
 class TestPetAdvanced:
     """Дополнительные тесты для Pet API"""
 
-    def test_find_pets_by_status(self, api_client):
+    def test_find_pets_by_status(self, api_client, pooled_pet, schema_validator):
         """Проверка поиска питомцев по статусу с проверкой структуры"""
         response = api_client.find_pets_by_status("available")
         assert response.status_code == 200
 
         pets = response.json()
-        assert isinstance(pets, list)
-        if len(pets) > 0:
-            pet = pets[0]
-            assert "id" in pet
-            assert "name" in pet
-            assert pet.get("status") == "available"
+        schema_validator.assert_valid("Pet", pets, many=True)
+        assert pooled_pet["id"] in [pet["id"] for pet in pets]
+        assert all(pet.get("status") == "available" for pet in pets)
+
+    def test_find_pets_by_tags(self, api_client, pet_data_generator, schema_validator):
+        """Проверка поиска питомцев по тегам"""
+        tag = {"id": 77, "name": f"tag_{pet_data_generator.generate_pet_data()['id']}"}
+        pet_data = pet_data_generator.generate_pet_data(tags=[tag])
+        create_response = api_client.create_pet(pet_data)
+        assert create_response.status_code == 200
+
+        response = api_client.find_pets_by_tags([tag["name"]])
+        assert response.status_code == 200
+
+        pets = response.json()
+        schema_validator.assert_valid("Pet", pets, many=True)
+        for pet in pets:
+            assert tag["name"] in [t.get("name") for t in pet.get("tags", [])]
 
     def test_pet_id_uniqueness(self, api_client, pet_data_generator):
         """Проверка уникальности ID - создание двух питомцев с одинаковым ID"""
@@ -234,19 +211,8 @@ class TestPetAdvanced:
         response1 = api_client.create_pet(pet1_data)
         assert response1.status_code == 200
 
-        time.sleep(5)
+        wait_until(lambda: api_client.get_pet(pet_id), lambda r: r.status_code == 200, name="get_pet")
 
         pet2_data = pet_data_generator.generate_pet_data(pet_id=pet_id, name="Second Pet")
         response2 = api_client.create_pet(pet2_data)
         assert response2.status_code in [200]
-
-    def test_create_pet_performance(self, api_client, pet_data_generator):
-        """Базовый тест производительности - создание должно быть быстрым"""
-        pet_data = pet_data_generator.generate_pet_data()
-
-        start_time = time.time()
-        response = api_client.create_pet(pet_data)
-        end_time = time.time()
-
-        assert response.status_code == 200
-        assert (end_time - start_time) < 2.0, "Создание должно занимать менее 2 секунд"
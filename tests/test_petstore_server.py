@@ -0,0 +1,85 @@
+"""
+Тесты локального Petstore сервера - индексы in-memory хранилища и обработка некорректных запросов
+"""
+import requests
+
+from helpers.petstore_server import LocalPetstoreServer, PetstoreStore
+
+
+class TestPetstoreStoreIndexes:
+    """Тесты вторичных индексов по статусу и тегам"""
+
+    def test_status_index_follows_updates(self):
+        """Проверка переиндексации питомца при смене статуса"""
+        store = PetstoreStore()
+        store.upsert_pet({"id": 1, "name": "A", "status": "available"})
+        store.update_pet_fields(1, {"status": "sold"})
+
+        assert store.find_pets_by_status(["available"]) == []
+        assert [pet["id"] for pet in store.find_pets_by_status(["sold"])] == [1]
+        assert store.inventory() == {"sold": 1}
+
+    def test_tag_index_and_delete(self):
+        """Проверка поиска по тегам и очистки индекса после удаления"""
+        store = PetstoreStore()
+        store.upsert_pet({"id": 1, "name": "A", "tags": [{"id": 1, "name": "calm"}]})
+        store.upsert_pet({"id": 2, "name": "B", "tags": [{"id": 2, "name": "loyal"}]})
+
+        found = store.find_pets_by_tags(["calm", "loyal"])
+        assert sorted(pet["id"] for pet in found) == [1, 2]
+
+        assert store.delete_pet(1) is True
+        assert store.find_pets_by_tags(["calm"]) == []
+        assert store.delete_pet(1) is False
+
+    def test_zero_id_gets_generated(self):
+        """Проверка генерации ID для питомца с id = 0"""
+        store = PetstoreStore()
+        pet = store.upsert_pet({"id": 0, "name": "A"})
+        assert pet["id"] != 0
+        assert store.get_pet(pet["id"])["photoUrls"] == []
+
+
+class TestPetstoreHandlers:
+    """Тесты обработчиков локального сервера"""
+
+    def test_form_update_with_invalid_encoding(self):
+        """Проверка ответа 400 вместо падения обработчика на теле формы не в UTF-8"""
+        with LocalPetstoreServer() as server:
+            session = requests.Session()
+            session.post(f"{server.base_url}/pet", json={"id": 1, "name": "A", "status": "available"})
+            response = session.post(f"{server.base_url}/pet/1", data=b"name=\xff\xfe",
+                                    headers={"Content-Type": "application/x-www-form-urlencoded"})
+            pet = session.get(f"{server.base_url}/pet/1").json()
+            session.close()
+
+        assert response.status_code == 400
+        assert response.json()["message"] == "bad input"
+        assert pet["name"] == "A"
+
+    def test_unhashable_index_fields_rejected(self):
+        """Проверка ответа 500 на статус, имя тега или username не строкой без порчи хранилища и индексов"""
+        with LocalPetstoreServer() as server:
+            session = requests.Session()
+            session.post(f"{server.base_url}/pet", json={"id": 1, "name": "A", "status": "available"})
+            responses = [
+                session.post(f"{server.base_url}/pet", json={"id": 1, "status": ["sold"]}),
+                session.put(f"{server.base_url}/pet", json={"id": 1, "tags": [{"id": 1, "name": {"a": 1}}]}),
+                session.post(f"{server.base_url}/user", json={"id": 2, "username": ["user"]}),
+            ]
+            pet = session.get(f"{server.base_url}/pet/1").json()
+            inventory = session.get(f"{server.base_url}/store/inventory").json()
+            session.close()
+
+        assert [response.status_code for response in responses] == [500] * 3
+        assert pet["status"] == "available"
+        assert inventory == {"available": 1}
+
+    def test_unexpected_handler_error_answers_500(self, monkeypatch):
+        """Проверка ответа 500 вместо разрыва соединения при непредвиденной ошибке обработчика"""
+        monkeypatch.setattr(PetstoreStore, "inventory", lambda store: 1 / 0)
+        with LocalPetstoreServer() as server:
+            response = requests.get(f"{server.base_url}/store/inventory")
+
+        assert response.status_code == 500
+        assert response.json()["message"] == "something bad happened"
@@ -0,0 +1,41 @@
+"""
+Тесты планировщика параллельного прогона - разбиение LPT и оценка длительностей
+"""
+from helpers.pytest_scheduler import estimate_durations, lpt_partition
+
+
+class TestLptPartition:
+    """Тесты lpt_partition"""
+
+    def test_long_tests_spread_across_workers(self):
+        """Проверка, что долгие тесты не попадают к одному воркеру"""
+        durations = [5.0, 0.01, 5.0, 0.01, 10.0, 0.01]
+        buckets = lpt_partition(durations, 3)
+
+        loads = sorted(sum(durations[i] for i in bucket) for bucket in buckets)
+        assert loads[-1] == 10.0
+        assert sorted(i for bucket in buckets for i in bucket) == list(range(len(durations)))
+
+    def test_bucket_keeps_collection_order(self):
+        """Проверка исходного порядка тестов внутри воркера (для фикстур уровня класса и модуля)"""
+        buckets = lpt_partition([1.0, 3.0, 2.0, 4.0], 2)
+        assert all(bucket == sorted(bucket) for bucket in buckets)
+
+    def test_makespan_within_lpt_bound(self):
+        """Проверка гарантии LPT: makespan не больше 4/3 оптимума"""
+        durations = [3, 3, 2, 2, 2]
+        makespan = max(sum(durations[i] for i in bucket) for bucket in lpt_partition(durations, 2))
+        assert makespan <= 6 * 4 / 3
+
+
+class TestEstimateDurations:
+    """Тесты estimate_durations"""
+
+    def test_unknown_tests_get_mean_of_known(self):
+        """Проверка оценки новых тестов средней длительностью известных"""
+        history = {"a": 1.0, "b": 3.0}
+        assert estimate_durations(["a", "b", "new"], history) == [1.0, 3.0, 2.0]
+
+    def test_empty_history(self):
+        """Проверка значения по умолчанию без истории"""
+        assert estimate_durations(["x", "y"], {}) == [1.0, 1.0]
@@ -0,0 +1,184 @@
+"""
+Тесты ограничения интенсивности и адаптивного предела параллельности
+"""
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.metrics import RequestMetrics
+from helpers.rate_limit import AdaptiveConcurrencyLimit, RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestTokenBucket:
+    """Тесты токен-бакета"""
+
+    def test_burst_then_steady_rate(self):
+        """Проверка запаса burst и ожидания по rate после его исчерпания"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+
+        assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+        assert bucket.acquire() == pytest.approx(0.1)
+        assert bucket.acquire() == pytest.approx(0.1)
+        assert clock.now == pytest.approx(0.2)
+        assert bucket.waits == 2
+
+    def test_reservations_queue_in_order(self):
+        """Проверка, что конкурирующие резервирования встают в очередь, а не ждут одного токена"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=1, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.5, 1.0, 1.5]
+        assert not bucket.try_acquire()
+        clock.now = 2.0
+        assert bucket.try_acquire()
+
+    def test_refill_is_capped_by_burst(self):
+        """Проверка, что простой не накапливает токенов больше burst"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=100, burst=3, clock=clock)
+        clock.now = 60
+
+        assert sum(bucket.try_acquire() for _ in range(10)) == 3
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimiter:
+    """Тесты бюджетов по endpoint-ам"""
+
+    def test_global_and_endpoint_budgets(self):
+        """Проверка, что запрос проходит и общий бакет, и бакет своего endpoint-а"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=100, endpoints={"GET /pet/{petId}": 1, "/user/{username}": 2},
+                              burst=1, clock=clock, sleep=clock.sleep)
+
+        assert len(limiter.buckets("GET", "/pet/{petId}")) == 2
+        assert len(limiter.buckets("DELETE", "/pet/{petId}")) == 1
+        assert len(limiter.buckets("PUT", "/user/{username}")) == 2
+        limiter.acquire("GET", "/pet/{petId}")
+        assert limiter.acquire("GET", "/pet/{petId}") == pytest.approx(1.0)
+        assert limiter.limits() == {"GET /pet/{petId}": 1, "/user/{username}": 2, "*": 100}
+
+
+class TestAdaptiveConcurrencyLimit:
+    """Тесты AIMD-предела"""
+
+    def _complete(self, limit, clock, latency=0.01, status_code=200):
+        started = limit.acquire()
+        clock.now += latency
+        limit.release(started, status_code)
+
+    def test_additive_increase_when_limit_is_used(self):
+        """Проверка роста примерно на единицу за окно, только при загруженном пределе"""
+        clock = FakeClock()
+        limit = AdaptiveConcurrencyLimit(initial=4, clock=clock)
+
+        for _ in range(20):
+            self._complete(limit, clock)
+        assert limit.limit == 4
+
+        # Постоянная нагрузка на сервер, который масштабируется: каждый запрос длится
+        # 0.01 с при любой параллельности, место завершенного сразу занимает новый
+        started = [limit.acquire() for _ in range(limit.limit)]
+        for _ in range(30):
+            clock.now += 0.01 / limit.limit
+            limit.release(started.pop(0), 200)
+            while limit.in_flight < limit.limit:
+                started.append(limit.acquire())
+        assert 8 <= limit.limit <= 9
+        assert limit.decreases == 0
+
+    def test_multiplicative_decrease_once_per_window(self):
+        """Проверка уменьшения на 429/503/ошибке транспорта не чаще раза на окно"""
+        clock = FakeClock()
+        limit = AdaptiveConcurrencyLimit(initial=16, clock=clock)
+
+        started = [limit.acquire() for _ in range(8)]
+        clock.now += 0.01
+        for start in started:
+            limit.release(start, 503)
+        assert limit.limit == 8
+        assert limit.decreases == 1
+
+        self._complete(limit, clock, status_code=429)
+        self._complete(limit, clock, status_code=None)
+        assert limit.limit == 2
+        for _ in range(5):
+            self._complete(limit, clock, status_code=502)
+        assert limit.limit == 1
+
+    def test_server_error_is_not_overload(self):
+        """Проверка, что 500 на некорректный ввод не уменьшает предел, а настроенный статус уменьшает"""
+        clock = FakeClock()
+        limit = AdaptiveConcurrencyLimit(initial=8, clock=clock)
+
+        for _ in range(10):
+            self._complete(limit, clock, status_code=500)
+        assert limit.limit == 8
+        assert limit.decreases == 0
+
+        strict = AdaptiveConcurrencyLimit(initial=8, clock=clock, overload_statuses={500})
+        self._complete(strict, clock, status_code=500)
+        assert strict.limit == 4
+
+    def test_latency_growth_triggers_backoff(self):
+        """Проверка снижения предела, когда сглаженная задержка растет выше допуска"""
+        clock = FakeClock()
+        limit = AdaptiveConcurrencyLimit(initial=10, latency_tolerance=2.0, clock=clock)
+
+        for _ in range(10):
+            self._complete(limit, clock, latency=0.01)
+        assert limit.decreases == 0
+        for _ in range(30):
+            self._complete(limit, clock, latency=0.1)
+
+        assert limit.decreases > 0
+        assert limit.limit < 10
+
+    def test_acquire_timeout(self):
+        """Проверка TimeoutError, если места под предел нет"""
+        limit = AdaptiveConcurrencyLimit(initial=1)
+        limit.acquire()
+
+        with pytest.raises(TimeoutError):
+            limit.acquire(timeout=0.01)
+
+
+@pytest.mark.live
+class TestClientLimits:
+    """Тесты пределов в клиенте"""
+
+    def test_invalid_input_errors_keep_concurrency_and_gauges(self, petstore_base_url, pet_data_generator):
+        """Проверка, что 500 на некорректный ввод не снижают предел, и публикации пределов в метриках"""
+        metrics = RequestMetrics()
+        limiter = RateLimiter(rate=1000, endpoints={"POST /pet": 500})
+        concurrency = AdaptiveConcurrencyLimit(initial=8)
+        client = PetstoreAPIClient(base_url=petstore_base_url, metrics=metrics,
+                                   rate_limiter=limiter, concurrency=concurrency)
+        try:
+            # Нечисловой ID питомца - ответ 500, как у публичного Petstore
+            broken = [pet_data_generator.generate_pet_data(pet_id=f"id-{i}") for i in range(20)]
+            report = client.create_pets_bulk(broken, max_in_flight=8).wait()
+        finally:
+            client.close()
+
+        assert report.status_codes == {500: 20}
+        assert concurrency.limit >= 8 and concurrency.decreases == 0
+        assert concurrency.in_flight == 0
+        assert metrics.gauges == {
+            "rate_limit POST /pet": 500,
+            "rate_limit *": 1000,
+            "concurrency_limit": concurrency.limit,
+        }
+        assert client.limits() == metrics.gauges
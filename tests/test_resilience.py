@@ -0,0 +1,262 @@
+"""
+Тесты повторов запросов и предохранителей
+"""
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.resilience import (
+    BUDGET_EXHAUSTED, FAILED, GAVE_UP, OK, RECOVERED, SHORT_CIRCUITED,
+    CircuitBreaker, CircuitBreakers, CircuitOpenError, RetryBudget, RetryPolicy,
+)
+
+STUB_URL = "http://petstore.stub/v2"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Отвечает по сценарию: статус (int), (статус, заголовки) или исключение"""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(f"{request.method} {request.path_url}")
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b"{}"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def _stub_client(script, **kwargs):
+    adapter = ScriptedAdapter(script)
+    client = PetstoreAPIClient(base_url=STUB_URL, **kwargs)
+    client.session.mount("http://petstore.stub", adapter)
+    return client, adapter
+
+
+class TestRetryPolicy:
+    """Тесты политики и бюджета повторов"""
+
+    def test_idempotent_methods_only_by_default(self):
+        """Проверка, что POST повторяется только с retry_non_idempotent"""
+        policy = RetryPolicy()
+
+        assert all(policy.allows(method) for method in ("GET", "PUT", "DELETE", "HEAD", "OPTIONS"))
+        assert not policy.allows("POST")
+        assert RetryPolicy(retry_non_idempotent=True).allows("POST")
+        assert not RetryPolicy(max_attempts=1).allows("GET")
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    def test_retryable_errors_and_statuses(self):
+        """Проверка повторяемых ошибок: сбой соединения, таймаут, 429/502/503/504, но не 500 и не открытая цепь"""
+        policy = RetryPolicy()
+        response = requests.Response()
+
+        assert policy.retryable(None, requests.ConnectionError())
+        assert policy.retryable(None, requests.Timeout())
+        assert not policy.retryable(None, CircuitOpenError("GET /pet/{petId}", 1.0))
+        assert not policy.retryable(None, requests.TooManyRedirects())
+        for status, expected in ((429, True), (503, True), (500, False), (404, False)):
+            response.status_code = status
+            assert policy.retryable(response, None) is expected
+
+    def test_retry_after_seconds_and_date(self):
+        """Проверка разбора Retry-After в секундах и в виде HTTP-даты"""
+        policy = RetryPolicy()
+        response = requests.Response()
+
+        assert policy.retry_after(response) is None
+        response.headers["Retry-After"] = "2"
+        assert policy.retry_after(response) == 2.0
+        response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert policy.retry_after(response) == 0.0
+        response.headers["Retry-After"] = "soon"
+        assert policy.retry_after(response) is None
+
+    def test_budget(self):
+        """Проверка, что бюджет пополняется на ratio за запрос и не уходит в минус"""
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+        assert budget.available == 0
+
+
+class TestCircuitBreaker:
+    """Тесты состояний предохранителя"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Проверка размыкания после failure_threshold отказов подряд; успех сбрасывает счетчик"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+
+        breaker.record(False)
+        breaker.record(False)
+        breaker.record(True)
+        breaker.record(False)
+        breaker.record(False)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record(False)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.before("GET /pet/{petId}")
+        assert error.value.retry_in == 10
+
+    def test_half_open_single_probe(self):
+        """Проверка одного пробного запроса после reset_timeout и повторного размыкания при его неудаче"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record(False)
+
+        clock.now = 10
+        breaker.before("key")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before("key")
+        breaker.record(False)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opens == 2
+
+        clock.now = 20
+        breaker.before("key")
+        breaker.cancel()
+        breaker.before("key")
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before("key")
+
+    def test_breakers_count_unavailability_only(self):
+        """Проверка, что отказом считаются сбои соединения и 502/503/504, но не 500 и не 404"""
+        clock = FakeClock()
+        breakers = CircuitBreakers(failure_threshold=2, reset_timeout=5, clock=clock)
+        response = requests.Response()
+
+        for status in (500, 404, 500):
+            response.status_code = status
+            breakers.record("GET /pet/{petId}", response, None)
+        assert breakers.state("GET /pet/{petId}") == CircuitBreaker.CLOSED
+
+        response.status_code = 503
+        breakers.record("GET /pet/{petId}", response, None)
+        breakers.record("GET /pet/{petId}", None, requests.ConnectionError())
+        clock.now = 1
+        assert breakers.state("GET /pet/{petId}") == CircuitBreaker.OPEN
+        assert breakers.state("GET /user/{username}") == CircuitBreaker.CLOSED
+        assert breakers.open_circuits() == {"GET /pet/{petId}": 4}
+
+
+class TestClientResilience:
+    """Тесты повторов и предохранителей в клиенте"""
+
+    def test_get_recovers_after_reset_and_503(self):
+        """Проверка, что GET повторяется при сбросе соединения и 503 и исход записывается как recovered"""
+        clock = FakeClock()
+        client, adapter = _stub_client(
+            [requests.ConnectionError("reset"), 503, 200],
+            retry_policy=RetryPolicy(max_attempts=3, sleep=clock.sleep),
+        )
+
+        assert client.get_pet(1).status_code == 200
+        assert len(adapter.requests) == 3
+        assert 0 < clock.now <= 0.15
+        assert client.resilience.to_dict() == {"GET /pet/{petId}": {RECOVERED: 1, "retries": 2}}
+
+    def test_post_is_not_retried_unless_asked(self):
+        """Проверка, что create_store_order не повторяется без retry_non_idempotent"""
+        client, adapter = _stub_client([503, 200], retry_policy=RetryPolicy(sleep=lambda _: None))
+
+        assert client.create_store_order({"id": 1}).status_code == 503
+        assert adapter.requests == ["POST /v2/store/order"]
+        assert client.resilience.to_dict()["POST /store/order"] == {FAILED: 1, "retries": 0}
+
+        client, adapter = _stub_client(
+            [503, 200], retry_policy=RetryPolicy(retry_non_idempotent=True, sleep=lambda _: None),
+        )
+        assert client.create_store_order({"id": 1}).status_code == 200
+        assert len(adapter.requests) == 2
+
+    def test_gives_up_after_max_attempts(self):
+        """Проверка, что после max_attempts возвращается последний ответ или исключение"""
+        client, adapter = _stub_client([502], retry_policy=RetryPolicy(max_attempts=3, sleep=lambda _: None))
+        assert client.delete_pet(1).status_code == 502
+        assert len(adapter.requests) == 3
+
+        client, adapter = _stub_client([requests.Timeout("slow")],
+                                       retry_policy=RetryPolicy(max_attempts=2, sleep=lambda _: None))
+        with pytest.raises(requests.Timeout):
+            client.get_user("john")
+        assert client.resilience.to_dict()["GET /user/{username}"] == {GAVE_UP: 1, "retries": 1}
+
+    def test_retry_after_is_respected(self):
+        """Проверка паузы из Retry-After и отказа от повтора, если она длиннее max_retry_after"""
+        slept = []
+        client, _ = _stub_client([(429, {"Retry-After": "1.5"}), 200],
+                                 retry_policy=RetryPolicy(sleep=slept.append))
+        assert client.get_store_inventory().status_code == 200
+        assert slept == [1.5]
+
+        client, adapter = _stub_client([(503, {"Retry-After": "120"}), 200],
+                                       retry_policy=RetryPolicy(max_retry_after=5, sleep=slept.append))
+        assert client.get_store_inventory().status_code == 503
+        assert len(adapter.requests) == 1
+
+    def test_budget_bounds_retries(self):
+        """Проверка, что при исчерпанном бюджете запросы больше не повторяются"""
+        policy = RetryPolicy(max_attempts=5, budget=RetryBudget(ratio=0.1, min_retries=2), sleep=lambda _: None)
+        client, adapter = _stub_client([503], retry_policy=policy)
+
+        for pet_id in range(3):
+            assert client.get_pet(pet_id).status_code == 503
+
+        assert len(adapter.requests) == 5
+        assert client.resilience.to_dict()["GET /pet/{petId}"] == {BUDGET_EXHAUSTED: 3, "retries": 2}
+
+    def test_circuit_short_circuits_endpoint(self):
+        """Проверка быстрого отказа после размыкания цепи, не затрагивающего другие endpoint-ы"""
+        client, adapter = _stub_client(
+            [requests.ConnectionError("down")],
+            retry_policy=RetryPolicy(max_attempts=2, sleep=lambda _: None),
+            circuit_breakers=CircuitBreakers(failure_threshold=3, reset_timeout=60),
+        )
+
+        for pet_id in range(2):
+            with pytest.raises(requests.ConnectionError):
+                client.get_pet(pet_id)
+        with pytest.raises(CircuitOpenError) as error:
+            client.get_pet(3)
+
+        assert error.value.key == "GET /pet/{petId}"
+        assert len(adapter.requests) == 3
+        adapter.script = [200]
+        assert client.get_user("john").status_code == 200
+        assert client.resilience.incidents() == {
+            "GET /pet/{petId}": {GAVE_UP: 1, SHORT_CIRCUITED: 2, "retries": 2},
+        }
+        assert client.resilience.to_dict()["GET /user/{username}"] == {OK: 1, "retries": 0}
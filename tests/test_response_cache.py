@@ -0,0 +1,166 @@
+"""
+Тесты кеша ответов клиента - попадания, инвалидация записями и вытеснение
+"""
+import threading
+
+import pytest
+import requests
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.response_cache import ResponseCache
+
+
+def _response(content):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+@pytest.mark.live
+class TestClientCache:
+    """Тесты кеша, подключенного к PetstoreAPIClient"""
+
+    def test_repeated_get_served_from_cache(self, petstore_base_url, pet_data_generator):
+        """Проверка, что повторный GET не уходит на сервер"""
+        cache = ResponseCache()
+        client = PetstoreAPIClient(base_url=petstore_base_url, cache=cache)
+        pet_data = pet_data_generator.generate_pet_data()
+        client.create_pet(pet_data)
+
+        first = client.get_pet(pet_data["id"])
+        second = client.get_pet(pet_data["id"])
+        client.close()
+
+        assert first.status_code == second.status_code == 200
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_pet_writes_invalidate_pet_and_lists(self, petstore_base_url, pet_data_generator):
+        """Проверка сброса питомца, списков его старого и нового статуса и инвентаря"""
+        client = PetstoreAPIClient(base_url=petstore_base_url, cache=ResponseCache())
+        pet_data = pet_data_generator.generate_pet_data(status="available")
+        client.create_pet(pet_data)
+        pet_id = pet_data["id"]
+        client.get_pet(pet_id)
+        client.find_pets_by_status("available")
+        client.find_pets_by_status("sold")
+        client.get_store_inventory()
+
+        client.update_pet_with_form(pet_id, status="sold")
+
+        assert client.get_pet(pet_id).json()["status"] == "sold"
+        assert pet_id not in [pet["id"] for pet in client.find_pets_by_status("available").json()]
+        assert pet_id in [pet["id"] for pet in client.find_pets_by_status("sold").json()]
+        client.delete_pet(pet_id)
+        assert client.get_pet(pet_id).status_code == 404
+        client.close()
+
+    def test_user_and_order_writes_invalidate(self, petstore_base_url, user_data_generator,
+                                              order_data_generator):
+        """Проверка сброса пользователя при обновлении и заказа при удалении"""
+        client = PetstoreAPIClient(base_url=petstore_base_url, cache=ResponseCache())
+        user_data = user_data_generator.generate_user_data()
+        client.create_user(user_data)
+        client.get_user(user_data["username"])
+        client.update_user(user_data["username"], dict(user_data, firstName="Changed"))
+        assert client.get_user(user_data["username"]).json()["firstName"] == "Changed"
+
+        order_data = order_data_generator.generate_order_data()
+        client.create_store_order(order_data)
+        assert client.get_store_order(order_data["id"]).status_code == 200
+        client.delete_store_order(order_data["id"])
+        assert client.get_store_order(order_data["id"]).status_code == 404
+        client.close()
+
+    def test_write_during_read_is_not_cached_stale(self, petstore_base_url, pet_data_generator):
+        """Проверка, что GET, ответ которого получен до записи, не кладет устаревший ответ после ее инвалидации"""
+        cache = ResponseCache()
+        client = PetstoreAPIClient(base_url=petstore_base_url, cache=cache)
+        pet_data = pet_data_generator.generate_pet_data(status="available")
+        client.create_pet(pet_data)
+        pet_id = pet_data["id"]
+        writer = PetstoreAPIClient(base_url=petstore_base_url, cache=cache)
+
+        def write_while_reading(method, endpoint, kwargs, response):
+            # Ответ GET уже получен, но еще не в кеше: запись из другого потока успевает раньше
+            if method == "GET":
+                client.remove_listener(write_while_reading)
+                thread = threading.Thread(target=writer.update_pet_with_form, args=(pet_id,),
+                                          kwargs={"status": "sold"})
+                thread.start()
+                thread.join()
+
+        client.add_listener(write_while_reading)
+        assert client.get_pet(pet_id).json()["status"] == "available"
+        assert client.get_pet(pet_id).json()["status"] == "sold"
+        assert cache.stale == 1
+        client.delete_pet(pet_id)
+        writer.close()
+        client.close()
+
+
+class TestResponseCache:
+    """Тесты вытеснения ResponseCache"""
+
+    def test_lru_and_size_cap(self):
+        """Проверка вытеснения давно не использованных записей по числу и объему"""
+        cache = ResponseCache(max_entries=2, max_bytes=10)
+        cache.put(("/a", ()), _response(b"1234"), {"pet:1"})
+        cache.put(("/b", ()), _response(b"1234"), {"pet:2"})
+        cache.get(("/a", ()))
+        cache.put(("/c", ()), _response(b"1234"), {"pet:3"})
+
+        assert cache.get(("/b", ())) is None
+        assert cache.get(("/a", ())) is not None
+        cache.put(("/d", ()), _response(b"12345678"), set())
+        assert len(cache) == 1
+        assert cache.evictions == 3
+
+    def test_ttl_expiry(self):
+        """Проверка истечения срока жизни записи"""
+        now = [0.0]
+        cache = ResponseCache(ttl=5, clock=lambda: now[0])
+        cache.put(("/a", ()), _response(b"{}"), {"inventory"})
+        now[0] = 4.9
+        assert cache.get(("/a", ())) is not None
+        now[0] = 5.1
+        assert cache.get(("/a", ())) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_put_after_invalidation_is_dropped(self):
+        """Проверка отбрасывания ответа, теги которого сброшены после начала чтения, в том числе из потоков"""
+        cache = ResponseCache()
+        since = cache.begin()
+        cache.invalidate({"pet:2"})
+        cache.put(("/pet/1", ()), _response(b"{}"), {"pet:1"}, since)
+        cache.invalidate({"pet:1"})
+        cache.put(("/pet/1", ()), _response(b"{}"), {"pet:1"}, since)
+        cache.end(since)
+        assert cache.get(("/pet/1", ())) is None
+        assert cache.stale == 1
+
+        started, written = threading.Event(), threading.Event()
+
+        def read():
+            since = cache.begin()
+            started.set()
+            written.wait()
+            cache.put(("/store/inventory", ()), _response(b"{}"), {"inventory"}, since)
+            cache.end(since)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        started.wait()
+        cache.invalidate({"inventory"})
+        written.set()
+        reader.join()
+
+        assert cache.get(("/store/inventory", ())) is None
+        assert cache.stale == 2
+        assert cache._invalidated == {} and not cache._reading
+
+        since = cache.begin()
+        cache.put(("/pet/1", ()), _response(b"{}"), {"pet:1"}, since)
+        cache.end(since)
+        assert cache.get(("/pet/1", ())) is not None
@@ -0,0 +1,71 @@
+"""
+Тесты проверки ответов по скомпилированным схемам Petstore
+"""
+import json
+
+import pytest
+
+from helpers.schema_validator import SchemaError, SchemaValidationError, SchemaValidator
+
+
+class TestSchemaValidator:
+    """Тесты SchemaValidator"""
+
+    def test_generated_data_is_valid(self, schema_validator, pet_data_generator,
+                                     order_data_generator, user_data_generator):
+        """Проверка, что данные генераторов соответствуют схемам"""
+        assert schema_validator.is_valid("Pet", pet_data_generator.generate_batch(200, seed=1), many=True)
+        assert schema_validator.is_valid("Order", order_data_generator.generate_batch(200, seed=1), many=True)
+        assert schema_validator.is_valid("User", user_data_generator.generate_batch(200, seed=1), many=True)
+        assert schema_validator.errors("Inventory", {"available": 3, "sold": 0}) == []
+
+    def test_reports_all_violations_with_paths(self, schema_validator, pet_data_generator):
+        """Проверка сбора всех нарушений списка с JSON-путями"""
+        # Через JSON, как в ответе: теги генератора разделяются между питомцами
+        pets = json.loads(json.dumps(pet_data_generator.generate_batch(20, seed=2)))
+        pets[3]["status"] = "lost"
+        del pets[5]["photoUrls"]
+        pets[7]["id"] = True
+        pets[12]["tags"][0]["name"] = 5
+
+        assert not schema_validator.is_valid("Pet", pets, many=True)
+        assert schema_validator.errors("Pet", pets, many=True) == [
+            SchemaError("$[3].status", "expected one of ['available', 'pending', 'sold'], got 'lost'"),
+            SchemaError("$[5].photoUrls", "required property is missing"),
+            SchemaError("$[7].id", "expected integer (int64), got True"),
+            SchemaError("$[12].tags[0].name", "expected string, got 5"),
+        ]
+
+    def test_type_and_range_checks(self, schema_validator):
+        """Проверка типов, диапазонов int32/int64 и формата date-time"""
+        order = {"id": 1, "petId": 2, "quantity": 1 << 40, "shipDate": "yesterday", "complete": "yes"}
+
+        assert [error.path for error in schema_validator.errors("Order", order)] == [
+            "$.quantity", "$.shipDate", "$.complete",
+        ]
+        assert schema_validator.is_valid("Order", {"shipDate": "2024-01-01T00:00:00.000+0000"})
+        assert not schema_validator.is_valid("Pet", [], many=False)
+        assert schema_validator.errors("Pet", {}, many=True) == [SchemaError("$", "expected array, got {}")]
+
+    def test_assert_valid_lists_violations(self, schema_validator):
+        """Проверка сообщения SchemaValidationError"""
+        with pytest.raises(SchemaValidationError) as error:
+            schema_validator.assert_valid("User", {"username": 1, "userStatus": "x"})
+
+        assert len(error.value.errors) == 2
+        assert "$.username: expected string" in str(error.value)
+
+    def test_custom_definitions_and_refs(self):
+        """Проверка компиляции произвольных определений со ссылками"""
+        validator = SchemaValidator({
+            "Point": {"type": "object", "required": ["x"], "properties": {"x": {"type": "number"}}},
+            "Path": {"type": "object", "properties": {
+                "points": {"type": "array", "items": {"$ref": "#/definitions/Point"}},
+            }},
+        })
+
+        assert validator.is_valid("Path", {"points": [{"x": 1}, {"x": 2.5}]})
+        assert validator.errors("Path", {"points": [{"x": 1}, {}]}) == [
+            SchemaError("$.points[1].x", "required property is missing"),
+        ]
+        assert "def _valid_Path" in validator.source
@@ -0,0 +1,77 @@
+"""
+Тесты soak-прогона - поиск монотонного роста и короткий прогон клиента
+"""
+import random
+import tracemalloc
+
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.soak import LEAK_THRESHOLDS, SoakRunner, find_leaks, growth_trend
+
+
+def _samples(metric, values, interval=10.0):
+    return [{"t": i * interval, metric: value} for i, value in enumerate(values)]
+
+
+class TestLeakDetection:
+    """Тесты growth_trend и find_leaks"""
+
+    def test_trend_of_growing_and_flat_series(self):
+        """Проверка тау и наклона у растущего и у колеблющегося ряда"""
+        times = [float(t) for t in range(50)]
+        tau, slope = growth_trend(times, [100 + 2 * t for t in times])
+        assert tau == 1.0 and slope == pytest.approx(2.0)
+
+        rng = random.Random(1)
+        tau, slope = growth_trend(times, [100 + rng.uniform(-5, 5) for _ in times])
+        assert abs(tau) < 0.3 and abs(slope) < 0.5
+
+    def test_flags_steady_growth_above_threshold(self):
+        """Проверка, что шумный, но устойчивый рост дескрипторов считается утечкой, а рост ниже порога - нет"""
+        rng = random.Random(2)
+        leaking = [10 + i // 3 + rng.choice((0, 0, 1)) for i in range(60)]
+        [finding] = find_leaks(_samples("fds", leaking), warmup=0)
+        assert finding.metric == "fds" and finding.tau > 0.6
+        assert finding.growth >= LEAK_THRESHOLDS["fds"]
+        assert finding.to_dict()["per_hour"] > 0
+
+        assert find_leaks(_samples("fds", [10] * 59 + [12]), warmup=0) == []
+
+    def test_warmup_and_plateau_are_not_leaks(self):
+        """Проверка, что рост при прогреве и выход на плато (наполнение пула, кеша) не считаются утечкой"""
+        warming = [1000 * min(i, 10) for i in range(40)]
+        assert find_leaks(_samples("cache_entries", warming), warmup=100) == []
+        assert find_leaks(_samples("rss_bytes", [1 << 20] * 3), warmup=0) == []
+
+
+@pytest.mark.live
+class TestSoakRunner:
+    """Тесты короткого soak-прогона"""
+
+    def test_short_run_time_series(self, petstore_base_url):
+        """Проверка снимков временного ряда, счетчиков операций и восстановления tracemalloc"""
+        client = PetstoreAPIClient(base_url=petstore_base_url, transport="raw")
+        emitted = []
+        runner = SoakRunner(client, duration=1.5, interval=0.3, warmup=0.6, threads=2, seed=1,
+                            seed_entities=5, on_sample=emitted.append)
+
+        report = runner.run()
+        client.close()
+
+        assert len(report.samples) == len(emitted) >= 3
+        assert [sample["t"] for sample in report.samples] == sorted(sample["t"] for sample in report.samples)
+        last = report.samples[-1]
+        assert last["fds"] >= last["sockets"] >= 1
+        assert last["pool_pools"] == 1 and last["traced_bytes"] > 0
+        assert "top_allocators" in emitted[-1] and "top_allocators" not in last
+        assert report.operations["upload_pet_image"]["requests"] > 0
+        assert sum(item["requests"] for item in report.operations.values()) == last["requests"] > 0
+        assert not tracemalloc.is_tracing()
+        assert set(report.to_dict()) >= {"ok", "leaks", "top_allocators", "operations"}
+        assert "rss_bytes" in report.format_table()
+
+    def test_unknown_operation(self):
+        """Проверка ошибки для несуществующего метода клиента"""
+        with pytest.raises(ValueError):
+            SoakRunner(PetstoreAPIClient(), {"get_pets": 1})
@@ -3,13 +3,14 @@
 некорректные данные, идемпотентность, уникальность и структуру ответов
 """
 import pytest
-import time
+
+from helpers.waiting import wait_until
 
 
 class TestStoreOrderCRUD:
     """Тесты базовых операций CRUD для заказов"""
 
-    def test_create_order_success(self, api_client, order_data_generator):
+    def test_create_order_success(self, api_client, order_data_generator, schema_validator):
         """Проверка успешного создания заказа с проверкой структуры ответа"""
         order_data = order_data_generator.generate_order_data()
         response = api_client.create_store_order(order_data)
@@ -19,39 +20,17 @@ class TestStoreOrderCRUD:
         assert created_order["id"] == order_data["id"]
         assert created_order["petId"] == order_data["petId"]
         assert created_order["quantity"] == order_data["quantity"]
-        assert isinstance(created_order["id"], int)
-        assert isinstance(created_order["petId"], int)
-        assert isinstance(created_order["quantity"], int)
-        if "complete" in created_order:
-            assert isinstance(created_order["complete"], bool)
+        schema_validator.assert_valid("Order", created_order)
 
-    def test_get_existing_order(self, api_client, order_data_generator):
+    def test_get_existing_order(self, api_client, pooled_order, schema_validator):
         """Проверка получения существующего заказа с проверкой структуры"""
-        order_data = order_data_generator.generate_order_data()
-        create_response = api_client.create_store_order(order_data)
-        assert create_response.status_code == 200
+        order_id = pooled_order["id"]
+        response = api_client.get_store_order(order_id)
 
-        # Используем ID из ответа создания
-        created_order = create_response.json()
-        order_id = created_order["id"]
-        
-        # Используем retry механизм для получения заказа
-        # (демо API Petstore может иметь нестабильную задержку распространения данных)
-        max_attempts = 5
-        response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)  # Увеличивающаяся задержка
-            response = api_client.get_store_order(order_id)
-            if response.status_code == 200:
-                break
-        
-        assert response.status_code == 200, f"Не удалось получить заказ после {max_attempts} попыток. Последний ответ: {response.text if response else 'None'}"
+        assert response.status_code == 200, f"Не удалось получить заказ. Последний ответ: {response.text}"
         order = response.json()
         assert order["id"] == order_id
-        assert isinstance(order["id"], int)
-        assert isinstance(order["petId"], int)
-        assert isinstance(order["quantity"], int)
+        schema_validator.assert_valid("Order", order)
 
     def test_get_nonexistent_order(self, api_client):
         """Проверка HTTP статуса 404 для несуществующего заказа"""
@@ -69,25 +48,14 @@ class TestStoreOrderCRUD:
         order_id = created_order["id"]
         
         # Убеждаемся, что заказ существует перед удалением
-        # (используем retry, так как демо API Petstore имеет задержку распространения данных)
-        max_attempts = 10
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            get_response = api_client.get_store_order(order_id)
-            if get_response.status_code == 200:
-                break
-        
-        # Удаляем заказ с retry механизмом
-        delete_response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            delete_response = api_client.delete_store_order(order_id)
-            if delete_response.status_code == 200:
-                break
-        
-        assert delete_response.status_code == 200, f"Не удалось удалить заказ после {max_attempts} попыток. Последний ответ: {delete_response.text if delete_response else 'None'}"
+        # (демо API Petstore имеет задержку распространения данных)
+        wait_until(lambda: api_client.get_store_order(order_id), lambda r: r.status_code == 200,
+                   timeout=20, name="get_store_order")
+
+        delete_response = wait_until(lambda: api_client.delete_store_order(order_id), lambda r: r.status_code == 200,
+                                     timeout=20, name="delete_store_order")
+
+        assert delete_response.status_code == 200, f"Не удалось удалить заказ. Последний ответ: {delete_response.text}"
         
         # Проверяем, что заказ действительно удален
         verify_response = api_client.get_store_order(order_id)
@@ -155,24 +123,14 @@ class TestStoreIdempotency:
         order_id = created_order["id"]
         
         # Убеждаемся, что заказ существует перед удалением
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            get_response = api_client.get_store_order(order_id)
-            if get_response.status_code == 200:
-                break
-        
-        # Первое удаление с retry механизмом
-        delete_response1 = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            delete_response1 = api_client.delete_store_order(order_id)
-            if delete_response1.status_code == 200:
-                break
-        
-        assert delete_response1.status_code == 200, f"Не удалось удалить заказ после {max_attempts} попыток. Последний ответ: {delete_response1.text if delete_response1 else 'None'}"
+        wait_until(lambda: api_client.get_store_order(order_id), lambda r: r.status_code == 200,
+                   name="get_store_order")
+
+        # Первое удаление
+        delete_response1 = wait_until(lambda: api_client.delete_store_order(order_id), lambda r: r.status_code == 200,
+                                      name="delete_store_order")
+
+        assert delete_response1.status_code == 200, f"Не удалось удалить заказ. Последний ответ: {delete_response1.text}"
 
         # Повторное удаление должно вернуть 404
         delete_response2 = api_client.delete_store_order(order_id)
@@ -182,17 +140,14 @@ class TestStoreIdempotency:
 class TestStoreAdvanced:
     """Дополнительные тесты для Store API"""
 
-    def test_get_inventory(self, api_client):
+    def test_get_inventory(self, api_client, schema_validator):
         """Проверка получения инвентаря с проверкой структуры"""
         response = api_client.get_store_inventory()
         assert response.status_code == 200
 
         inventory = response.json()
-        assert isinstance(inventory, dict)
-        for key, value in inventory.items():
-            assert isinstance(key, str)
-            assert isinstance(value, int)
-            assert value >= 0
+        schema_validator.assert_valid("Inventory", inventory)
+        assert all(value >= 0 for value in inventory.values())
 
     def test_order_id_uniqueness(self, api_client, order_data_generator):
         """Проверка уникальности ID - создание двух заказов с одинаковым ID"""
@@ -205,14 +160,3 @@ class TestStoreAdvanced:
         order2_data = order_data_generator.generate_order_data(order_id=order_id, pet_id=2)
         response2 = api_client.create_store_order(order2_data)
         assert response2.status_code in [200]
-
-    def test_create_order_performance(self, api_client, order_data_generator):
-        """Базовый тест производительности - создание должно быть быстрым"""
-        order_data = order_data_generator.generate_order_data()
-
-        start_time = time.time()
-        response = api_client.create_store_order(order_data)
-        end_time = time.time()
-
-        assert response.status_code == 200
-        assert (end_time - start_time) < 2.0, "Создание должно занимать менее 2 секунд"
\ No newline at end of file
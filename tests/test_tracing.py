@@ -0,0 +1,139 @@
+"""
+Тесты трассировки запросов клиента
+"""
+import socket
+import threading
+
+import pytest
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.rate_limit import AdaptiveConcurrencyLimit, RateLimiter
+from helpers.resilience import RetryPolicy
+from helpers.tracing import Tracer, load_trace_events, phase, summarize
+
+
+def _serve(replies):
+    """Сервер, отвечающий на каждое соединение очередным ответом из replies"""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        for reply in replies:
+            connection, _ = listener.accept()
+            with connection:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += connection.recv(65536)
+                connection.sendall(reply)
+        listener.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return f"http://localhost:{listener.getsockname()[1]}/v2"
+
+
+def _phases(tracer):
+    return [event["name"] for event in tracer.events if event["cat"] == "phase"]
+
+
+class TestTracer:
+    """Тесты Tracer"""
+
+    def test_phase_is_noop_outside_request(self):
+        """Проверка, что вне запроса с трассировкой фазы ничего не пишут"""
+        tracer = Tracer()
+        with phase("connect") as first, phase("ttfb") as second:
+            pass
+        assert first is second
+        assert tracer.events == []
+
+    def test_request_span_tags_phases(self):
+        """Проверка меток node id и endpoint у фаз, статуса у запроса и ошибки у прерванного span-а"""
+        tracer = Tracer()
+        tracer.node_id = "tests/test_user.py::TestUser::test_get_existing_user"
+        with tracer.request("GET /user/{username}", "/user/{username}") as span:
+            with phase("ttfb"):
+                pass
+            span.tag(status=200)
+        with pytest.raises(TimeoutError):
+            with tracer.request("GET /user/{username}", "/user/{username}"):
+                with phase("connect"):
+                    raise TimeoutError()
+
+        ttfb, request, connect, failed = tracer.events
+        labels = {"node": tracer.node_id, "endpoint": "/user/{username}"}
+        assert (ttfb["name"], ttfb["cat"], ttfb["args"]) == ("ttfb", "phase", labels)
+        assert request["args"] == {**labels, "status": 200}
+        assert request["ts"] <= ttfb["ts"] and ttfb["ts"] + ttfb["dur"] <= request["ts"] + request["dur"]
+        assert connect["args"]["error"] == failed["args"]["error"] == "TimeoutError"
+        with phase("send"):
+            pass
+        assert len(tracer.events) == 4
+
+    def test_dump_merge_and_summarize(self, tmp_path):
+        """Проверка файла в формате Chrome trace с событиями воркера и сводки по фазам"""
+        worker = Tracer("pytest worker 1")
+        with worker.request("POST /pet", "/pet"):
+            with phase("send"):
+                pass
+        worker.dump(str(tmp_path / "worker.json"))
+        tracer = Tracer()
+        tracer.merge(load_trace_events(str(tmp_path / "worker.json")))
+        with tracer.span("tests/test_pet.py::test_create", "test"):
+            pass
+        path = tmp_path / "trace.json"
+        tracer.dump(str(path))
+
+        events = load_trace_events(str(path))
+        processes = {event["args"]["name"] for event in events if event["name"] == "process_name"}
+        assert processes == {"pytest", "pytest worker 1"}
+        assert {event["ph"] for event in events} == {"M", "X"}
+        summary = summarize(events)
+        assert set(summary) == {"request", "send"}
+        assert summary["send"]["count"] == 1
+
+
+class TestClientTracing:
+    """Тесты трассировки запросов PetstoreAPIClient"""
+
+    def test_raw_transport_phases_with_retry(self):
+        """Проверка фаз соединения, отправки, ответа и паузы повтора внутри одного span-а запроса"""
+        unavailable = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+        ok = b"HTTP/1.1 200 OK\r\nContent-Length: 11\r\nConnection: close\r\n\r\n{\"sold\": 1}"
+        tracer = Tracer()
+        tracer.node_id = "test"
+        sleeps = []
+        client = PetstoreAPIClient(base_url=_serve([unavailable, ok]), transport="raw", tracer=tracer,
+                                   retry_policy=RetryPolicy(sleep=sleeps.append))
+
+        assert client.get_store_inventory().json() == {"sold": 1}
+
+        assert _phases(tracer) == ["dns", "connect", "send", "ttfb", "download", "attempt", "retry_sleep",
+                                   "dns", "connect", "send", "ttfb", "download", "attempt"]
+        [request] = [event for event in tracer.events if event["cat"] == "request"]
+        assert request["name"] == "GET /store/inventory"
+        assert request["args"] == {"node": "test", "endpoint": "/store/inventory", "status": 200}
+        for event in tracer.events:
+            assert request["ts"] <= event["ts"] <= event["ts"] + event["dur"] <= request["ts"] + request["dur"]
+        client.close()
+
+    def test_rate_limit_and_concurrency_waits(self, petstore_base_url):
+        """Проверка фаз ожидания бюджета запросов и места под предел параллельности"""
+        tracer = Tracer()
+        client = PetstoreAPIClient(base_url=petstore_base_url, tracer=tracer, rate_limiter=RateLimiter(1000),
+                                   concurrency=AdaptiveConcurrencyLimit())
+        client.get_store_inventory()
+
+        assert _phases(tracer)[:2] == ["rate_limit_wait", "concurrency_wait"]
+        client.close()
+
+    @pytest.mark.live
+    def test_requests_transport_phases(self, petstore_base_url, pooled_pet):
+        """Проверка фаз транспорта requests: новое соединение только у первого запроса"""
+        tracer = Tracer()
+        client = PetstoreAPIClient(base_url=petstore_base_url, transport="requests", tracer=tracer)
+
+        client.get_pet(pooled_pet["id"])
+        client.get_pet(pooled_pet["id"])
+
+        assert _phases(tracer) == ["connect", "send", "ttfb", "download", "send", "ttfb", "download"]
+        assert {event["args"]["endpoint"] for event in tracer.events} == {"/pet/{petId}"}
+        client.close()
@@ -0,0 +1,183 @@
+"""
+Тесты транспортов клиента - requests и HTTP/1.1 на сокетах
+"""
+import gzip
+import socket
+import threading
+
+import pytest
+import requests
+
+from helpers.api_client import PetstoreAPIClient
+from helpers.data_generators import ImageDataGenerator
+from helpers.transport import RawHTTPTransport, RequestsTransport, make_transport
+
+
+class CannedServer:
+    """Сервер, отвечающий заранее заданными байтами на каждый запрос (по одному на соединение)"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.base_url = f"http://127.0.0.1:{self._listener.getsockname()[1]}"
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        for reply in self.replies:
+            connection, _ = self._listener.accept()
+            with connection:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += connection.recv(65536)
+                self.requests.append(data)
+                connection.sendall(reply)
+
+    def close(self):
+        self._listener.close()
+
+
+def _raw_client(base_url, **kwargs):
+    return PetstoreAPIClient(base_url=base_url, transport="raw", **kwargs)
+
+
+class TestTransportSelection:
+    """Тесты выбора транспорта"""
+
+    def test_by_name_and_instance(self):
+        """Проверка выбора по имени с настройками пула и передачи готового транспорта"""
+        client = PetstoreAPIClient(transport="raw", pool_maxsize=3, keep_alive=False)
+        assert isinstance(client.transport, RawHTTPTransport)
+        assert client.transport.pool_maxsize == 3
+        assert client.transport.headers["Connection"] == "close"
+        with pytest.raises(AttributeError):
+            client.session
+
+        transport = RequestsTransport()
+        assert PetstoreAPIClient(transport=transport).session is transport.session
+        with pytest.raises(ValueError):
+            make_transport("curl")
+
+
+@pytest.mark.live
+class TestRawHTTPTransport:
+    """Тесты RawHTTPTransport против Petstore"""
+
+    def test_same_responses_as_requests(self, petstore_base_url, pet_data_generator, user_data_generator):
+        """Проверка, что ответы совпадают с транспортом requests на разных типах тел и параметров"""
+        pet = pet_data_generator.generate_pet_data(status="pending")
+        user = user_data_generator.generate_user_data()
+        image = ImageDataGenerator.generate_png(width=16, height=16, seed=1)
+        results = {}
+        for name in ("requests", "raw"):
+            client = PetstoreAPIClient(base_url=petstore_base_url, transport=name)
+            client.create_pet(pet)
+            client.create_user(user)
+            responses = [
+                client.get_pet(pet["id"]),
+                client.update_pet_with_form(pet["id"], "Renamed", "pending"),
+                client.upload_pet_image(pet["id"], additional_metadata="кот", image=image),
+                client.get_user(user["username"]),
+                client.login_user(user["username"], user["password"]),
+                client.get_pet(9999999999999),
+                client.get_pet("abc"),
+                client.delete_user(user["username"]),
+            ]
+            results[name] = [(response.status_code, response.content) for response in responses]
+            assert pet["id"] in [item["id"] for item in client.iter_pets_by_status("pending")]
+            client.close()
+
+        assert [status for status, _ in results["raw"]] == [200, 200, 200, 200, 200, 404, 404, 200]
+        assert [status for status, _ in results["raw"]] == [status for status, _ in results["requests"]]
+        for (_, raw), (_, reference) in list(zip(results["raw"], results["requests"]))[1:3]:
+            assert raw == reference
+
+    def test_keep_alive_and_dropped_connection(self, petstore_base_url):
+        """Проверка переиспользования соединения и замены закрытого сервером"""
+        client = _raw_client(petstore_base_url)
+        client.get_store_inventory()
+        [pool] = client.transport._pools.values()
+        [connection] = pool._idle
+
+        for _ in range(5):
+            assert client.get_store_inventory().status_code == 200
+        assert pool._idle == [connection]
+
+        connection.sock.shutdown(socket.SHUT_RDWR)
+        assert client.get_store_inventory().status_code == 200
+        assert pool._idle != [connection]
+        client.close()
+
+    def test_stale_connection_retried_only_for_idempotent(self, petstore_base_url, monkeypatch, pet_data_generator):
+        """Проверка повторной отправки GET, но не POST, если соединение закрыто до ответа"""
+        client = _raw_client(petstore_base_url)
+        client.get_store_inventory()
+        [pool] = client.transport._pools.values()
+        monkeypatch.setattr(type(pool._idle[0]), "dropped", lambda self: False)
+
+        pool._idle[0].sock.shutdown(socket.SHUT_RDWR)
+        assert client.get_store_inventory().status_code == 200
+
+        pool._idle[0].sock.shutdown(socket.SHUT_RDWR)
+        with pytest.raises(requests.ConnectionError):
+            client.create_pet(pet_data_generator.generate_pet_data())
+        client.close()
+
+    def test_stream_returns_connection_to_pool(self, petstore_base_url):
+        """Проверка, что дочитанное потоковое тело возвращает соединение в пул"""
+        client = _raw_client(petstore_base_url)
+        list(client.iter_pets_by_status("sold"))
+        [pool] = client.transport._pools.values()
+
+        assert len(pool._idle) == 1
+        list(client.iter_pets_by_status("sold"))
+        assert len(pool._idle) == 1
+        client.close()
+
+
+class TestRawHTTPProtocol:
+    """Тесты разбора ответов и ошибок RawHTTPTransport"""
+
+    def test_chunked_gzip_response(self):
+        """Проверка chunked-тела, gzip и объединения повторяющихся заголовков"""
+        body = gzip.compress(b'{"sold": 3}')
+        reply = (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Encoding: gzip\r\n"
+                 b"Transfer-Encoding: chunked\r\nX-Tag: a\r\nX-Tag: b\r\nConnection: close\r\n\r\n"
+                 + b"%x\r\n" % 5 + body[:5] + b"\r\n" + b"%x\r\n" % (len(body) - 5) + body[5:] + b"\r\n0\r\n\r\n")
+        server = CannedServer([reply])
+        client = _raw_client(server.base_url + "/v2")
+
+        response = client.get_store_inventory()
+
+        assert response.json() == {"sold": 3}
+        assert response.headers["x-tag"] == "a, b"
+        assert server.requests[0].startswith(b"GET /v2/store/inventory HTTP/1.1\r\n")
+        assert client.transport._pools[("http", "127.0.0.1", int(server.base_url.rsplit(":", 1)[1]))]._idle == []
+        server.close()
+
+    def test_query_and_unicode_path(self):
+        """Проверка кодирования параметров запроса и не-ASCII пути"""
+        reply = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"
+        server = CannedServer([reply, reply])
+        client = _raw_client(server.base_url)
+
+        client.login_user("иван", "p@ss word")
+        client.get_user("иван")
+
+        assert server.requests[0].split(b"\r\n")[0] == \
+            b"GET /user/login?username=%D0%B8%D0%B2%D0%B0%D0%BD&password=p%40ss+word HTTP/1.1"
+        assert server.requests[1].split(b"\r\n")[0] == b"GET /user/%D0%B8%D0%B2%D0%B0%D0%BD HTTP/1.1"
+        server.close()
+
+    def test_timeouts_and_refused_connection(self):
+        """Проверка ReadTimeout у молчащего сервера и ConnectionError при отказе в соединении"""
+        silent = socket.create_server(("127.0.0.1", 0))
+        port = silent.getsockname()[1]
+        client = _raw_client(f"http://127.0.0.1:{port}", timeout=0.05)
+
+        with pytest.raises(requests.ReadTimeout):
+            client.get_store_inventory()
+        silent.close()
+        with pytest.raises(requests.ConnectionError):
+            client.get_store_inventory()
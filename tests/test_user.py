@@ -3,7 +3,8 @@
 некорректные данные, идемпотентность, уникальность и структуру ответов
 """
 import pytest
-import time
+
+from helpers.waiting import wait_until
 
 
 class TestUserCRUD:
@@ -31,32 +32,15 @@ class TestUserCRUD:
         response = api_client.create_users_with_list(users)
         assert response.status_code in [200]
 
-    def test_get_existing_user(self, api_client, user_data_generator):
+    def test_get_existing_user(self, api_client, pooled_user, schema_validator):
         """Проверка получения существующего пользователя с проверкой структуры"""
-        user_data = user_data_generator.generate_user_data()
-        create_response = api_client.create_user(user_data)
-        assert create_response.status_code in [200]
+        username = pooled_user["username"]
+        response = api_client.get_user(username)
 
-        username = user_data["username"]
-        
-        # Используем retry механизм для получения пользователя
-        # (демо API Petstore может иметь нестабильную задержку распространения данных)
-        max_attempts = 10
-        response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)  # Увеличивающаяся задержка
-            response = api_client.get_user(username)
-            if response.status_code == 200:
-                break
-        
-        assert response.status_code == 200, f"Не удалось получить пользователя после {max_attempts} попыток. Последний ответ: {response.text if response else 'None'}"
+        assert response.status_code == 200, f"Не удалось получить пользователя. Последний ответ: {response.text}"
         user = response.json()
         assert user["username"] == username
-        assert isinstance(user["id"], int)
-        assert isinstance(user["username"], str)
-        if "email" in user:
-            assert isinstance(user["email"], str)
+        schema_validator.assert_valid("User", user)
         if "userStatus" in user:
             assert user["userStatus"] in [0, 1]
 
@@ -65,15 +49,11 @@ class TestUserCRUD:
         response = api_client.get_user("nonexistent_user_xyz123")
         assert response.status_code in [404]
 
-    def test_update_user_success(self, api_client, user_data_generator):
+    def test_update_user_success(self, api_client, user_data_generator, exclusive_user):
         """Проверка успешного обновления"""
-        initial_user = user_data_generator.generate_user_data()
-        create_response = api_client.create_user(initial_user)
-        assert create_response.status_code in [200]
-
-        username = initial_user["username"]
+        username = exclusive_user["username"]
         updated_user = user_data_generator.generate_user_data(
-            user_id=initial_user["id"],
+            user_id=exclusive_user["id"],
             username=username,
             first_name="Updated",
             last_name="User",
@@ -91,25 +71,13 @@ class TestUserCRUD:
         username = user_data["username"]
         
         # Убеждаемся, что пользователь существует перед удалением
-        # (используем retry, так как демо API Petstore имеет задержку распространения данных)
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            get_response = api_client.get_user(username)
-            if get_response.status_code == 200:
-                break
-        
-        # Удаляем пользователя с retry механизмом
-        delete_response = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            delete_response = api_client.delete_user(username)
-            if delete_response.status_code == 200:
-                break
-        
-        assert delete_response.status_code == 200, f"Не удалось удалить пользователя после {max_attempts} попыток. Последний ответ: {delete_response.text if delete_response else 'None'}"
+        # (демо API Petstore имеет задержку распространения данных)
+        wait_until(lambda: api_client.get_user(username), lambda r: r.status_code == 200, name="get_user")
+
+        delete_response = wait_until(lambda: api_client.delete_user(username), lambda r: r.status_code == 200,
+                                     name="delete_user")
+
+        assert delete_response.status_code == 200, f"Не удалось удалить пользователя. Последний ответ: {delete_response.text}"
         
         # Проверяем, что пользователь действительно удален
         verify_response = api_client.get_user(username)
@@ -190,24 +158,13 @@ class TestUserIdempotency:
         username = user_data["username"]
         
         # Убеждаемся, что пользователь существует перед удалением
-        max_attempts = 5
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            get_response = api_client.get_user(username)
-            if get_response.status_code == 200:
-                break
-        
-        # Первое удаление с retry механизмом
-        delete_response1 = None
-        for attempt in range(max_attempts):
-            if attempt > 0:
-                time.sleep(0.5 * attempt)
-            delete_response1 = api_client.delete_user(username)
-            if delete_response1.status_code == 200:
-                break
-        
-        assert delete_response1.status_code == 200, f"Не удалось удалить пользователя после {max_attempts} попыток. Последний ответ: {delete_response1.text if delete_response1 else 'None'}"
+        wait_until(lambda: api_client.get_user(username), lambda r: r.status_code == 200, name="get_user")
+
+        # Первое удаление
+        delete_response1 = wait_until(lambda: api_client.delete_user(username), lambda r: r.status_code == 200,
+                                      name="delete_user")
+
+        assert delete_response1.status_code == 200, f"Не удалось удалить пользователя. Последний ответ: {delete_response1.text}"
 
         # Повторное удаление должно вернуть 404
         delete_response2 = api_client.delete_user(username)
@@ -259,14 +216,3 @@ class TestUserAdvanced:
         user2_data = user_data_generator.generate_user_data(username=username, email="second@example.com")
         response2 = api_client.create_user(user2_data)
         assert response2.status_code in [200]
-
-    def test_create_user_performance(self, api_client, user_data_generator):
-        """Базовый тест производительности - создание должно быть быстрым"""
-        user_data = user_data_generator.generate_user_data()
-
-        start_time = time.time()
-        response = api_client.create_user(user_data)
-        end_time = time.time()
-
-        assert response.status_code in [200]
-        assert (end_time - start_time) < 2.0, "Создание должно занимать менее 2 секунд"
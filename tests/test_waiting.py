@@ -0,0 +1,39 @@
+"""
+Тесты ожидания eventual consistency - wait_until и задержки backoff
+"""
+import random
+
+from helpers.waiting import WaitStats, backoff_delays, wait_until
+
+
+class TestWaitUntil:
+    """Тесты wait_until"""
+
+    def test_returns_as_soon_as_predicate_holds(self):
+        """Проверка выхода на первой попытке, где условие выполнено"""
+        calls = []
+        stats = WaitStats()
+        result = wait_until(lambda: calls.append(1) or len(calls), lambda n: n >= 3,
+                            initial_delay=0.001, name="counter", stats=stats)
+
+        assert result == 3
+        record = stats.records[0]
+        assert (record.name, record.attempts, record.satisfied) == ("counter", 3, True)
+
+    def test_deadline_returns_last_result(self):
+        """Проверка возврата последнего результата по истечении дедлайна"""
+        stats = WaitStats()
+        result = wait_until(lambda: 404, lambda code: code == 200, timeout=0.05,
+                            initial_delay=0.01, stats=stats)
+
+        assert result == 404
+        assert stats.summary()["<lambda>"]["timeouts"] == 1
+        assert stats.records[0].elapsed < 0.5
+
+    def test_backoff_growth_and_jitter(self):
+        """Проверка экспоненциального роста задержек с ограничением и джиттером"""
+        delays = backoff_delays(initial_delay=0.1, factor=2, max_delay=0.5, jitter=0.5, rng=random.Random(1))
+        values = [next(delays) for _ in range(6)]
+        bases = [0.1, 0.2, 0.4, 0.5, 0.5, 0.5]
+        for value, base in zip(values, bases):
+            assert base * 0.5 <= value <= base